@@ -29,8 +29,34 @@ import logging
 from tabulate import tabulate
 import os
 import shutil
+import shlex
 import time
-import google.generativeai as genai
+import sys
+import json
+import csv
+import html
+import tempfile
+import gzip
+import struct
+import io
+import base64
+import hashlib
+import socket
+import select
+import socketserver
+import threading
+import contextlib
+import http.client
+import http.server
+import subprocess
+import resource
+import sqlite3
+import functools
+import itertools
+import marshal
+import traceback
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 port_list          = list()  #Store list of all Ports
 input_list         = list()  #Store list of in Ports
@@ -44,17 +70,27 @@ only_clk           = list()  #List only with Clock signal
 only_rst           = list()  #List Only with reset signal
 ex_cr              = list()  #List without Clock and Reset
 param_list         = list()  #List of parameters available
+sweep_points       = list()  #Parameter sweep points (--sweep), one dict parameter -> value per point
 cp_in_list         = list()  #Coverpoint List
-
-'''
-Creating a "tb" folder to save the generated UVM testbench
-'''
-folder_name ="tb"
-if not os.path.exists(folder_name):
-  os.makedirs(folder_name)
-elif os.path.exists(folder_name):
-  shutil.rmtree(folder_name) #Remove if there is an existing folder/files
-  os.makedirs(folder_name)
+qualifier_list     = list()  #List of valid/enable style qualifier inputs used by the monitor
+port_dtype_map     = dict()  #Declarator -> data type string Eg: din -> [DATA_WIDTH-1:0]
+cov_plan           = list()  #Coverage plan, one entry per coverpoint
+llm_cache          = OrderedDict()  #Gemini responses by prompt, stays warm in the generation service (LRU)
+llm_cache_size     = 256     #Responses kept in llm_cache
+agent_list         = list()  #One entry per agent when the ports are split into several agents
+llm_metrics        = list()  #One entry per Gemini request: prompt sizes, tokens and latency
+llm_backend        = dict()  #Optional recording ("record": JSONL path) or replay ("replay": sha256 -> entry) of Gemini
+emitter_times      = dict()  #Emitter name -> seconds spent in it during the last generation
+reg_list           = list()  #Registers of the register model, one entry per register with its fields
+reg_bus            = dict()  #Register bus role (addr, wdata, rdata, write, read) -> DUT port
+template_dirs      = list()  #Template search path, the --templates folder comes before the built-in templates
+template_cache     = dict()  #"dir": folder of the compiled templates on disk, "" keeps them in memory only
+template_sources   = dict()  #Template path -> (mtime_ns, size, digest), unchanged templates are not read again
+template_codes     = dict()  #Digest -> (code object, line map) of the compiled templates
+template_stats     = Counter()  #Template loads by origin: memory, disk or compiled
+
+folder_name ="tb" #Folder to save the generated UVM testbench
+builtin_templates = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates") #Default templates of the emitters
 
 """
 Collects port data from the Verilog design.
@@ -79,6 +115,7 @@ def collect_port_data():
     logging.debug(dir(m_i.kind.name.format))
     logging.debug(m_i)
     port_list.append(m_i)
+    port_dtype_map[str(m_i.declarators).strip()] = str(m_i.header.dataType).strip()
     if(m_i.header.direction.kind.name == 'InputKeyword'):
         input_list.append(str(m_i))
         input_declarators.append(str(m_i.declarators))
@@ -104,6 +141,287 @@ def collect_param_data():
     logging.debug(m_i)
     param_list.append(str(m_i))
 
+"""
+Decorator adding the time spent in an emitter to emitter_times.
+
+Args:
+  func (function): create_* emitter
+
+Returns:
+  function: Timed emitter
+"""
+def timed_emitter(func):
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            emitter_times[func.__name__] = emitter_times.get(func.__name__, 0.0) + time.perf_counter() - start_time
+    return timed
+
+"""
+Appends the metrics of one run to the performance database (SQLite).
+
+Every metric is one row of the metrics table, the rows of a run share its run id. A
+database that can not be written only logs a warning, the run itself is not affected.
+
+Args:
+  db_path (str): Database file, empty to skip recording
+  dut (str): DUT name
+  stage (str): generate, build or simulate
+  values (dict): Metric name -> value
+
+Returns:
+  None
+"""
+def record_perf(db_path, dut, stage, values):
+    if not db_path or not values:
+        return
+    now = time.time()
+    run = f"{now:.6f}-{os.getpid()}"
+    try:
+        with contextlib.closing(sqlite3.connect(db_path, timeout=30)) as db, db:
+            db.execute("CREATE TABLE IF NOT EXISTS metrics (run TEXT, time REAL, host TEXT, dut TEXT, stage TEXT, metric TEXT, value REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS metrics_series ON metrics (dut, stage, metric, time)")
+            db.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           [(run, now, socket.gethostname(), dut, stage, name, float(value)) for name, value in values.items()])
+    except sqlite3.Error as e:
+        logging.warning(f"Could not record the performance metrics in {db_path}: {e}")
+
+#Template syntax: {{ expr }} writes a Python expression, {% if/elif/else/endif %}, {% for x in expr %}/{% endfor %}
+#and {% set name = expr %} are the statements, {# ... #} is a comment. A statement line leaves no blank line
+#behind (the whitespace before the tag and the newline after it are dropped), "-" inside a delimiter
+#({{- / -}} / {%- / -%}) strips all the whitespace on that side.
+TEMPLATE_ENGINE_VERSION = 1
+template_tag = re.compile(r"({{.*?}}|{%.*?%}|{#.*?#})", re.S)
+
+class TemplateError(Exception):
+  pass
+
+"""
+Compiles a template into a Python code object.
+
+The template becomes a flat Python program appending the literal text and the expression
+values to _out, so rendering is a single exec without any parsing. The line map gives the
+template line of every generated line for the error messages.
+
+Args:
+    source (str): Template text
+    name (str): Template name, used as the file name of the code object
+
+Returns:
+    tuple: (code object, line map)
+"""
+def compile_template(source, name):
+  code_lines = ["_w = _out.append"]
+  line_map = [1]
+  blocks = list()
+  lineno = 1
+  strip_next = None #Whitespace to drop at the start of the next text: "\n" (statement) or "all" (-)
+  def emit(line, template_line):
+    code_lines.append("  " * len(blocks) + line)
+    line_map.append(template_line)
+  pieces = template_tag.split(source)
+  for index, piece in enumerate(pieces):
+    if index % 2 == 0:
+      text = piece
+      if strip_next == "all":
+        text = text.lstrip()
+      elif strip_next == "\n" and text.startswith("\n"):
+        text = text[1:]
+      strip_next = None
+      next_tag = pieces[index + 1] if index + 1 < len(pieces) else ""
+      if next_tag[:3] in ("{%-", "{{-", "{#-"):
+        text = text.rstrip()
+      elif next_tag[:2] in ("{%", "{#"):
+        #Drops the indentation of a statement that is alone on its line
+        indent = piece.rpartition("\n")[2]
+        if not indent.strip(" \t") and ("\n" in piece or index == 0) and text.endswith(indent):
+          text = text[:len(text) - len(indent)]
+      if text:
+        emit(f"_w({text!r})", lineno)
+      lineno += piece.count("\n")
+      continue
+    body = piece[2:-2]
+    strip_left, strip_right = body.startswith("-"), body.endswith("-")
+    body = body[1 if strip_left else 0:len(body) - (1 if strip_right else 0)].strip()
+    if piece.startswith("{#"):
+      strip_next = "all" if strip_right else "\n"
+    elif piece.startswith("{{"):
+      try:
+        compile(body, name, "eval")
+      except SyntaxError as e:
+        raise TemplateError(f"{name}:{lineno}: invalid expression {{{{ {body} }}}}: {e.msg}")
+      emit(f"_w(str({body}))", lineno)
+      strip_next = "all" if strip_right else None
+    else:
+      keyword, _, argument = body.partition(" ")
+      argument = argument.strip()
+      if keyword in ("if", "for"):
+        emit(f"{body}:", lineno)
+        blocks.append((keyword, lineno))
+        emit("pass", lineno)
+      elif keyword in ("elif", "else"):
+        if not blocks or blocks[-1][0] != "if":
+          raise TemplateError(f"{name}:{lineno}: {{% {keyword} %}} without {{% if %}}")
+        blocks.pop()
+        emit(f"{body}:", lineno)
+        blocks.append(("if", lineno))
+        emit("pass", lineno)
+      elif keyword in ("endif", "endfor"):
+        if not blocks or blocks[-1][0] != keyword[3:]:
+          raise TemplateError(f"{name}:{lineno}: unexpected {{% {keyword} %}}")
+        blocks.pop()
+      elif keyword == "set":
+        emit(argument, lineno)
+      else:
+        raise TemplateError(f"{name}:{lineno}: unknown statement {{% {body} %}}")
+      strip_next = "all" if strip_right else "\n"
+    lineno += piece.count("\n")
+  if blocks:
+    raise TemplateError(f"{name}:{blocks[-1][1]}: {{% {blocks[-1][0]} %}} is not closed")
+  try:
+    return compile("\n".join(code_lines), name, "exec"), line_map
+  except SyntaxError as e:
+    raise TemplateError(f"{name}:{line_map[e.lineno - 1] if e.lineno else '?'}: {e.msg}")
+
+"""
+Returns the default folder of the compiled templates ($XDG_CACHE_HOME/rtl2uvm/templates).
+
+Args:
+    None
+
+Returns:
+    str: Cache folder
+"""
+def default_template_cache():
+  return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "rtl2uvm", "templates")
+
+"""
+Sets the template search path and the disk cache of the compiled templates.
+
+Args:
+    user_dir (str): Folder of templates overriding the built-in ones (or None)
+    cache_dir (str): Folder of the compiled templates, empty to cache in memory only
+
+Returns:
+    None
+"""
+def configure_templates(user_dir, cache_dir):
+  template_dirs[:] = ([user_dir] if user_dir else []) + [builtin_templates]
+  template_cache["dir"] = cache_dir or ""
+
+"""
+Finds a template in the search path (template_dirs).
+
+Args:
+    name (str): Template file name Eg: driver.sv.tpl
+
+Returns:
+    str: Path of the template
+"""
+def find_template(name):
+  for dir_i in template_dirs or [builtin_templates]:
+    path = os.path.join(dir_i, name)
+    if os.path.isfile(path):
+      return path
+  raise TemplateError(f"Template {name} not found in {', '.join(template_dirs or [builtin_templates])}")
+
+"""
+Loads the compiled code of a template.
+
+An unchanged template file (same modification time and size) is not read again; a new or
+changed one is hashed and its code is taken from memory, then from the disk cache
+(<digest>.bin, marshal), and only compiled when both miss. The digest covers the template
+text, the engine version and the Python version.
+
+Args:
+    path (str): Template file
+    name (str): Template name
+
+Returns:
+    tuple: (code object, line map)
+"""
+def load_template(path, name):
+  stat = os.stat(path)
+  known = template_sources.get(path)
+  if known and known[:2] == (stat.st_mtime_ns, stat.st_size) and known[2] in template_codes:
+    template_stats["memory"] += 1
+    return template_codes[known[2]]
+  with open(path, "rb") as file:
+    source = file.read()
+  digest = hashlib.sha256(f"{TEMPLATE_ENGINE_VERSION}:{sys.implementation.cache_tag}:".encode() + source).hexdigest()
+  template_sources[path] = (stat.st_mtime_ns, stat.st_size, digest)
+  if digest in template_codes:
+    template_stats["memory"] += 1
+    return template_codes[digest]
+  cache_path = os.path.join(template_cache["dir"], digest+".bin") if template_cache.get("dir") else None
+  if cache_path and os.path.exists(cache_path):
+    try:
+      with open(cache_path, "rb") as file:
+        template_codes[digest] = marshal.load(file)
+      template_stats["disk"] += 1
+      return template_codes[digest]
+    except (OSError, EOFError, ValueError, TypeError) as e:
+      logging.warning(f"Ignoring the cached template {cache_path}: {e}")
+  template_codes[digest] = compile_template(source.decode(), name)
+  template_stats["compiled"] += 1
+  if cache_path:
+    try:
+      os.makedirs(template_cache["dir"], exist_ok=True)
+      with tempfile.NamedTemporaryFile(dir=template_cache["dir"], delete=False) as file:
+        marshal.dump(template_codes[digest], file)
+      os.replace(file.name, cache_path)
+    except OSError as e:
+      logging.warning(f"Could not cache the compiled template {name} in {template_cache['dir']}: {e}")
+  return template_codes[digest]
+
+"""
+Runs the compiled code of a template.
+
+Args:
+    path (str): Template file
+    name (str): Template name
+    context (dict): Variables of the template
+
+Returns:
+    str: Rendered text
+"""
+def run_template(path, name, context):
+  code, line_map = load_template(path, name)
+  namespace = dict(context, _out=list())
+  try:
+    exec(code, namespace)
+  except Exception as e:
+    frames = [f for f in traceback.extract_tb(e.__traceback__) if f.filename == name]
+    raise TemplateError(f"{name}:{line_map[frames[-1].lineno - 1] if frames else '?'}: {type(e).__name__}: {e}") from e
+  return "".join(namespace["_out"])
+
+"""
+Renders a template with the given variables.
+
+A template of the --templates folder that fails to compile or render is reported and
+replaced by the built-in template of the same name.
+
+Args:
+    name (str): Template file name Eg: driver.sv.tpl
+    **context: Variables of the template
+
+Returns:
+    str: Rendered text
+"""
+def render_template(name, **context):
+  path = find_template(name)
+  try:
+    return run_template(path, name, context)
+  except TemplateError as e:
+    builtin_path = os.path.join(builtin_templates, name)
+    if path == builtin_path or not os.path.isfile(builtin_path):
+      raise
+    logging.error(f"{path}: {e}, using the built-in template")
+    return run_template(builtin_path, name, context)
+
 """
 Parses command-line arguments using argparse.
 
@@ -112,12 +430,12 @@ an optional mode argument, and an optional coverage argument,
 and returns the parsed arguments.
 
 Args:
-  None
+  argv (list): Arguments to parse (default: sys.argv[1:])
 
 Returns:
   args (argparse.Namespace): Parsed command-line arguments
 """
-def eda_argparse():
+def eda_argparse(argv=None):
     # Create the parser
     parser = argparse.ArgumentParser()
     # Add a required test argument
@@ -127,8 +445,44 @@ def eda_argparse():
     # Add an optional coverage argument
     parser.add_argument('-c', '--coverage', action='store_true', help='Enable coverage in verilator mode')
     parser.add_argument('-llm', '--llm', action='store_true', help='Use gemini for logic generation')
+    parser.add_argument('--llm-retries', type=int, default=2, help='Re-prompts when the LLM code fails the pyslang syntax check, then the template is used (default: 2)')
+    parser.add_argument('--llm-batch', action='store_true', help='Generate the driver, monitor and scoreboard with one structured (JSON) LLM request')
+    parser.add_argument('--llm-batch-no-scoreboard', action='store_true', help='Leave the scoreboard out of the --llm-batch request, the same components as the per-component requests')
+    parser.add_argument('--llm-record', type=str, default=None, help='Append every Gemini response to this JSONL recording')
+    parser.add_argument('--llm-replay', type=str, default=None, help='Answer the LLM prompts offline from a --llm-record recording')
+    parser.add_argument('--llm-budget', type=int, default=2048, help='Token budget of the compact LLM prompts, 0 sends the full design and template (default: 2048)')
+    # Add an optional monitor qualifier override, Eg: -q valid,ready (use "none" to sample on value change only)
+    parser.add_argument('-q', '--qualifiers', type=str, default=None, help='Comma separated valid/enable inputs that qualify monitor sampling (default: auto detect, "none" to disable)')
+    # Add an optional verilator build profile
+    parser.add_argument('-p', '--profile', type=str, choices=['debug', 'regression', 'max-perf'], default='regression', help='Default verilator build profile (default: regression)')
+    # Add an optional cycle driven clocking for verilator (clock toggled from C++, no delays in the testbench)
+    parser.add_argument('--cycle-driven', action='store_true', help='Default the verilator build to the cycle driven clocking')
+    # Add an optional batched DPI bridge from the scoreboard to a Python/NumPy golden model (verilator mode)
+    parser.add_argument('--golden', action='store_true', help='Check scoreboard items with a Python golden model in batches over DPI')
+    parser.add_argument('--golden-batch', type=int, default=1024, help='Items per golden model batch (default: 1024)')
+    # Add optional coverage planner arguments
+    parser.add_argument('--cov-bins', type=int, default=16, help='Bin budget per coverpoint (default: 16)')
+    parser.add_argument('--cov-cross', type=str, default=None, help='Comma separated pairwise crosses, Eg: read:write,din:write (default: no cross)')
+    # Add an optional watch mode, regenerate on every save of the RTL
+    parser.add_argument('-w', '--watch', action='store_true', help='Keep running and regenerate the changed files whenever the RTL is saved')
+    parser.add_argument('--watch-interval', type=float, default=0.05, help='Polling interval/debounce window in seconds for --watch (default: 0.05)')
+    # Add the performance database every run records its metrics in
+    parser.add_argument('--perf-db', type=str, default=os.environ.get("RTL2UVM_PERF_DB", "rtl2uvm_perf.db"), help='SQLite database the run metrics are appended to, empty to disable (default: $RTL2UVM_PERF_DB or rtl2uvm_perf.db)')
+    # Add optional user templates and the compiled template cache
+    parser.add_argument('--templates', type=str, default=os.environ.get("RTL2UVM_TEMPLATES"), help='Folder of templates overriding the built-in ones of the same name (default: $RTL2UVM_TEMPLATES)')
+    parser.add_argument('--template-cache', type=str, default=os.environ.get("RTL2UVM_TEMPLATE_CACHE", default_template_cache()), help='Folder of the compiled templates, empty to cache them in memory only (default: $RTL2UVM_TEMPLATE_CACHE or ~/.cache/rtl2uvm/templates)')
+    # Add an optional content-addressed store for the generated files
+    parser.add_argument('--store', type=str, default=os.environ.get("RTL2UVM_STORE"), help='Content-addressed store the generated files are kept in once and linked from the output tree (default: $RTL2UVM_STORE, none)')
+    parser.add_argument('--store-link', type=str, default="hard", choices=["hard", "symlink"], help='Links from the output tree to the store, hard links fall back to symbolic links across filesystems (default: hard)')
+    # Add an optional register model built from a register description
+    parser.add_argument('--regs', type=str, default=None, help='Register description (CSV or JSON) to build a uvm_reg model with backdoor access from')
+    parser.add_argument('--reg-bus', type=str, default=None, help='Register bus ports as role=port pairs, Eg: addr=paddr,wdata=pwdata,rdata=prdata,write=pwrite (default: from the port names)')
+    # Add optional agent grouping, one interface/agent per port group driven by a virtual sequence
+    parser.add_argument('-a', '--agents', type=str, default=None, help='Split the ports into several agents: "prefix", "clock" or a JSON map file (default: single agent)')
+    # Add an optional parameter sweep, one Verilator build per parameter point from a single testbench
+    parser.add_argument('--sweep', type=str, default=None, help='Parameter points built from one verilator testbench: NAME=v1,v2;NAME2=v3 (every combination) or a JSON list of points')
     # Parse the argument
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     return args
 
 """
@@ -149,29 +503,495 @@ def sanitize_dut_name(dut_name):
         sanitized_name = '_' + sanitized_name
     return sanitized_name
 
+"""
+Detects the handshake/valid/enable style inputs used to qualify monitor sampling.
+
+This function looks for single bit inputs (excluding clock and reset) whose name
+contains a qualifier token such as valid, ready, en, req, read or write. Names ending
+with _n/_b are treated as active low. A user override replaces the auto detection.
+
+Args:
+    override (str): Comma separated list of qualifier inputs, "none" or None for auto detect
+
+Returns:
+    list: List of (signal, active_low) tuples, also stored in qualifier_list
+"""
+def detect_qualifiers(override):
+  qualifier_tokens = ["valid", "vld", "ready", "rdy", "en", "enable", "req", "sel", "strobe", "stb",
+                      "we", "wr", "rd", "read", "write", "start", "cs"]
+  candidates = list()
+  if override is not None:
+    if override.strip().lower() != "none":
+      for sig_i in override.split(","):
+        sig_i = sig_i.strip()
+        if sig_i not in ex_cr:
+          logging.warning(f"Qualifier {sig_i} is not a DUT input, ignoring it")
+          continue
+        candidates.append(sig_i)
+  else:
+    for sig_i in ex_cr:
+      if port_dtype_map.get(sig_i, "").startswith("["):
+        continue #Only single bit inputs can qualify a cycle
+      tokens = sig_i.lower().split("_")
+      if any(tok in qualifier_tokens for tok in tokens):
+        candidates.append(sig_i)
+  for sig_i in candidates:
+    qualifier_list.append((sig_i, bool(re.search(r"_(n|b)$", sig_i, re.IGNORECASE))))
+  logging.info(f"Monitor qualifiers: {', '.join(q for q, _ in qualifier_list) or 'none (value change only)'}")
+  return qualifier_list
+
+"""
+Maps the DUT ports to the clock of the always blocks using them.
+
+Every always block clocked by one of the clock inputs claims the ports it references,
+the first block wins for ports used in several clock domains.
+
+Args:
+    clocks (list): Clock inputs of the DUT
+
+Returns:
+    dict: Port -> clock
+"""
+def port_clock_map(clocks):
+  port_names = {p.strip() for p in all_declarators}
+  port_clock = dict()
+  design_text = str(dut_design_file)
+  for block in re.split(r"\balways(?:_ff|_latch)?\b", design_text)[1:]:
+    block = re.split(r"\b(?:assign|initial|endmodule)\b", block)[0]
+    edge = re.match(r"\s*@\s*\(\s*(?:posedge|negedge)\s+(\w+)", block)
+    if not edge or edge.group(1) not in clocks:
+      continue
+    for name_i in re.findall(r"\b\w+\b", block):
+      if name_i in port_names and name_i not in clocks:
+        port_clock.setdefault(name_i, edge.group(1))
+  return port_clock
+
+"""
+Splits the DUT ports into agent groups.
+
+The groups come from the port name prefix (wr_en, wr_data -> wr), from the clock domain
+of the always blocks using the ports, or from a JSON map file
+{"group": ["port", ...]} / {"group": {"clock": "clk", "ports": ["port", ...]}}.
+Each group gets one clock, ports left out of every group join the first one.
+
+Args:
+    spec (str): "prefix", "clock" or the path of a JSON map file
+
+Returns:
+    list: Group dicts with "name", "clock" and "ports" (declarators without the clocks)
+"""
+def group_ports(spec):
+  clocks = [c.strip() for c in input_declarators if re.search(r".*.(pclk|clk|clock).*", str(c), re.IGNORECASE)]
+  ports = [p.strip() for p in all_declarators if p.strip() not in clocks]
+  if not clocks:
+    logging.warning("No clock input found, generating a single agent")
+    return list()
+  port_clock = port_clock_map(clocks)
+  groups = dict() #name -> {"clock": clock or None, "ports": [...]}
+  if spec == "prefix":
+    prefixes = Counter(m.group(1) for m in (re.match(r"([A-Za-z0-9]+)_", p) for p in ports) if m)
+    for port_i in ports:
+      match = re.match(r"([A-Za-z0-9]+)_", port_i)
+      if re.search(r"(reset|rst)", port_i, re.IGNORECASE) or not match or prefixes[match.group(1)] < 2:
+        continue #Joins the first group below
+      groups.setdefault(match.group(1), {"clock": None, "ports": list()})["ports"].append(port_i)
+    for group_i, group in groups.items():
+      prefixed = [c for c in clocks if c.startswith(group_i + "_")]
+      if prefixed:
+        group["clock"] = prefixed[0]
+  elif spec == "clock":
+    for port_i in ports:
+      if port_i in port_clock:
+        groups.setdefault(port_clock[port_i], {"clock": port_clock[port_i], "ports": list()})["ports"].append(port_i)
+  else:
+    try:
+      with open(spec) as file:
+        agent_map = json.load(file)
+    except (OSError, ValueError) as e:
+      logging.error(f"Unable to read the agent map {spec}: {e}")
+      return list()
+    for group_i, group_spec in agent_map.items():
+      if isinstance(group_spec, list):
+        group_spec = {"ports": group_spec}
+      group = groups.setdefault(group_i, {"clock": group_spec.get("clock"), "ports": list()})
+      for port_i in group_spec.get("ports", list()):
+        if port_i in clocks and group["clock"] is None:
+          group["clock"] = port_i
+        elif port_i not in ports:
+          logging.warning(f"Agent map port {port_i} is not a DUT port, ignoring it")
+        elif not any(port_i in g["ports"] for g in groups.values()):
+          group["ports"].append(port_i)
+  if not groups:
+    return list()
+  grouped = {p for g in groups.values() for p in g["ports"]}
+  first_group = next(iter(groups.values()))
+  for port_i in ports:
+    if port_i not in grouped:
+      logging.info(f"{port_i} is in no agent group, adding it to the first one")
+      first_group["ports"].append(port_i)
+  group_list = list()
+  for group_i, group in groups.items():
+    if group["clock"] is None:
+      #Clock most of the group ports are sampled with, else the first clock
+      domains = Counter(port_clock[p] for p in group["ports"] if p in port_clock)
+      group["clock"] = domains.most_common(1)[0][0] if domains else clocks[0]
+    group_list.append({"name": re.sub(r"\W", "_", group_i), "clock": group["clock"], "ports": group["ports"]})
+  return [g for g in group_list if g["ports"]]
+
+"""
+Keeps a Gemini response in llm_cache, dropping the least recently used ones beyond llm_cache_size.
+
+Args:
+    prompt (str): The prompt
+    response (str): The response text
+
+Returns:
+    None
+"""
+def cache_llm_response(prompt, response):
+    llm_cache[prompt] = response
+    llm_cache.move_to_end(prompt)
+    while len(llm_cache) > llm_cache_size:
+        llm_cache.popitem(last=False)
+
 """
 Generates a driver/monitor/scoreboard logic using the Gemini model.
 
 This function sends a prompt to the Gemini model via its API and returns the
 generated response, or a default message if the communication fails.
+The SDK is imported on the first call so runs without -llm do not pay for it,
+and responses are cached by prompt. The prompt size, token counts (from the API
+usage metadata when available) and latency are recorded in llm_metrics. With
+llm_backend set the responses are recorded to, or replayed from, a JSONL file.
 
 Args:
     prompt (str): The text prompt to send to the Gemini model.
+    metrics (dict): Request details recorded with the measurements Eg: {"component": ...}
 
 Returns:
    str: The text from the LLM, if it fails returns a default message
 """
-def call_gemini(prompt):
+def call_gemini(prompt, metrics=None):
+    metrics = dict(metrics or {})
+    metrics.update({"prompt_chars": len(prompt), "prompt_tokens_est": estimate_tokens(prompt), "cached": prompt in llm_cache})
+    llm_metrics.append(metrics)
+    if prompt in llm_cache:
+        llm_cache.move_to_end(prompt)
+        return llm_cache[prompt]
+    prompt_key = hashlib.sha256(prompt.encode()).hexdigest()
+    if llm_backend.get("replay") is not None:
+        #Offline: answer from a recording made with --llm-record, with the recorded latency and tokens
+        recorded = llm_backend["replay"].get(prompt_key)
+        if recorded is None:
+            logging.error("No recorded Gemini response for this prompt")
+            return
+        metrics.update({k: recorded[k] for k in ("latency_ms", "prompt_tokens", "response_tokens") if k in recorded})
+        cache_llm_response(prompt, recorded["response"])
+        return recorded["response"]
+    start_time = time.time()
     try:
+        import google.generativeai as genai
         genai.configure(api_key="YOUR_API_KEY")
         model = genai.GenerativeModel("gemini-2.0-flash")
         response = model.generate_content(prompt);
+        metrics["latency_ms"] = (time.time() - start_time) * 1000
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            metrics["prompt_tokens"] = usage.prompt_token_count
+            metrics["response_tokens"] = usage.candidates_token_count
+        if llm_backend.get("record"):
+            with open(llm_backend["record"], "a") as file:
+                file.write(json.dumps({"prompt_sha256": prompt_key, "response": response.text,
+                                       **{k: metrics[k] for k in ("latency_ms", "prompt_tokens", "response_tokens") if k in metrics}}) + "\n")
+        cache_llm_response(prompt, response.text)
         return response.text
     except Exception as e:
         logging.error(f"Error communicating with Gemini: {e}")
         return
+    finally:
+        metrics.setdefault("latency_ms", (time.time() - start_time) * 1000)
+
+"""
+Estimates the number of LLM tokens of a text (about 4 characters per token).
+
+Args:
+    text (str): Prompt or response text
+
+Returns:
+    int: Estimated token count
+"""
+def estimate_tokens(text):
+    return -(-len(text) // 4)
+
+"""
+Strips a reference template down to its code lines (no comments, blank lines or indentation).
+
+Args:
+    template (str): Reference SystemVerilog template
+
+Returns:
+    str: Compacted template
+"""
+def compact_template(template):
+    lines = [l.strip() for l in template.splitlines()]
+    return "\n".join(l for l in lines if l and not l.startswith("//"))
+
+"""
+Summarizes the DUT for the LLM prompts instead of sending the whole design.
+
+The summary lists the parameters, the ports with their direction and type and the
+detected clocks and resets. The always blocks and continuous assignments referencing the
+ports are added, most relevant first, while the summary stays within the token budget.
+
+Args:
+    budget (int): Token budget of the summary
+
+Returns:
+    str: Structured design summary
+"""
+def summarize_design(budget):
+    clocks = [c.strip() for c in input_declarators if re.search(r".*.(pclk|clk|clock).*", str(c), re.IGNORECASE)]
+    resets = [r.strip() for r in input_declarators if re.search(r".*.(reset|rst).*", str(r), re.IGNORECASE)]
+    lines = ["module: "+str(dut_design_file.header.name).strip()]
+    if param_list:
+        lines.append("parameters: "+" ".join(p.strip() for p in param_list))
+    for direction, declarators in (("input", input_declarators), ("output", output_declarators)):
+        for port_i in declarators:
+            lines.append(f"{direction} {port_dtype_map.get(port_i.strip(), '')} {port_i.strip()}".replace("  ", " "))
+    lines.append("clocks: "+(", ".join(clocks) or "none"))
+    lines.append("resets: "+(", ".join(resets) or "none"))
+    summary = "\n".join(lines)
+    port_names = {p.strip() for p in all_declarators} - set(clocks)
+    blocks = list()
+    for member_i in getattr(dut_design_file, "members", list()):
+        if member_i.kind.name in ("AlwaysBlock", "AlwaysFFBlock", "AlwaysCombBlock", "AlwaysLatchBlock", "ContinuousAssign"):
+            block = re.sub(r"\s+", " ", re.sub(r"//[^\n]*", "", str(member_i))).strip()
+            hits = len(port_names & set(re.findall(r"\w+", block)))
+            if hits:
+                blocks.append((hits, block))
+    added = 0
+    for _, block in sorted(blocks, key=lambda b: -b[0]):
+        if estimate_tokens(summary + "\n" + block) > budget:
+            continue
+        if not added:
+            summary += "\nrelevant logic:"
+        summary += "\n" + block
+        added += 1
+    if added < len(blocks):
+        logging.info(f"Prompt budget: {added} of {len(blocks)} logic blocks included in the design summary")
+    return summary
+
+"""
+Builds a compact LLM prompt for a generated component.
+
+Args:
+    component (str): Component kind Eg: driver
+    template (str): Reference template the response must follow
+    instructions (str): Task specific instructions
+    budget (int): Token budget of the whole prompt
+
+Returns:
+    str: The prompt
+"""
+def build_llm_prompt(component, template, instructions, budget):
+    head = f"Generate the SystemVerilog UVM {component} for the design summarized below, following the structure of this reference {component}:\n{compact_template(template)}\n"
+    remaining = budget - estimate_tokens(head + instructions)
+    if remaining <= 0:
+        logging.warning(f"The {component} template alone exceeds the prompt budget of {budget} tokens")
+    prompt = f"{head}\nDesign summary:\n{summarize_design(max(remaining, 0))}\n\n{instructions}"
+    return prompt
+
+"""
+Checks LLM generated SystemVerilog with pyslang before it is written.
+
+The code is parsed in-process (with the UVM macros when the uvm_verilator library is
+found, otherwise the unknown `uvm_* macro diagnostics are ignored) and must declare the
+expected class with its build_phase and run_phase.
+
+Args:
+    code (str): Generated code
+    class_name (str): Class the code must declare
+
+Returns:
+    list: Problems found (parser diagnostics and missing declarations), empty when the code is fine
+"""
+def check_llm_code(code, class_name):
+    options = pyslang.PreprocessorOptions()
+    header = ""
+    uvm_root = find_uvm_root()
+    if uvm_root:
+        options.additionalIncludePaths = [os.path.join(uvm_root, "src")]
+        header = "`include \"uvm_macros.svh\"\n`line 1 \""+class_name+".sv\" 0\n"
+    source_manager = pyslang.SourceManager()
+    tree = pyslang.SyntaxTree.fromText(header + code, source_manager, class_name+".sv", "", pyslang.Bag([options]))
+    errors = [d for d in tree.diagnostics if d.isError()]
+    if not uvm_root:
+        #Without the UVM library every `uvm_* macro is unknown, that says nothing about the code
+        errors = [d for d in errors if not (d.code == pyslang.Diags.UnknownDirective and d.args and str(d.args[0]).startswith("`uvm_"))]
+    problems = [l for l in pyslang.DiagnosticEngine.reportAll(source_manager, errors).splitlines() if l.strip()] if errors else list()
+    declared = set()
+    def collect_names(node):
+        if node.kind.name == "ClassDeclaration":
+            declared.add(("class", node.name.valueText))
+        elif node.kind.name in ("TaskDeclaration", "FunctionDeclaration"):
+            declared.add((node.kind.name, str(node.prototype.name).strip().split("::")[-1]))
+        return pyslang.VisitAction.Advance
+    tree.root.visit(collect_names)
+    for kind, name in (("class", class_name), ("FunctionDeclaration", "build_phase"), ("TaskDeclaration", "run_phase")):
+        if (kind, name) not in declared:
+            problems.append(f"missing {kind.replace('Declaration', '').lower()} {name}")
+    return problems
+
+"""
+Requests code from the LLM and gates it with check_llm_code.
+
+Code that does not parse or misses the expected declarations is sent back with the
+diagnostics, up to retries times. When no valid code comes back the caller falls back
+to the non-LLM template, so broken code never reaches the build.
+
+Args:
+    prompt (str): The prompt
+    metrics (dict): Request details recorded in llm_metrics
+    class_name (str): Class the code must declare
+    retries (int): Number of re-prompts after the first request
+
+Returns:
+    str: Valid code without markdown fences, None to use the template
+"""
+def generate_llm_code(prompt, metrics, class_name, retries):
+    request = prompt
+    for attempt in range(retries + 1):
+        code = call_gemini(request, {**metrics, "attempt": attempt + 1})
+        if code is None:
+            llm_metrics[-1]["check"] = "no response"
+            break
+        code = re.sub(r"```systemverilog\n?", "", code)  # Remove opening marker
+        code = re.sub(r"```\n?", "", code)                # Remove closing marker
+        problems = check_llm_code(code, class_name)
+        llm_metrics[-1]["check"] = f"{len(problems)} problems" if problems else "ok"
+        if not problems:
+            return code
+        logging.warning(f"LLM {class_name} attempt {attempt + 1} rejected: {problems[0]}")
+        request = f"{prompt}\n\nYour previous answer was rejected by the SystemVerilog parser:\n" + "\n".join(problems[:20]) + \
+                  f"\n\nPrevious answer:\n{code}\n\nReturn the complete corrected code only."
+    logging.warning(f"No valid LLM code for {class_name}, using the template")
+    return None
+
+"""
+Generates several components with one structured LLM request.
+
+The generated templates of the components are sent as references together with the
+design context (paid once instead of once per component), and the answer must be a
+JSON object mapping each class name to its code. Every class is gated with
+check_llm_code and overwrites its template file; rejected classes are requested again
+with their diagnostics, up to retries times, and keep the template otherwise.
+
+Args:
+    components (list): (class name, file path) of the components, the files hold their templates
+    prompt_budget (int): Token budget of the compact prompt, 0 sends the full design and templates
+    retries (int): Number of re-prompts after the first request
+
+Returns:
+    list: Class names generated by the LLM
+"""
+@timed_emitter
+def create_llm_components(components, prompt_budget, retries):
+    templates = dict()
+    for class_name, path in components:
+        with open(path) as file:
+            templates[class_name] = file.read()
+    names = list(templates)
+    instructions = f"Answer with one JSON object mapping each class name ({', '.join(names)}) to its complete SystemVerilog code, and nothing else. No comments. No explanation."
+    if any(n == monitor_name for n in names):
+        instructions = f"The monitor publishes to mon_aport only on cycles where any of {', '.join(q for q, _ in qualifier_list) or 'the sampled values'} is asserted or the sampled values change. " + instructions
+    shape = compact_template if prompt_budget else (lambda t: t)
+    references = "".join(f"Reference {n}:\n{shape(templates[n])}\n\n" for n in names)
+    head = f"Generate the SystemVerilog UVM classes {', '.join(names)} for the design below, each following the structure of its reference.\n\n{references}"
+    if prompt_budget:
+        design = "Design summary:\n" + summarize_design(max(prompt_budget - estimate_tokens(head + instructions), 0))
+    else:
+        design = f"DUT code:\n{dut_design_file}"
+    prompt = f"{head}{design}\n\n{instructions}"
+    #Size of the same context sent once per component
+    separate_tokens = sum(estimate_tokens(shape(templates[n]) + design + instructions) for n in names)
+    pending = names
+    request = prompt
+    for attempt in range(retries + 1):
+        answer = call_gemini(request, {"component": "batch: "+", ".join(pending), "full_tokens_est": separate_tokens if attempt == 0 else estimate_tokens(request), "attempt": attempt + 1})
+        if answer is None:
+            llm_metrics[-1]["check"] = "no response"
+            break
+        answer = re.sub(r"```(json)?\n?", "", answer)
+        try:
+            codes = json.loads(answer[answer.find("{"):answer.rfind("}") + 1])
+        except ValueError as e:
+            codes = dict()
+            logging.warning(f"LLM batch attempt {attempt + 1} is not valid JSON: {e}")
+        problems = dict()
+        for class_name in pending:
+            code = codes.get(class_name)
+            if not isinstance(code, str):
+                problems[class_name] = ["missing from the JSON answer"]
+                continue
+            code = re.sub(r"```(systemverilog)?\n?", "", code)
+            class_problems = check_llm_code(code, class_name)
+            if class_problems:
+                problems[class_name] = class_problems
+                continue
+            with open(dict(components)[class_name], "w") as file:
+                file.write(code)
+            logging.info(f"Successfully Created -> {dict(components)[class_name]} (LLM)")
+        llm_metrics[-1]["check"] = f"{len(problems)} rejected" if problems else "ok"
+        pending = list(problems)
+        if not pending:
+            break
+        request = f"{prompt}\n\nThese classes of your previous answer were rejected:\n" + \
+                  "\n".join(f"{n}: " + "; ".join(p[:10]) for n, p in problems.items()) + \
+                  f"\n\nAnswer again with one JSON object for {', '.join(pending)} only."
+    for class_name in pending:
+        logging.warning(f"No valid LLM code for {class_name}, keeping the template")
+    return [n for n in names if n not in pending]
+
+"""
+Loads a Gemini recording made with --llm-record for offline replay.
+
+Args:
+    record_path (str): JSONL recording
+
+Returns:
+    dict: Prompt sha256 -> recorded entry (the last one wins)
+"""
+def load_llm_recording(record_path):
+    recording = dict()
+    with open(record_path) as file:
+        for line in file:
+            if line.strip():
+                entry = json.loads(line)
+                recording[entry["prompt_sha256"]] = entry
+    return recording
+
+"""
+Prints the LLM request metrics and the prompt size comparison and saves them as JSON.
 
+Args:
+    tb_path(str)  : path to the tb folder
 
+Returns:
+    None
+"""
+def report_llm_metrics(tb_path):
+    rows = list()
+    for metrics_i in llm_metrics:
+        full_tokens = metrics_i.get("full_tokens_est", metrics_i["prompt_tokens_est"])
+        rows.append([metrics_i.get("component", ""), full_tokens, metrics_i["prompt_tokens_est"],
+                     f"{100.0 * (full_tokens - metrics_i['prompt_tokens_est']) / full_tokens:.1f}%" if full_tokens else "",
+                     metrics_i.get("prompt_tokens", ""), metrics_i.get("response_tokens", ""),
+                     f"{metrics_i.get('latency_ms', 0):.0f}", metrics_i["cached"], metrics_i.get("check", "")])
+    print(f'LLM requests: \n {tabulate(rows, headers=["Component", "Full prompt (est)", "Sent prompt (est)", "Reduction", "Prompt tokens", "Response tokens", "Latency ms", "Cached", "Check"])}')
+    report_path = os.path.join(tb_path, "llm_report.json")
+    with open(report_path, "w") as file:
+        json.dump(llm_metrics, file, indent=2)
+    logging.info(f"Successfully Created -> {report_path}")
 
 """
 Creates a SystemVerilog interface file based on the provided port data.
@@ -188,6 +1008,7 @@ Args:
 Returns:
     None
 """
+@timed_emitter
 def create_interface(port_list,dut_name,tb_path,verilator_mode):
   l_intf_file_name=f"{dut_name.strip()}_interface.sv"
   global interface_name
@@ -199,60 +1020,18 @@ def create_interface(port_list,dut_name,tb_path,verilator_mode):
     if re.search(r".*.(pclk|clk|clock).*",str(j) , re.IGNORECASE):
       only_clk.append(j)
   ports = ", ".join(only_clk)
+  declarations = [sweep_parameters(p) for p in param_list] if param_flag else list()
+  for l_ports in port_list:
+    if l_ports not in cr_list:
+      tb_interface_input = str(l_ports).replace("input","logic").replace("output reg","logic").replace("output","logic");
+      if not re.search(r".*.(pclk|clk|clock).*",str(tb_interface_input), re.IGNORECASE):
+        declarations.append(tb_interface_input)
   with open(l_intf_path,"a+") as file:
-    file.write("\ninterface "+interface_name+" (input logic "+ports+");\n")
-    if(param_flag):
-      for parameter_i in param_list:
-        file.write(parameter_i)
-    for l_ports in port_list:
-      if l_ports not in cr_list:
-        tb_interface_input = str(l_ports).replace("input","logic").replace("output reg","logic").replace("output","logic");
-        if not re.search(r".*.(pclk|clk|clock).*",str(tb_interface_input), re.IGNORECASE):
-          file.write(tb_interface_input)
-    file.write("\n//--------------------------------------")
-    file.write("\n//Driver Clocking Block")
-    file.write("\n//--------------------------------------")
-    single_clk = None
-    for clk_i in only_clk:    
-      single_clk = clk_i.strip()
-      file.write("\nclocking driver_cb @(posedge "+single_clk+");")
-      
-    
-    file.write("\n\tdefault input #1 output #1;\n")
-    out_drv_ports = ""
-    in_drv_ports = ""
-    for drv_ports in input_declarators:
-      if drv_ports not in cr_list:
-        in_drv_ports += f"\toutput {drv_ports};\n"
-    for drv_out_ports in output_declarators:
-      out_drv_ports += f"\tinput {drv_out_ports};\n"
-    file.write(in_drv_ports)
-    file.write(out_drv_ports)
-    file.write("\nendclocking //driver_cb")
-
-    file.write("\n//--------------------------------------")
-    file.write("\n//Monitor Clocking Block")
-    file.write("\n//--------------------------------------")
-    file.write("\nclocking monitor_cb @(posedge "+single_clk+");")
-    file.write("\ndefault input #1 output #1;\n")
-    all_mon_ports = ""
-    for mon_ports in all_declarators:
-      if mon_ports not in cr_list:
-        all_mon_ports+= f"\tinput {mon_ports};\n"
-    file.write(all_mon_ports)
-    file.write("\nendclocking //monitor_cb")
-
-    if not verilator_mode:
-      file.write("\n//--------------------------------------")
-      file.write("\n//Driver Modport")
-      file.write("\n//--------------------------------------")
-      file.write("\nmodport DRIVER  (clocking driver_cb,input "+ports+");\n")
-      file.write("\n//--------------------------------------")
-      file.write("\n//Monitor Modport")
-      file.write("\n//--------------------------------------")
-      file.write("\nmodport MONITOR (clocking monitor_cb,input "+ports+");\n")
-
-    file.write("\nendinterface //" +interface_name)
+    file.write(render_template("interface.sv.tpl", interface_name=interface_name, ports=ports, verilator_mode=verilator_mode,
+                               declarations=declarations, clocks=[c.strip() for c in only_clk],
+                               driver_outputs=[d for d in input_declarators if d not in cr_list],
+                               driver_inputs=output_declarators,
+                               monitor_inputs=[d for d in all_declarators if d not in cr_list]))
   logging.info(f"Successfully Created -> {l_intf_path}")
 #End of create_interface
 
@@ -269,6 +1048,7 @@ Args:
 Returns:
     None
 """
+@timed_emitter
 def create_seqitem(port_list,dut_name,tb_path):
   #http://www.sunburst-design.com/papers/CummingsSNUG2014SV_UVM_Transactions.pdf
   #Defining the excluded signal list
@@ -278,60 +1058,18 @@ def create_seqitem(port_list,dut_name,tb_path):
   seq_item_name =f"{dut_name.strip()}_seq_item"
   global l_seq_path
   l_seq_path =os.path.join(tb_path,l_seq_file_name)
+  declarations = [sweep_parameters(p) for p in param_list] if param_flag else list()
+  for l_ports in port_list:
+    if any(excluded_signal.lower() in str(l_ports).lower() for excluded_signal in excluded_signals):
+      logging.debug(f"Excluding signal: {l_ports}")
+      continue
+    declarations.append(str(l_ports).replace("input","rand bit").replace("output reg","bit").replace("output","bit"))
+  for seq_i_ports in input_declarators:
+    if seq_i_ports not in cr_list:
+      ex_cr.append(seq_i_ports.strip())
   with open(l_seq_path,"a+") as file:
-    file.write("//(0) Create a class extending from uvm_sequence_item\n")
-    file.write("//(1) Register class with Factory\n")
-    file.write("//(2) Declare transaction varaiable\n")
-    file.write("//(3) Construct the created class with new()\n") 
-    file.write("//(4) Add constraints [if any]\n")
-    file.write("class "+ seq_item_name + " extends uvm_sequence_item;\n")
-    file.write("\n`uvm_object_utils("+seq_item_name+")\n")
-    if(param_flag):
-      for parameter_j in param_list:
-        file.write(parameter_j)
-    for l_ports in port_list:
-      if any(excluded_signal.lower() in str(l_ports).lower() for excluded_signal in excluded_signals):
-        logging.debug(f"Excluding signal: {l_ports}")
-        continue
-      tb_seq_input = str(l_ports).replace("input","rand bit").replace("output reg","bit").replace("output","bit");
-      file.write(tb_seq_input)
-
-    file.write("\n")
-    file.write("\nextern function new( string name = \""+seq_item_name +"\");\n")
-    file.write("//extern constraint WRITE_YOUR_OWN_CONSTRAINT;")    
-    file.write("\nextern function string input2string();")
-    file.write("\nextern function string output2string();")
-    file.write("\nextern function string convert2string();\n")
-    file.write("\nendclass //" +seq_item_name)
-
-    file.write("\n")
-    file.write("\nfunction "+seq_item_name+"::new( string name = \""+seq_item_name +"\");")
-    file.write("\n super.new( name );")
-    file.write("\nendfunction : new")
-    file.write("\n")
-    file.write("\n//constraint "+ seq_item_name+"::WRITE_YOUR_OWN_CONSTRAINT{ a!= b; };\n")
-    #Input to String
-    file.write("\nfunction string "+seq_item_name+"::input2string();\n")
-    in_first_half = ""
-    for seq_i_ports in input_declarators:
-      if seq_i_ports not in cr_list:
-        ex_cr.append(seq_i_ports.strip())
-    in_first_half='=%0h,'.join(ex_cr)
-    in_first_half += "=%0h"
-    second_half =','.join(ex_cr)
-    file.write(" return $sformatf(\""+in_first_half+"\","+second_half+");")
-    file.write("\nendfunction : input2string\n")
-    #Output to String
-    file.write("\nfunction string "+seq_item_name+"::output2string();\n")
-    out_first_half='=%0h,'.join(output_declarators)
-    out_first_half += "=%0h"
-    out_second_half =','.join(output_declarators)
-    file.write(" return $sformatf(\""+out_first_half+"\","+out_second_half+");")
-    file.write("\nendfunction : output2string\n")
-    #Convert to string
-    file.write("\nfunction string "+seq_item_name+"::convert2string();\n")
-    file.write(" return ({input2string(), \" \", output2string()});")
-    file.write("\nendfunction : convert2string")
+    file.write(render_template("seq_item.sv.tpl", seq_item_name=seq_item_name, declarations=declarations,
+                               inputs=ex_cr, outputs=output_declarators))
   logging.info(f"Successfully Created -> {l_seq_path}")
 
 #End of create_seqitem
@@ -349,30 +1087,14 @@ Args:
 Returns:
     None
 """
+@timed_emitter
 def create_sequence(dut_name,tb_path):
   l_sequence_file_name=f"{dut_name.strip()}_base_sequence.sv"
   global seq_name
   seq_name=f"{dut_name.strip()}_base_sequence"
   l_sequence_path =os.path.join(tb_path,l_sequence_file_name)
   with open(l_sequence_path,"a+") as file:
-    file.write("class "+ seq_name+ " extends uvm_sequence#("+seq_item_name+");\n")
-    file.write("\n`uvm_object_utils("+seq_name+")\n")
-    file.write(seq_item_name+" req;\n")
-    file.write("\nextern function new( string name = \""+seq_name+"\");")
-    file.write("\nextern task body();\n")
-    file.write("\nendclass //" +seq_name)
-    file.write("\n")
-    file.write("\nfunction "+seq_name+"::new(string name = \""+seq_name+"\");")
-    file.write("\n super.new( name );")
-    file.write("\nendfunction : new\n")
-    file.write("\ntask "+seq_name+"::body();\n")
-    file.write("`uvm_info(get_type_name(), $sformatf(\"Start of " +seq_name + " Sequence\"), UVM_LOW)")
-    file.write("\nreq = "+seq_item_name+":: type_id :: create(\"req\");\n")
-    file.write("repeat(5) begin //{\n")
-    file.write("\t`uvm_do(req)\n")
-    file.write("end //}\n")
-    file.write("`uvm_info(get_type_name(), $sformatf(\"End of " +seq_name + " Sequence\"), UVM_LOW)\n")
-    file.write("\nendtask //"+seq_name)
+    file.write(render_template("base_sequence.sv.tpl", seq_name=seq_name, seq_item_name=seq_item_name))
 
   logging.info(f"Successfully Created -> {l_sequence_path}")
 
@@ -392,28 +1114,14 @@ Args:
 Returns:
     None
 """
+@timed_emitter
 def create_seqr(dut_name,tb_path, verilator_mode):
   seqr_file_name=f"{dut_name.strip()}_sequencer.sv"
   global seqr_name
   seqr_name=f"{dut_name.strip()}_sequencer"
   l_seqr_path =os.path.join(tb_path,seqr_file_name)
   with open(l_seqr_path,"a+") as file:
-    if verilator_mode:
-      file.write("class "+ seqr_name + " extends uvm_sequencer#("+seq_item_name+","+seq_item_name+");\n")
-    else:
-      file.write("class "+ seqr_name + " extends uvm_sequencer#("+seq_item_name+");\n")
-    file.write("\n`uvm_component_utils("+seqr_name+")\n")
-    file.write("\nextern function new( string name = \""+seqr_name+"\",uvm_component parent=null);\n")
-    file.write("extern function void build_phase(uvm_phase phase);\n")
-    file.write("\nendclass //" +seqr_name)
-    file.write("\n")
-    file.write("\nfunction "+seqr_name+"::new(string name,uvm_component parent);")
-    file.write("\n super.new(name,parent);")
-    file.write("\nendfunction : new\n")
-    file.write("\nfunction void "+seqr_name+"::build_phase(uvm_phase phase);")
-    file.write("\n super.build_phase(phase);")
-    file.write("\n `uvm_info(get_type_name(),\"In Build Phase ...\",UVM_NONE)")
-    file.write("\nendfunction : build_phase\n")
+    file.write(render_template("sequencer.sv.tpl", seqr_name=seqr_name, seq_item_name=seq_item_name, verilator_mode=verilator_mode))
   logging.info(f"Successfully Created -> {l_seqr_path}")
 #End of create_seqr
 
@@ -427,101 +1135,66 @@ Args:
     dut_name (str): Name of the Design Under Test (DUT)
     tb_path(str)  : path to the tb folder
     llm_enabled(bool): enables if gemini should be used
+    prompt_budget(int): Token budget of the compact LLM prompt, 0 sends the full design and template
+    llm_retries(int): Re-prompts when the LLM code fails the syntax check before using the template
 Returns:
     None
 """
-def create_driver(dut_name,tb_path,llm_enabled):
+@timed_emitter
+def create_driver(dut_name,tb_path,llm_enabled,prompt_budget=0,llm_retries=2):
   driver_file_name=f"{dut_name.strip()}_driver.sv"
   global driver_name
   driver_name=f"{dut_name.strip()}_driver"
   global l_driver_path
   l_driver_path =os.path.join(tb_path,driver_file_name)
-  driver_temp_content = f"""class {driver_name} extends uvm_driver#({seq_item_name});
-`uvm_component_utils({driver_name})
-
-virtual {interface_name} vif;
-
-extern function new( string name = "{driver_name}",uvm_component parent);
-extern function void build_phase(uvm_phase phase);
-extern virtual task run_phase(uvm_phase phase);
-
-endclass // {driver_name}
-
+  resets = list()
+  if reg_list:
+    #Register bus access: request for one cycle, then wait for the read data
+    for rst_i in (r.strip() for r in input_declarators if re.search(r"(reset|rst)", r, re.IGNORECASE)):
+      resets.append((rst_i, bool(re.search(r"(_n|_b|n)$", rst_i, re.IGNORECASE))))
+  driver_template = render_template("driver.sv.tpl", driver_name=driver_name, seq_item_name=seq_item_name, interface_name=interface_name,
+                                    resets=resets, clock=only_clk[0].strip() if only_clk else "clk",
+                                    reg_bus=reg_bus if reg_list else dict(),
+                                    bus_inputs=[reg_bus[r] for r in ("addr", "wdata", "write", "read") if r in reg_bus],
+                                    bus_strobes=[reg_bus[r] for r in ("write", "read") if r in reg_bus])
+  driver_logic = None
+  if llm_enabled:
+    prompt = f"Goal is to generate uvm driver for the given design. I will provide the reference uvm driver, please make sure you follow the same template. Here is the uvm driver {driver_template}. Given the following DUT code:\n\n{dut_design_file}\n\n" \
+    f"Understand the design and consider the input ports {', '.join(input_declarators)} and output ports {', '.join(output_declarators)}. Based on your understanding, generate ONLY the SystemVerilog UVM driver code.Do not include any comments or explanations. Output only the code.No comments. No explanation. No header or footer."
+    full_prompt = prompt
+    if prompt_budget:
+      prompt = build_llm_prompt("driver", driver_template,
+                                "Generate ONLY the SystemVerilog UVM driver code. Output only the code. No comments. No explanation. No header or footer.", prompt_budget)
+    driver_logic = generate_llm_code(prompt, {"component": driver_name, "full_tokens_est": estimate_tokens(full_prompt)}, driver_name, llm_retries)
+  with open(l_driver_path,"a+") as file:
+    file.write(driver_template if driver_logic is None else driver_logic)
 
-function {driver_name}::new(string name,uvm_component parent);
- super.new(name,parent);
-endfunction : new
+  logging.info(f"Successfully Created -> {l_driver_path}")
 
-function void {driver_name}::build_phase(uvm_phase phase);
- super.build_phase(phase);
+#End of create_driver
 
- `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)
-	if(!uvm_config_db#(virtual {interface_name})::get(this, "", "vif", vif))
-		begin
-		`uvm_fatal("NO_VIF",{{"virtual interface must be set for:" ,get_full_name(),".vif"}});
-		end
-endfunction : build_phase
+"""
+Derives the record layout of the binary transaction trace written by the monitor.
 
-task {driver_name}::run_phase(uvm_phase phase);
-	super.run_phase(phase);
+Every record starts with the 64 bit simulation time followed by one slot per field,
+each rounded up to 32 bit words as written by $fwrite("%u"). The layout is written as a
+JSON line in the trace header so the reader does not depend on the generated files.
 
- `uvm_info(get_type_name(),"In Run Phase ...",UVM_NONE)
-	forever begin //{{
-		{seq_item_name} tr;
-		seq_item_port.get_next_item(tr);
-		uvm_report_info(get_type_name(), $sformatf("Got Input Transaction %s",tr.input2string()));
-		//Driver Logic
-		uvm_report_info(get_type_name(), $sformatf("Got Response %s",tr.output2string()));
-		seq_item_port.item_done(tr);
-	end //}}
+Args:
+    mon_sigs (list): Fields of the sequence item sampled by the monitor
 
-endtask: run_phase
+Returns:
+    dict: Trace layout
 """
-  if llm_enabled:
-    prompt = f"Goal is to generate uvm driver for the given design. I will provide the reference uvm driver, please make sure you follow the same template. Here is the uvm driver {driver_temp_content}. Given the following DUT code:\n\n{dut_design_file}\n\n" \
-    f"Understand the design and consider the input ports {', '.join(input_declarators)} and output ports {', '.join(output_declarators)}. Based on your understanding, generate ONLY the SystemVerilog UVM driver code.Do not include any comments or explanations. Output only the code.No comments. No explanation. No header or footer."
-    driver_logic = call_gemini(prompt)
-    driver_logic = re.sub(r"```systemverilog\n?", "", driver_logic)  # Remove opening marker
-    driver_logic= re.sub(r"```\n?", "", driver_logic)              # Remove closing marker    
-    with open(l_driver_path,"a+") as file:
-      file.write(driver_logic)
-  else:
-    with open(l_driver_path,"a+") as file:
-      file.write("\nclass "+ driver_name+ " extends uvm_driver#("+seq_item_name+");\n")
-      file.write("\n`uvm_component_utils("+driver_name+")\n")
-      file.write("\nvirtual "+interface_name+" vif;\n")
-      file.write("\nextern function new( string name = \""+driver_name+"\",uvm_component parent);\n")
-      file.write("extern function void build_phase(uvm_phase phase);\n")
-      file.write("extern virtual task run_phase(uvm_phase phase);\n")
-      file.write("\nendclass //" +driver_name)
-      file.write("\n")
-      file.write("\nfunction "+driver_name+"::new(string name,uvm_component parent);")
-      file.write("\n super.new(name,parent);")
-      file.write("\nendfunction : new\n")
-      file.write("\nfunction void "+driver_name+"::build_phase(uvm_phase phase);")
-      file.write("\n super.build_phase(phase);\n")
-      file.write("\n `uvm_info(get_type_name(),\"In Build Phase ...\",UVM_NONE)\n")
-      file.write("\tif(!uvm_config_db#(virtual "+interface_name+")::get(this, \"\", \"vif\", vif))\n")
-      file.write("\t\tbegin\n")
-      file.write("\t\t`uvm_fatal(\"NO_VIF\",{\"virtual interface must be set for: \",get_full_name(),\".vif\"});\n")
-      file.write("\t\tend")
-      file.write("\nendfunction : build_phase\n")
-      file.write("\ntask "+driver_name+"::run_phase(uvm_phase phase);\n")
-      file.write("\tsuper.run_phase(phase);\n")
-      file.write("\n `uvm_info(get_type_name(),\"In Run Phase ...\",UVM_NONE)\n")
-      file.write("\tforever begin //{\n")
-      file.write("\t\t"+seq_item_name +" tr;\n")
-      file.write("\t\tseq_item_port.get_next_item(tr);\n")
-      file.write("\t\tuvm_report_info(get_type_name(), $sformatf(\"Got Input Transaction %s\",tr.input2string()));\n")
-      file.write("\t\t// Add your driver logic here using the transaction variable tr.\n")
-      file.write("\t\tuvm_report_info(get_type_name(), $sformatf(\"Got Response %s\",tr.output2string()));\n")
-      file.write("\t\tseq_item_port.item_done(tr);\n")
-      file.write("\tend //}\n")
-      file.write("\nendtask: run_phase\n")
-
-  logging.info(f"Successfully Created -> {l_driver_path}")
-
-#End of create_driver
+def trace_layout(mon_sigs):
+  fields = list()
+  for sig_i in mon_sigs:
+    width = eval_width(port_dtype_map.get(sig_i, ""))
+    if width is None:
+      logging.warning(f"Unable to evaluate the width of {sig_i}, tracing it as 64 bits")
+      width = 64
+    fields.append({"name": sig_i, "width": width, "bytes": 4 * -(-width // 32)})
+  return {"version": 1, "fields": fields}
 
 """
 Creates a SystemVerilog monitor file based on the sequence item and interface.
@@ -533,106 +1206,39 @@ to broadcast data for the coverage and scoreboard.
 Args:
     dut_name (str): Name of the Design Under Test (DUT)
     tb_path(str)  : path to the tb folder
+    llm_enabled(bool): enables if gemini should be used
+    verilator_mode(bool): check for verilator mode
+    trace_suffix(str): Appended to the +TRACE_BIN file name, keeps the traces of several monitors apart
+    prompt_budget(int): Token budget of the compact LLM prompt, 0 sends the full design and template
+    llm_retries(int): Re-prompts when the LLM code fails the syntax check before using the template
 Returns:
     None
 """
-def create_monitor(dut_name,tb_path,llm_enabled):
+@timed_emitter
+def create_monitor(dut_name,tb_path,llm_enabled,verilator_mode,trace_suffix="",prompt_budget=0,llm_retries=2):
   monitor_file_name=f"{dut_name.strip()}_monitor.sv"
   global monitor_name
   monitor_name=f"{dut_name.strip()}_monitor"
   global l_monitor_path
   l_monitor_path =os.path.join(tb_path,monitor_file_name)
-  monitor_logic_temp = f"""
-class {monitor_name} extends uvm_monitor;
-
-uvm_analysis_port#({seq_item_name}) mon_aport;
-{seq_item_name} rx;
-
-`uvm_component_utils({monitor_name})
-
-virtual {interface_name} vif;
-
-extern function new( string name = "{monitor_name}",uvm_component parent);
-extern function void build_phase(uvm_phase phase);
-extern virtual task run_phase(uvm_phase phase);
-
-endclass //{monitor_name}
-
-function {monitor_name}::new(string name,uvm_component parent);
-	super.new(name,parent);
-	mon_aport=new("mon_aport", this);
-endfunction : new
-
-function void {monitor_name}::build_phase(uvm_phase phase);
- super.build_phase(phase);
-
- `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)	'
- if(!uvm_config_db#(virtual {interface_name})::get(this, "", "vif", vif))
-		begin
-		`uvm_fatal("NO_MON_VIF",{{"virtual interface must be set for: ",get_full_name(),".vif"}});
-		end
-endfunction : build_phase
-
-task {monitor_name}::run_phase(uvm_phase phase);
-	super.run_phase(phase);
-
- `uvm_info(get_type_name(),"In Run Phase ...",UVM_NONE)
-
-	rx={seq_item_name}::type_id::create("rx",this);
-	forever begin //
-	//Monitor Logic
-    mon_analysis_port.write(rx);
-    end
-  endtask
-	uvm_report_info(get_type_name(), $sformatf("Printing Transaction %s",rx.convert2string()));
-		mon_aport.write(rx);
-	end
-
-endtask: run_phase
-"""
+  mon_sigs = ex_cr + [o.strip() for o in output_declarators]
+  layout = trace_layout(mon_sigs)
+  monitor_template = render_template("monitor.sv.tpl", monitor_name=monitor_name, seq_item_name=seq_item_name, interface_name=interface_name,
+                                     verilator_mode=verilator_mode, signals=mon_sigs, qualifiers=qualifier_list,
+                                     trace_suffix=trace_suffix, trace_fields=layout["fields"],
+                                     trace_header=json.dumps(layout).replace('"', '\\"'))
+  monitor_logic = None
+  if llm_enabled:
+    prompt = f"Given the following DUT code:\n\n{dut_design_file}\n\n" \
+    f"and the input ports {', '.join(input_declarators)} and output ports {', '.join(output_declarators)}, publish to mon_aport only on cycles where any of {', '.join(q for q, _ in qualifier_list) or 'the sampled values'} is asserted or the sampled values change, and please keep {monitor_template} as reference and create the response using the same template andunderstand the design and generate ONLY the SystemVerilog UVM monitor code for the design.  Do not include any comments or explanations. Output only the code . No comments. No explanation. No header or footer."
+    full_prompt = prompt
+    if prompt_budget:
+      prompt = build_llm_prompt("monitor", monitor_template,
+                                f"Publish to mon_aport only on cycles where any of {', '.join(q for q, _ in qualifier_list) or 'the sampled values'} is asserted or the sampled values change. "
+                                "Generate ONLY the SystemVerilog UVM monitor code. Output only the code. No comments. No explanation. No header or footer.", prompt_budget)
+    monitor_logic = generate_llm_code(prompt, {"component": monitor_name, "full_tokens_est": estimate_tokens(full_prompt)}, monitor_name, llm_retries)
   with open(l_monitor_path,"a+") as file:
-    if llm_enabled:
-         prompt = f"Given the following DUT code:\n\n{dut_design_file}\n\n" \
-         f"and the input ports {', '.join(input_declarators)} and output ports {', '.join(output_declarators)}, and please keep {monitor_logic_temp} as reference and create the response using the same template andunderstand the design and generate ONLY the SystemVerilog UVM monitor code for the design.  Do not include any comments or explanations. Output only the code . No comments. No explanation. No header or footer."
-         monitor_logic = call_gemini(prompt)
-         monitor_logic = re.sub(r"```systemverilog\n?", "", monitor_logic)  # Remove opening marker
-         monitor_logic = re.sub(r"```\n?", "", monitor_logic)              # Remove closing marker    
-         file.write(monitor_logic)
-    else:
-         file.write("`define MON_VIF vif.MONITOR.monitor_cb")
-         file.write("\nclass "+ monitor_name+ " extends uvm_monitor;\n")
-         file.write("\nuvm_analysis_port#("+seq_item_name+") mon_aport;")
-         file.write("\n"+seq_item_name +" rx;\n")
-         file.write("\n`uvm_component_utils("+monitor_name+")\n")
-         file.write("\nvirtual "+interface_name+" vif;\n")
-         file.write("\nextern function new( string name = \""+monitor_name+"\",uvm_component parent);\n")
-         file.write("extern function void build_phase(uvm_phase phase);\n")
-         file.write("extern virtual task run_phase(uvm_phase phase);\n")
-         file.write("\nendclass //" +monitor_name)
-         file.write("\n")
-         file.write("\nfunction "+monitor_name+"::new(string name,uvm_component parent);\n")
-         file.write("\tsuper.new(name,parent);\n")
-         file.write("\tmon_aport=new(\"mon_aport\", this);")
-         file.write("\nendfunction : new\n")
-         file.write("\nfunction void "+monitor_name+"::build_phase(uvm_phase phase);")
-         file.write("\n super.build_phase(phase);\n")
-         file.write("\n `uvm_info(get_type_name(),\"In Build Phase ...\",UVM_NONE)")
-         file.write("\tif(!uvm_config_db#(virtual "+interface_name+")::get(this, \"\", \"vif\", vif))\n")
-         file.write("\t\tbegin\n")
-         file.write("\t\t`uvm_fatal(\"NO_MON_VIF\",{\"virtual interface must be set for: \",get_full_name(),\".vif\"});\n")
-         file.write("\t\tend")
-         file.write("\nendfunction : build_phase\n")
-         file.write("\ntask "+monitor_name+"::run_phase(uvm_phase phase);\n")
-         file.write("\tsuper.run_phase(phase);\n")
-         file.write("\n `uvm_info(get_type_name(),\"In Run Phase ...\",UVM_NONE)\n")
-         file.write("\n\trx="+seq_item_name+"::type_id::create(\"rx\",this);\n")
-         file.write("\t//forever begin //{\n")
-         file.write("\t\t//Monitor Logic\n")
-         file.write("\t\t// Add your monitor logic here .\n")
-         file.write("\t\tuvm_report_info(get_type_name(), $sformatf(\"Printing Transaction %s\",rx.convert2string()));\n")
-         file.write("\t\t//mon_aport.write(rx);\n")
-         file.write("\t//end //}\n")
-         file.write("\nendtask: run_phase\n")
+    file.write(monitor_template if monitor_logic is None else monitor_logic)
 
   logging.info(f"Successfully Created -> {l_monitor_path}")
 
@@ -650,39 +1256,15 @@ Args:
 Returns:
     None
 """
+@timed_emitter
 def create_agent(dut_name,tb_path):
   agent_file_name=f"{dut_name.strip()}_agent.sv"
   global agent_name
   agent_name=f"{dut_name.strip()}_agent"
   l_agent_path =os.path.join(tb_path,agent_file_name)
   with open(l_agent_path,"a+") as file:
-    file.write("class "+ agent_name+ " extends uvm_agent;\n")
-    file.write("\n`uvm_component_utils("+agent_name+")\n")
-    file.write(seqr_name+" u_sqr;\n")
-    file.write(driver_name+" u_driver;\n")
-    file.write(monitor_name+" u_monitor;\n")
-    file.write("\nvirtual "+interface_name+" vif;\n")
-    file.write("\nextern function new( string name = \""+agent_name+"\",uvm_component parent);\n")
-    file.write("extern function void build_phase(uvm_phase phase);\n")
-    file.write("extern function void connect_phase(uvm_phase phase);\n")
-    file.write("\nendclass //" +agent_name)
-    file.write("\n")
-    file.write("\nfunction "+agent_name+"::new(string name,uvm_component parent);\n")
-    file.write("\tsuper.new(name,parent);\n")
-    file.write("endfunction : new\n")
-    file.write("\nfunction void "+agent_name+"::build_phase(uvm_phase phase);")
-    file.write("\n super.build_phase(phase);\n")
-    file.write("\n `uvm_info(get_type_name(),\"In Build Phase ...\",UVM_NONE)\n")
-    file.write("\tu_sqr     ="+seqr_name+"   ::type_id::create(\"u_sqr\",this);\n")
-    file.write("\tu_driver  ="+driver_name+" ::type_id::create(\"u_driver\",this);\n")
-    file.write("\tu_monitor ="+monitor_name+"::type_id::create(\"u_monitor\",this);")
-    file.write("\nendfunction : build_phase\n")
-    file.write("\nfunction void "+agent_name+"::connect_phase(uvm_phase phase);")
-    file.write("\n super.connect_phase(phase);")
-    file.write("\n `uvm_info(get_type_name(),\"In Connect Phase ...\",UVM_NONE)\n")
-    file.write("\n u_driver.seq_item_port.connect(u_sqr.seq_item_export);")
-    file.write("\n `uvm_info(get_type_name(),\"CONNECT_PHASE:Connected Driver and Sequencer\",UVM_NONE)")
-    file.write("\nendfunction : connect_phase\n")
+    file.write(render_template("agent.sv.tpl", agent_name=agent_name, seqr_name=seqr_name, driver_name=driver_name,
+                               monitor_name=monitor_name, interface_name=interface_name))
   logging.info(f"Successfully Created -> {l_agent_path}")
 
 
@@ -692,141 +1274,160 @@ def create_agent(dut_name,tb_path):
 Creates a SystemVerilog scoreboard file based on the sequence item and interface.
 
 This function creates a class extending from uvm_scoreboard and defines the
-build and run phases. It uses an analysis port to collect data broadcasted from the monitor
+build and run phases. It uses an analysis port to collect data broadcasted from the monitor.
+With golden_batch set, the items are packed into a fixed size buffer and checked in batches
+by the Python golden model through DPI.
 Args:
     dut_name (str): Name of the Design Under Test (DUT)
     tb_path(str)  : path to the tb folder
+    llm_enabled(bool): enables if gemini should be used
+    golden_batch(int): Items per golden model batch, 0 to disable the golden model bridge
 Returns:
     None
 """
-def create_sb(dut_name,tb_path,llm_enabled):
+@timed_emitter
+def create_sb(dut_name,tb_path,llm_enabled,golden_batch):
   sb_file_name=f"{dut_name.strip()}_scoreboard.sv"
   global sb_name
   sb_name=f"{dut_name.strip()}_scoreboard"
   l_sb_path =os.path.join(tb_path,sb_file_name)
   with open(l_sb_path,"a+") as file:
-    file.write("class "+ sb_name+ " extends uvm_scoreboard;\n")
-    file.write("\nvirtual "+interface_name+" vif;\n")
-    file.write("uvm_analysis_imp#("+seq_item_name+","+sb_name+") sb_export;\n")
-    file.write("\n`uvm_component_utils("+sb_name+")\n")
-    file.write("\nextern function new( string name = \""+sb_name+"\",uvm_component parent);\n")
-    file.write("extern function void build_phase(uvm_phase phase);\n")
-    file.write("extern virtual task run_phase(uvm_phase phase);\n")
-    file.write("extern virtual function void write("+seq_item_name+" pkt);")
-    file.write("\nendclass //" +sb_name)
-    file.write("\n")
-    file.write("\nfunction "+sb_name+"::new(string name,uvm_component parent);\n")
-    file.write("\tsuper.new(name,parent);\n")
-    file.write("\tsb_export=new(\"sb_export\", this);\n")
-    file.write("endfunction : new\n")
-    file.write("\nfunction void "+sb_name+"::build_phase(uvm_phase phase);")
-    file.write("\n super.build_phase(phase);\n")
-    file.write("\n `uvm_info(get_type_name(),\"In Build Phase ...\",UVM_NONE)\n")
-    file.write("\nendfunction : build_phase\n")
-    file.write("\ntask "+sb_name+"::run_phase(uvm_phase phase);\n")
-    file.write("\tsuper.run_phase(phase);\n")
-    file.write("\n `uvm_info(get_type_name(),\"In Run Phase ...\",UVM_NONE)\n")
-    #if llm_enabled:
-    #     prompt = f"Given the following DUT code:\n\n{dut_design_file}\n\nSequence Item code:\n\n{l_seq_path}\n\nDriver code:\n\n{l_driver_path}\n\nMonitor code:\n\n{l_monitor_path}\n\nunderstand all design modules and input output ports of DUT , sequence item , driver and monitor. Now create system verilog code for `run_phase` task in UVM scoreboard by considering functionality to compare data send by the Driver to the DUT and data observed by the Monitor from the DUT after DUT processing. Do not include any comments or explanations. Output only the code within the `task run_phase(uvm_phase phase)` ... `endtask` block. No comments. No explanation. No header or footer."
-    #     sb_logic = call_gemini(prompt)
-    #     file.write(sb_logic)
-    #else:
-    #     file.write("\t\t// Add your Sb logic here .\n")    
-    file.write("\nendtask: run_phase\n")
-    file.write("\nfunction void "+sb_name+"::write("+seq_item_name+" pkt);\n")
-    file.write("\tpkt.print();\n")
-    file.write("endfunction : write\n")
-
-
+    file.write(render_template("scoreboard.sv.tpl", sb_name=sb_name, seq_item_name=seq_item_name, interface_name=interface_name,
+                               golden_batch=golden_batch, golden_module=dut_name.strip()+"_golden",
+                               fields=golden_fields() if golden_batch else list()))
   logging.info(f"Successfully Created -> {l_sb_path}")
 #End of create_sb
 
 """
-Creates a SystemVerilog coverage file based on the sequence item.
+Lists the sequence item fields exchanged with the Python golden model.
 
-This function creates a class extending from uvm_subscriber and defines the
-build, connect and run phases. It uses an analysis port to get the data from the monitor
-and adds coverage points using `CFLAGS` in the make file for verilator.
+Inputs (excluding clock and reset) come first, then outputs. Each field takes one
+64 bit slot of the batch buffer, wider fields are left out of the golden model.
+
+Args:
+    None
+
+Returns:
+    list: (field, width, direction) tuples
+"""
+def golden_fields():
+  fields = list()
+  for field, direction in [(i, "input") for i in ex_cr] + [(o.strip(), "output") for o in output_declarators]:
+    width = eval_width(port_dtype_map.get(field, ""))
+    if width is not None and width > 64:
+      logging.warning(f"{field} is wider than 64 bits, leaving it out of the golden model")
+      continue
+    fields.append((field, width or 64, direction))
+  return fields
+
+"""
+Creates the Python golden model module and its DPI bridge.
+
+<dut_name>_golden.py receives the packed batches as NumPy arrays and checks them against
+the user supplied vectorized predict() function. <dut_name>_golden_dpi.cpp embeds Python
+and implements the DPI functions imported by the scoreboard.
 
 Args:
     dut_name (str): Name of the Design Under Test (DUT)
     tb_path(str)  : path to the tb folder
-    verilator_mode (bool): If this is verilator mode
+
 Returns:
     None
 """
-def create_coverage(dut_name,tb_path,verilator_mode):
-  cov_file_name=f"{dut_name.strip()}_coverage.sv"
-  global cov_name
-  cov_name=f"{dut_name.strip()}_coverage"
-  l_cov_path =os.path.join(tb_path,cov_file_name)
-  with open(l_cov_path,"a+") as file:
-    file.write("class "+ cov_name+ " extends uvm_subscriber#("+seq_item_name+");\n")
-    file.write("\n`uvm_component_utils("+cov_name+")\n")
-    file.write(seq_item_name+" item;\n")
-    file.write("uvm_analysis_imp#("+seq_item_name+","+cov_name+") cov_export;\n")
-    if not verilator_mode:
-        file.write("covergroup cg_"+cov_name+";\n")
-        file.write("\n\toption.per_instance = 1;")
-        file.write("\n\toption.name=\"Coverage for "+dut_name+"\";")
-        file.write("\n\toption.comment=\"Add your comment\";")
-        file.write("\n\toption.goal=100;\n")
-        file.write("\n")
-        for cp_iter in ex_cr:
-            file.write("\tcp_"+cp_iter+": coverpoint (item."+cp_iter+")\n")
-            file.write("\t{\n")
-            file.write("\t\toption.auto_bin_max = 2;")
-            file.write("\n\t}\n")
-            cp_in_list.append("cp_"+cp_iter)
-        cross_cp= ", ".join(cp_in_list)
-        file.write("\n\tcross_cp: cross "+cross_cp+";\n")
-        file.write("\nendgroup: cg_"+cov_name)
-    file.write("\nextern function new( string name = \""+cov_name+"\",uvm_component parent);\n")
-    file.write("extern function void build_phase(uvm_phase phase);\n")
-    file.write("extern function void connect_phase(uvm_phase phase);\n")
-    file.write("extern virtual task run_phase(uvm_phase phase);\n")
-    file.write("extern virtual function void write("+seq_item_name+" t);\n")
-    file.write("extern function void report_phase(uvm_phase phase);\n")
-    file.write("\nendclass //" +cov_name)
-    file.write("\n")
-    file.write("\nfunction "+cov_name+"::new(string name,uvm_component parent);\n")
-    file.write("\tsuper.new(name,parent);\n")
-    if not verilator_mode:
-        file.write("\tcg_"+cov_name+"=new();\n")
-    file.write("endfunction : new\n")
-    file.write("\nfunction void "+cov_name+"::build_phase(uvm_phase phase);")
-    file.write("\n super.build_phase(phase);\n")
-    file.write("\tcov_export=new(\"cov_export\", this);\n")
-    file.write("\n `uvm_info(get_type_name(),\"In Build Phase ...\",UVM_NONE)\n")
-    file.write("\nendfunction : build_phase\n")
-    file.write("\nfunction void "+cov_name+"::connect_phase(uvm_phase phase);\n")
-    file.write("\tsuper.connect_phase(phase);\n")
-    file.write("\n `uvm_info(get_type_name(),\"In Connect Phase ...\",UVM_NONE)\n")
-    file.write("\nendfunction: connect_phase\n")
-    file.write("\ntask "+cov_name+"::run_phase(uvm_phase phase);\n")
-    file.write("\tsuper.run_phase(phase);\n")
-    file.write("\n `uvm_info(get_type_name(),\"In Run Phase ...\",UVM_NONE)\n")
-    file.write("\nendtask: run_phase\n")
-    file.write("\nfunction void "+cov_name+"::write("+seq_item_name+" t);\n")
-    file.write("\titem=t;\n")
-    if not verilator_mode:
-      file.write("\tcg_"+cov_name+".sample();\n")
-    file.write("endfunction : write\n")
-    file.write("\nfunction void "+cov_name+":: report_phase(uvm_phase phase);\n")
-    file.write("\tsuper.report_phase(phase);\n")
-    if not verilator_mode:
-      file.write("\t`uvm_info(get_full_name(),$sformatf(\"Coverage is %f\",cg_"+cov_name+".get_coverage()),UVM_LOW);\n")
-    file.write("endfunction: report_phase")
+@timed_emitter
+def create_golden_model(dut_name, tb_path):
+  module_name = f"{dut_name.strip()}_golden"
+  fields = golden_fields()
+  inputs = [f for f in fields if f[2] == "input"]
+  outputs = [f for f in fields if f[2] == "output"]
+  l_py_path = os.path.join(tb_path, module_name+".py")
+  with open(l_py_path, "w") as file:
+    file.write(render_template("golden.py.tpl", dut=dut_name.strip(), module_name=module_name,
+                               fields=fields, inputs=inputs, outputs=outputs))
+  logging.info(f"Successfully Created -> {l_py_path}")
+  l_cpp_path = os.path.join(tb_path, module_name+"_dpi.cpp")
+  with open(l_cpp_path, "w") as file:
+    file.write(render_template("golden_dpi.cpp.tpl", module_name=module_name, sb_name=sb_name, fields=fields))
+  logging.info(f"Successfully Created -> {l_cpp_path}")
 
 
-  logging.info(f"Successfully Created -> {l_cov_path}")
+"""
+Reads the register description (CSV or JSON) into reg_list and maps the bus ports in reg_bus.
 
-#End of create_cov
+JSON: {"bus": {"addr": ..., "read_latency": 1}, "registers": [{"name", "offset", "width",
+"access", "reset", "hdl_path", "fields": [{"name", "lsb", "width", "access", "reset"}]}]}.
+CSV: one row per field with the columns register, offset, field, lsb, width, access, reset,
+hdl_path; the register columns are only needed on its first row. A register without fields
+is one field spanning the register. The bus roles (addr, wdata, rdata, write and the optional
+read) come from the --reg-bus option, the JSON "bus" entry or the port names.
+
+Args:
+    desc_path (str): Register description file
+    bus_spec (str): Comma separated role=port overrides Eg: addr=paddr,wdata=pwdata (or None)
+
+Returns:
+    list: reg_list, empty when the description can not be used
 """
-Creates a SystemVerilog environment file based on the agent, scoreboard and coverage subscriber.
+def load_registers(desc_path, bus_spec):
+  try:
+    with open(desc_path, newline="") as file:
+      if desc_path.endswith(".json"):
+        desc = json.load(file)
+      else:
+        desc = {"registers": list()}
+        for row in csv.DictReader(file):
+          row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+          if row.get("register"):
+            if not desc["registers"] or desc["registers"][-1]["name"] != row["register"]:
+              desc["registers"].append({"name": row["register"], "offset": row.get("offset"), "hdl_path": row.get("hdl_path"), "fields": list()})
+          if row.get("field"):
+            desc["registers"][-1]["fields"].append({k: row.get(k) for k in ("lsb", "width", "access", "reset")} | {"name": row["field"]})
+  except (OSError, ValueError, IndexError) as e:
+    logging.error(f"Unable to read the register description {desc_path}: {e}")
+    return reg_list
+  #Bus roles: option, description, then port names
+  reg_bus.update(desc.get("bus", dict()))
+  for pair_i in (bus_spec or "").split(","):
+    if "=" in pair_i:
+      role, port = pair_i.split("=", 1)
+      reg_bus[role.strip()] = port.strip()
+  single_bit = [p for p in ex_cr if not port_dtype_map.get(p, "").startswith("[")]
+  multi_bit = [p for p in ex_cr if p not in single_bit]
+  outputs = [p.strip() for p in output_declarators]
+  for role, candidates, pattern in (("addr", multi_bit, r"addr"), ("wdata", multi_bit, r"wdata|din|data_in|wr_data"),
+                                    ("rdata", outputs, r"rdata|dout|data_out|rd_data"), ("write", single_bit, r"write|wr|we"),
+                                    ("read", single_bit, r"read|rd")):
+    if role not in reg_bus:
+      found = [p for p in candidates if re.search(pattern, p, re.IGNORECASE)]
+      if found:
+        reg_bus[role] = found[0]
+  missing = [role for role in ("addr", "wdata", "rdata", "write") if reg_bus.get(role) not in ex_cr + outputs]
+  if missing:
+    logging.error(f"No DUT port for the register bus roles {', '.join(missing)}, use --reg-bus Eg: addr=paddr,wdata=pwdata")
+    return reg_list
+  reg_bus["read_latency"] = int(reg_bus.get("read_latency", 1))
+  data_width = eval_width(port_dtype_map.get(reg_bus["wdata"], "")) or 32
+  for reg_i in desc.get("registers", list()):
+    fields = [{"name": f["name"], "lsb": int(str(f.get("lsb") or 0), 0), "width": int(str(f.get("width") or 1), 0),
+               "access": (f.get("access") or reg_i.get("access") or "RW").upper(), "reset": int(str(f.get("reset") or 0), 0)}
+              for f in reg_i.get("fields") or list()]
+    width = int(str(reg_i.get("width") or max([f["lsb"] + f["width"] for f in fields] or [data_width])), 0)
+    if not fields:
+      fields = [{"name": reg_i["name"], "lsb": 0, "width": width, "access": (reg_i.get("access") or "RW").upper(),
+                 "reset": int(str(reg_i.get("reset") or 0), 0)}]
+    accesses = {f["access"] for f in fields}
+    reg_list.append({"name": reg_i["name"], "offset": int(str(reg_i.get("offset") or 0), 0), "width": width,
+                     "access": "RO" if accesses == {"RO"} else "RW", "hdl_path": reg_i.get("hdl_path") or None, "fields": fields})
+  print(f'Register map: \n {tabulate([[r["name"], hex(r["offset"]), r["width"], r["access"], r["hdl_path"] or "", ", ".join(f["name"] for f in r["fields"])] for r in reg_list], headers=["Register", "Offset", "Width", "Access", "HDL path", "Fields"])}')
+  return reg_list
 
-This function creates a class extending from uvm_env and defines the
-build and connect phases. It creates the instances of agent, scoreboard and coverage components.
+"""
+Creates the register model of the DUT from reg_list using the uvm_reg library.
+
+The file holds one uvm_reg class per register, the uvm_reg_block with the default map and the
+HDL paths of the registers (relative to the DUT instance), the adapter between register
+operations and sequence items and a predictor fed by the monitor. The backdoor itself is
+written into the top by create_reg_backdoor.
 
 Args:
     dut_name (str): Name of the Design Under Test (DUT)
@@ -834,100 +1435,522 @@ Args:
 Returns:
     None
 """
-def create_env(dut_name,tb_path):
+@timed_emitter
+def create_reg_model(dut_name,tb_path):
+  global reg_block_name, reg_adapter_name, reg_predictor_name, reg_backdoor_name
+  reg_block_name=f"{dut_name.strip()}_reg_block"
+  reg_adapter_name=f"{dut_name.strip()}_reg_adapter"
+  reg_predictor_name=f"{dut_name.strip()}_reg_predictor"
+  reg_backdoor_name=f"{dut_name.strip()}_reg_backdoor"
+  data_width = eval_width(port_dtype_map.get(reg_bus["wdata"], "")) or 32
+  l_reg_path =os.path.join(tb_path,f"{dut_name.strip()}_reg_model.sv")
+  with open(l_reg_path,"a+") as file:
+    file.write(render_template("reg_model.sv.tpl", dut=dut_name.strip(), regs=reg_list, bus=reg_bus, seq_item_name=seq_item_name,
+                               n_bytes=max(1, -(-data_width // 8)), reg_block_name=reg_block_name,
+                               reg_adapter_name=reg_adapter_name, reg_predictor_name=reg_predictor_name))
+  logging.info(f"Successfully Created -> {l_reg_path}")
+
+"""
+Renders the register backdoor declared in the top module.
+
+The uvm_reg_backdoor subclass is declared inside the top so it can reach the DUT registers
+with hierarchical references (a virtual interface may not hold such references, and the
+Verilator build compiles the uvm_hdl DPI out with UVM_NO_DPI). It is handed to the env
+through uvm_config_db as "reg_backdoor". A poke forces the register and releases it at
+once, which deposits the value: the design keeps updating the register afterwards.
+
+Args:
+    None
+Returns:
+    str: Register backdoor class and instance
+"""
+def create_reg_backdoor():
+  backdoor_regs = [r for r in reg_list if r["hdl_path"]]
+  return render_template("reg_backdoor.sv.tpl", reg_backdoor_name=reg_backdoor_name, regs=backdoor_regs)
+
+"""
+Returns the default values of the DUT parameters.
+
+Args:
+    None
+
+Returns:
+    dict: Parameter name -> default value expression Eg: {"DATA_WIDTH": "8"}
+"""
+def param_defaults():
+  defaults = dict()
+  for parameter_i in param_list:
+    for name_i, value_i in re.findall(r"(\w+)\s*=\s*([^,;]+)", parameter_i):
+      defaults[name_i] = value_i.strip()
+  return defaults
+
+"""
+Reads the parameter points of a sweep into sweep_points.
+
+The spec is either NAME=v1,v2;NAME2=v3,v4 (every combination of the values) or the path of
+a JSON file with the list of points [{"NAME": v1, "NAME2": v3}, ...]. Every point holds all
+the swept parameters, a parameter left out of a point keeps its DUT default.
+
+Args:
+    spec (str): Sweep values or the path of a JSON file
+
+Returns:
+    list: sweep_points
+"""
+def load_sweep(spec):
+  defaults = param_defaults()
+  if os.path.isfile(spec):
+    try:
+      with open(spec) as file:
+        points = json.load(file)
+    except (OSError, ValueError) as e:
+      logging.error(f"Unable to read the sweep {spec}: {e}")
+      return sweep_points
+  else:
+    axes = dict()
+    for axis_i in spec.split(";"):
+      name_i, _, values = axis_i.partition("=")
+      axes[name_i.strip()] = [v.strip() for v in values.split(",") if v.strip()]
+    points = [dict(zip(axes, values)) for values in itertools.product(*axes.values())]
+  for point in points:
+    unknown = [name_i for name_i in point if name_i not in defaults]
+    if unknown:
+      logging.warning(f"Ignoring the sweep point {point}, not a DUT parameter: {', '.join(unknown)}")
+      continue
+    sweep_points.append({name_i: str(value) for name_i, value in point.items()})
+  swept = [name_i for name_i in defaults if any(name_i in point for point in sweep_points)]
+  sweep_points[:] = [{name_i: point.get(name_i, defaults[name_i]) for name_i in swept} for point in sweep_points]
+  return sweep_points
+
+"""
+Binds the swept parameters of a parameter declaration to their sweep macros.
+
+Eg: parameter DATA_WIDTH=8; becomes parameter DATA_WIDTH=`RTL2UVM_DATA_WIDTH; so the
+interface and the sequence item follow the point the testbench is built for.
+
+Args:
+    declaration (str): Parameter declaration of the DUT
+
+Returns:
+    str: The declaration, unchanged without a sweep
+"""
+def sweep_parameters(declaration):
+  if not sweep_points:
+    return declaration
+  return re.sub(r"(\w+)(\s*=\s*)([^,;]+)",
+                lambda m: m.group(1)+m.group(2)+"`RTL2UVM_"+m.group(1) if m.group(1) in sweep_points[0] else m.group(0),
+                declaration)
+
+"""
+Creates the parameter sweep files of a Verilator testbench.
+
+tb/<dut_name>_params.sv defines the RTL2UVM_<parameter> macro of every swept parameter
+with its DUT default, the Makefile overrides them per point (-DRTL2UVM_<parameter>=<value>).
+sweep.json lists the points for the sweep subcommand.
+
+Args:
+    dut_name (str): Name of the Design Under Test (DUT)
+    tb_path(str)  : path to the tb folder
+    verilator_path (str): Path to the verilator folder
+
+Returns:
+    list: (point name, parameter values) per point
+"""
+@timed_emitter
+def create_sweep_params(dut_name, tb_path, verilator_path):
+  defaults = param_defaults()
+  #Other parameters in a default are not visible where the macro is used, they are replaced by their value
+  macro_defaults = {name_i: re.sub(r"\w+", lambda m: ("`RTL2UVM_"+m.group(0) if m.group(0) in sweep_points[0] else "("+defaults[m.group(0)]+")")
+                                   if m.group(0) in defaults else m.group(0), defaults[name_i])
+                    for name_i in sweep_points[0]}
+  params_path = os.path.join(tb_path, f"{dut_name.strip()}_params.sv")
+  with open(params_path, "w") as file:
+    file.write(render_template("params.sv.tpl", defaults=macro_defaults))
+  logging.info(f"Successfully Created -> {params_path}")
+  points = [(f"p{index}", point) for index, point in enumerate(sweep_points)]
+  sweep_path = os.path.join(verilator_path, "sweep.json")
+  with open(sweep_path, "w") as file:
+    json.dump({"points": [{"name": name_i, "params": point} for name_i, point in points]}, file, indent=2)
+  logging.info(f"Successfully Created -> {sweep_path}")
+  return points
+
+"""
+Evaluates the bit width of a port from its data type string.
+
+The range bounds are evaluated after substituting the DUT parameter values,
+Eg: [DATA_WIDTH-1:0] with DATA_WIDTH=8 gives 8. A data type without a range is 1 bit.
+With a parameter sweep and no overrides, the width is the one of the widest sweep point.
+
+Args:
+    dtype (str): Data type string of the port Eg: [DATA_WIDTH-1:0]
+    overrides (dict): Parameter values replacing the defaults Eg: a sweep point
+
+Returns:
+    int: Width of the port, or None if it can not be evaluated
+"""
+def eval_width(dtype, overrides=None):
+  if overrides is None and sweep_points:
+    widths = [eval_width(dtype, point) for point in sweep_points]
+    return None if None in widths else max(widths)
+  range_match = re.search(r"\[([^:\]]+):([^\]]+)\]", dtype)
+  if not range_match:
+    return 1
+  param_values = param_defaults()
+  param_values.update(overrides or dict())
+  bounds = list()
+  for expr in range_match.groups():
+    expr = re.sub(r"\w+", lambda m: param_values.get(m.group(0), m.group(0)), expr)
+    if not re.match(r"^[0-9+\-*/() ]+$", expr):
+      return None
+    bounds.append(int(eval(expr.replace("/", "//"), {"__builtins__": {}})))
+  return abs(bounds[0] - bounds[1]) + 1
+
+"""
+Plans the coverage model for the DUT inputs.
+
+Each input (excluding clock and reset) gets a coverpoint whose bins fit the bin budget:
+one bin per value when the port is narrow enough, otherwise zero/max corner bins plus
+range bins of equal power of two slices, so the upper bits of a value select its bin.
+Crosses are only created for the requested pairs.
+
+Args:
+    bin_budget (int): Maximum number of bins per coverpoint
+    cross_spec (str): Comma separated pairs Eg: read:write, None for no cross
+
+Returns:
+    list: Coverage plan entries, also stored in cov_plan
+"""
+def plan_coverage(bin_budget, cross_spec):
+  bin_budget = max(bin_budget, 2)
+  for cp_iter in ex_cr:
+    width = eval_width(port_dtype_map.get(cp_iter, "")) #Widest sweep point, the narrower ones leave the upper bins empty
+    if width is None:
+      logging.warning(f"Unable to evaluate the width of {cp_iter}, using auto bins")
+      cov_plan.append({"signal": cp_iter, "width": None, "kind": "auto", "bins": 1 << (bin_budget.bit_length() - 1), "shift": 0})
+    elif (1 << width) <= bin_budget:
+      cov_plan.append({"signal": cp_iter, "width": width, "kind": "value", "bins": 1 << width, "shift": 0})
+    elif bin_budget < 4:
+      cov_plan.append({"signal": cp_iter, "width": width, "kind": "auto", "bins": 2, "shift": 0}) #No room for the corner bins
+    else:
+      range_bins = 1 << ((bin_budget - 2).bit_length() - 1) #Power of two, so a shift selects the range bin
+      shift = width - (range_bins.bit_length() - 1)
+      #Value slices of the shift, the first and last one without the zero and max corners
+      ranges = [(max(i << shift, 1), min(((i + 1) << shift) - 1, (1 << width) - 2)) for i in range(range_bins)]
+      cov_plan.append({"signal": cp_iter, "width": width, "kind": "range", "bins": range_bins, "shift": shift, "ranges": ranges})
+  if cross_spec:
+    for pair_i in cross_spec.split(","):
+      pair = [p.strip() for p in pair_i.split(":")]
+      if len(pair) != 2 or any(p not in ex_cr for p in pair):
+        logging.warning(f"Ignoring cross {pair_i}, expected <input>:<input>")
+        continue
+      cov_plan.append({"signal": "_".join(pair), "kind": "cross", "pair": pair})
+  print(f'Coverage plan: \n {tabulate([[c["signal"], c["kind"], c.get("width", ""), coverage_counters(c) if c["kind"] != "cross" else ""] for c in cov_plan], headers=["Coverpoint", "Kind", "Width", "Bins"])}')
+  return cov_plan
+
+"""
+Returns the number of counters of a coverpoint in the sampled counter coverage.
+
+The counters follow the covergroup bins: a range coverpoint has the zero and max corner
+bins before its range bins.
+
+Args:
+    cp (dict): Coverage plan entry
+
+Returns:
+    int: Number of counters
+"""
+def coverage_counters(cp):
+  return cp["bins"] + 2 if cp["kind"] == "range" else cp["bins"]
+
+"""
+Returns the counter index of a coverpoint in the sampled counter coverage.
+
+A range or auto bin is selected by the upper bits of the value, so the index always falls
+within coverage_counters. The width of an auto coverpoint is not known when generating, and
+with a parameter sweep it depends on the point, so their shift is computed from $bits of the port.
+
+Args:
+    cp (dict): Coverage plan entry
+
+Returns:
+    str: Index expression Eg: (t.din == 0) ? 0 : (&t.din) ? 1 : 2 + (t.din >> 5)
+"""
+def coverage_bin_index(cp):
+  value = "t."+cp["signal"]
+  if cp["kind"] == "value":
+    return value
+  select_bits = cp["bins"].bit_length() - 1
+  if cp["kind"] == "auto" or sweep_points:
+    index = f"{value} >> ($bits({value}) > {select_bits} ? $bits({value}) - {select_bits} : 0)"
+  else:
+    index = value+(" >> "+str(cp["shift"]) if cp["shift"] else "")
+  if cp["kind"] == "range":
+    return f"({value} == 0) ? 0 : (&{value}) ? 1 : 2 + ({index})"
+  return index
+
+"""
+Creates a SystemVerilog coverage file based on the sequence item.
+
+This function creates a class extending from uvm_subscriber and defines the
+build, connect and run phases. It uses an analysis port to get the data from the monitor
+and adds the coverpoints from cov_plan. In verilator mode the covergroup is replaced by
+sampled bin counters.
+
+Args:
+    dut_name (str): Name of the Design Under Test (DUT)
+    tb_path(str)  : path to the tb folder
+    verilator_mode (bool): If this is verilator mode
+Returns:
+    None
+"""
+@timed_emitter
+def create_coverage(dut_name,tb_path,verilator_mode):
+  cov_file_name=f"{dut_name.strip()}_coverage.sv"
+  global cov_name
+  cov_name=f"{dut_name.strip()}_coverage"
+  l_cov_path =os.path.join(tb_path,cov_file_name)
+  coverpoints = [c for c in cov_plan if c["kind"] != "cross"]
+  cp_in_list.extend("cp_"+c["signal"] for c in coverpoints)
+  with open(l_cov_path,"a+") as file:
+    file.write(render_template("coverage.sv.tpl", cov_name=cov_name, seq_item_name=seq_item_name, dut=dut_name,
+                               verilator_mode=verilator_mode, plan=cov_plan,
+                               bins={c["signal"]: coverage_counters(c) for c in coverpoints},
+                               bin_index={c["signal"]: coverage_bin_index(c) for c in coverpoints}))
+
+  logging.info(f"Successfully Created -> {l_cov_path}")
+
+#End of create_cov
+"""
+Creates the agent side components of every agent group.
+
+For each group the collected port data is narrowed to the group ports and its clock,
+then the interface, sequence item, sequence, sequencer, driver, monitor, agent,
+scoreboard and coverage are created with <dut_name>_<group> names. The component names
+are recorded in agent_list for the env, virtual sequence, test, package and top.
+
+Args:
+    groups (list): Agent groups from group_ports
+    dut_name (str): Name of the Design Under Test (DUT)
+    tb_path(str)  : path to the tb folder
+    llm_enabled(bool): enables if gemini should be used
+    verilator_mode(bool): check for verilator mode
+    args (argparse.Namespace): Generator arguments (qualifiers and coverage plan)
+Returns:
+    list: agent_list
+"""
+def create_agent_groups(groups,dut_name,tb_path,llm_enabled,verilator_mode,args):
+  all_ports = [list(data) for data in (port_list, input_list, input_declarators, output_list, output_declarators, all_declarators)]
+  group_ex_cr = list()
+  for group in groups:
+    keep = set(group["ports"]) | {group["clock"]}
+    port_list[:] = [p for p in all_ports[0] if str(p.declarators).strip() in keep]
+    input_list[:] = [i for i in all_ports[1] if i in {str(p) for p in port_list}]
+    input_declarators[:] = [d for d in all_ports[2] if d.strip() in keep]
+    output_list[:] = [o for o in all_ports[3] if str(o.declarators).strip() in keep]
+    output_declarators[:] = [d for d in all_ports[4] if d.strip() in keep]
+    all_declarators[:] = [d for d in all_ports[5] if d.strip() in keep]
+    for data in (cr_list, only_clk, ex_cr, cp_in_list, qualifier_list, cov_plan):
+      data.clear()
+    group_dut = dut_name.strip()+"_"+group["name"]
+    create_interface(port_list,group_dut,tb_path,verilator_mode)
+    create_seqitem(port_list,group_dut,tb_path)
+    create_sequence(group_dut,tb_path)
+    create_seqr(group_dut,tb_path,verilator_mode)
+    create_driver(group_dut,tb_path,llm_enabled and not args.llm_batch,args.llm_budget,args.llm_retries)
+    qualifiers = args.qualifiers
+    if qualifiers is not None and qualifiers.strip().lower() != "none":
+      qualifiers = ",".join(q for q in qualifiers.split(",") if q.strip() in ex_cr) or "none"
+    detect_qualifiers(qualifiers)
+    print(f'Monitor sampling qualifiers ({group["name"]}): \n {tabulate(qualifier_list, headers=["Signal", "Active Low"])}')
+    create_monitor(group_dut,tb_path,llm_enabled and not args.llm_batch,verilator_mode,"."+group["name"],args.llm_budget,args.llm_retries)
+    create_agent(group_dut,tb_path)
+    create_sb(group_dut,tb_path,llm_enabled,0)
+    if llm_enabled and args.llm_batch:
+      create_llm_components([(c, os.path.join(tb_path, c+".sv")) for c in [driver_name, monitor_name] + ([] if args.llm_batch_no_scoreboard else [sb_name])],
+                            args.llm_budget, args.llm_retries)
+    crosses = None
+    if args.cov_cross:
+      crosses = ",".join(c for c in args.cov_cross.split(",") if all(p.strip() in ex_cr for p in c.split(":"))) or None
+    plan_coverage(args.cov_bins, crosses)
+    create_coverage(group_dut,tb_path,verilator_mode)
+    group_ex_cr.extend(ex_cr)
+    agent_list.append({"name": group["name"], "clock": group["clock"], "ports": group["ports"],
+                       "interface": interface_name, "sequence": seq_name, "sequencer": seqr_name,
+                       "agent": agent_name, "sb": sb_name, "cov": cov_name,
+                       "classes": [seq_item_name, seq_name, seqr_name, driver_name, monitor_name, agent_name, sb_name, cov_name]})
+  #Back to the whole DUT for the top and the build files
+  for data, full in zip((port_list, input_list, input_declarators, output_list, output_declarators, all_declarators), all_ports):
+    data[:] = full
+  for data in (cr_list, only_clk, ex_cr):
+    data.clear()
+  for j in input_declarators:
+    if re.search(r".*.(pclk|clk|reset|rst|clock).*",str(j), re.IGNORECASE):
+      cr_list.append(j)
+    if re.search(r".*.(pclk|clk|clock).*",str(j) , re.IGNORECASE):
+      only_clk.append(j)
+  ex_cr.extend(group_ex_cr)
+  return agent_list
+
+#End of create_agent_groups
+
+"""
+Creates a SystemVerilog environment file based on the agent, scoreboard and coverage subscriber.
+
+This function creates a class extending from uvm_env and defines the
+build and connect phases. It creates the instances of agent, scoreboard and coverage components,
+one set per agent when agent_list is filled.
+
+Args:
+    dut_name (str): Name of the Design Under Test (DUT)
+    tb_path(str)  : path to the tb folder
+Returns:
+    None
+"""
+@timed_emitter
+def create_env(dut_name,tb_path):
   env_file_name=f"{dut_name.strip()}_env.sv"
   global env_name
   env_name=f"{dut_name.strip()}_env"
   l_env_path =os.path.join(tb_path,env_file_name)
   with open(l_env_path,"a+") as file:
-    file.write("class "+ env_name+ " extends uvm_env;\n")
-    file.write("\n`uvm_component_utils("+env_name+")\n")
-    file.write(agent_name+" u_agent;\n")
-    file.write(sb_name+" u_sb;\n")
-    file.write(cov_name+" u_cov;\n")
-    file.write("\nextern function new( string name = \""+env_name+"\",uvm_component parent);\n")
-    file.write("extern function void build_phase(uvm_phase phase);\n")
-    file.write("extern function void connect_phase(uvm_phase phase);\n")
-    file.write("\nendclass //" +env_name)
-    file.write("\n")
-    file.write("\nfunction "+env_name+"::new(string name,uvm_component parent);\n")
-    file.write("\tsuper.new(name,parent);\n")
-    file.write("endfunction : new\n")
-    file.write("\nfunction void "+env_name+"::build_phase(uvm_phase phase);")
-    file.write("\n super.build_phase(phase);\n")
-    file.write("\n `uvm_info(get_type_name(),\"In Build Phase ...\",UVM_NONE)\n")
-    file.write("\tu_agent="+agent_name+"::type_id::create(\"u_agent\",this);\n")
-    file.write("\tu_sb="+sb_name+"::type_id::create(\"u_sb\",this);\n")
-    file.write("\tu_cov="+cov_name+"::type_id::create(\"u_cov\",this);\n")
-    file.write("\nendfunction : build_phase\n")
-    file.write("\nfunction void "+env_name+"::connect_phase(uvm_phase phase);")
-    file.write("\n super.connect_phase(phase);")
-    file.write("\n `uvm_info(get_type_name(),\"Connecting monitor and Scoreboard\",UVM_NONE)\n")
-    file.write("\tu_agent.u_monitor.mon_aport.connect(u_sb.sb_export);")
-    file.write("\tu_agent.u_monitor.mon_aport.connect(u_cov.cov_export);")
-    file.write("\nendfunction : connect_phase\n")
+    file.write(render_template("env.sv.tpl", env_name=env_name, agents=agent_list,
+                               classes=dict() if agent_list else dict(agent=agent_name, sb=sb_name, cov=cov_name),
+                               regs=dict(block=reg_block_name, adapter=reg_adapter_name, predictor=reg_predictor_name) if reg_list else dict()))
   logging.info(f"Successfully Created -> {l_env_path}")
 
 
 #End of create_env
 
+"""
+Creates a SystemVerilog virtual sequence driving all the agents of agent_list.
+
+The virtual sequence holds one sequencer handle per agent (set by the test) and starts
+the base sequence of every agent in parallel with fork/join, so independent port
+groups and clock domains are exercised concurrently.
+
+Args:
+    dut_name (str): Name of the Design Under Test (DUT)
+    tb_path(str)  : path to the tb folder
+Returns:
+    None
+"""
+@timed_emitter
+def create_virtual_sequence(dut_name,tb_path):
+  vseq_file_name=f"{dut_name.strip()}_virtual_sequence.sv"
+  global vseq_name
+  vseq_name=f"{dut_name.strip()}_virtual_sequence"
+  l_vseq_path =os.path.join(tb_path,vseq_file_name)
+  with open(l_vseq_path,"a+") as file:
+    file.write(render_template("virtual_sequence.sv.tpl", vseq_name=vseq_name, agents=agent_list))
+
+  logging.info(f"Successfully Created -> {l_vseq_path}")
+
+#End of create_virtual_sequence
+
 """
 Creates a SystemVerilog test file based on the environment.
 
 This function creates a class extending from uvm_test and defines the
 build and run phases. It creates an instance of the env and starts the sequence
+(the virtual sequence over all the agent sequencers when agent_list is filled)
 
 Args:
     dut_name (str): Name of the Design Under Test (DUT)
     tb_path(str)  : path to the tb folder
+    verilator_mode (bool): If this is verilator mode (wall clock over DPI)
 Returns:
     None
 """
-def create_test(dut_name,tb_path):
+@timed_emitter
+def create_test(dut_name,tb_path,verilator_mode):
   test_file_name=f"{dut_name.strip()}_test.sv"
   global test_name
   test_name=f"{dut_name.strip()}_test"
   l_test_path =os.path.join(tb_path,test_file_name)
   with open(l_test_path,"a+") as file:
-    file.write("class "+ test_name+ " extends uvm_test;\n")
-    file.write("\nvirtual "+interface_name+" vif;\n")
-    file.write(env_name+" u_env;\n")
-    file.write("\t\t"+seq_name +" u_seq;\n")
-    file.write("\n`uvm_component_utils("+test_name+")\n")
-    file.write("\nextern function new( string name = \""+test_name+"\",uvm_component parent);\n")
-    file.write("extern function void build_phase(uvm_phase phase);\n")
-    file.write("extern virtual task run_phase(uvm_phase phase);\n")
-    file.write("\nendclass //" +test_name)
-    file.write("\n")
-    file.write("\nfunction "+test_name+"::new(string name,uvm_component parent);")
-    file.write("\n super.new(name,parent);")
-    file.write("\nendfunction : new\n")
-    file.write("\nfunction void "+test_name+"::build_phase(uvm_phase phase);")
-    file.write("\n super.build_phase(phase);\n")
-    file.write("\n `uvm_info(get_type_name(),\"In Build Phase ...\",UVM_NONE)\n")
-    file.write("\tu_env="+env_name+"::type_id::create(\"u_env\",this);")
-    file.write("\nendfunction : build_phase\n")
-    file.write("\ntask "+test_name+"::run_phase(uvm_phase phase);\n")
-    file.write("\tsuper.run_phase(phase);\n")
-    file.write("\n\t\t`uvm_info(get_type_name(),\"In Run Phase ...\",UVM_NONE)\n")
-    file.write("\t\tu_seq="+seq_name+"::type_id::create(\"u_seq\",this);\n")
-    file.write("\t\tphase.raise_objection( this, \"Starting phase objection\");\n")
-    file.write("\n")
-    file.write("\t\t`uvm_info(get_type_name(), $sformatf(\"Starting Sequence\"), UVM_LOW)\n")
-    #file.write("\t\tuvm_top.print_topology();\n")
-    file.write("\t\tu_seq.start(u_env.u_agent.u_sqr);\n")
-    file.write("\n")
-    file.write("\t\tphase.drop_objection( this, \"Dropping phase objection\");")
-    file.write("\nendtask: run_phase\n")
+    file.write(render_template("test.sv.tpl", test_name=test_name, env_name=env_name, agents=agent_list, verilator_mode=verilator_mode,
+                               seq_name=vseq_name if agent_list else seq_name,
+                               interface_name="" if agent_list else interface_name))
+    if reg_list:
+      create_reg_test(file)
 
   logging.info(f"Successfully Created -> {l_test_path}")
 
 # End of create_test
 
+"""
+Writes the register benchmark test (<dut_name>_reg_test) next to the test.
+
+The test programs every writable register +REG_BENCH_ITERS=<n> times (default: 10) through
+the frontdoor (bus cycles driven by the agent) and through the backdoor, reads the model back
+through the frontdoor with UVM_CHECK, and prints the simulated time of both access paths on
+an RTL2UVM_REG_BENCH line.
+
+Args:
+    file (file): Open test file
+Returns:
+    None
+"""
+def create_reg_test(file):
+  global reg_test_name
+  reg_test_name=test_name.replace("_test", "_reg_test")
+  file.write(render_template("reg_test.sv.tpl", reg_test_name=reg_test_name, env_name=env_name))
+
+"""
+Creates a SystemVerilog package with all the created UVM components.
+
+The classes are included in dependency order so the package is a single compilation unit
+separate from the interface, design and top. In verilator mode a filelist (<dut_name>.f)
+with the compile order and a configuration file (<dut_name>.vlt) marking the design as a
+hierarchical block are created as well.
+
+Args:
+    dut_name (str): Name of the Design Under Test (DUT)
+    tb_path(str)  : path to the tb folder
+    design_file(str): File name of the design copied to the tb folder
+    verilator_mode(bool) : if this is verilator mode
+Returns:
+    None
+"""
+@timed_emitter
+def create_pkg(dut_name,tb_path,design_file,verilator_mode):
+  pkg_file_name=f"{dut_name.strip()}_pkg.sv"
+  global pkg_name
+  pkg_name=f"{dut_name.strip()}_pkg"
+  l_pkg_path =os.path.join(tb_path,pkg_file_name)
+  with open(l_pkg_path,"a+") as file:
+    if agent_list:
+      class_list = [c for agent_i in agent_list for c in agent_i["classes"]] + [vseq_name, env_name, test_name]
+    else:
+      class_list = [seq_item_name, seq_name, seqr_name, driver_name, monitor_name, agent_name, sb_name, cov_name, env_name, test_name]
+    if reg_list:
+      class_list.insert(class_list.index(env_name), dut_name.strip()+"_reg_model")
+    file.write(render_template("pkg.sv.tpl", pkg_name=pkg_name, classes=class_list, verilator_mode=verilator_mode,
+                               dpi_file=sanitize_dut_name(dut_name)+"_dpi.cpp"))
+  logging.info(f"Successfully Created -> {l_pkg_path}")
+  if verilator_mode:
+    l_filelist_path =os.path.join(tb_path,f"{dut_name.strip()}.f")
+    with open(l_filelist_path,"w") as file:
+      interfaces=[a["interface"] for a in agent_list] or [interface_name]
+      params=[dut_name.strip()+"_params.sv"] if sweep_points else [] #The sweep macros are used by all the files below
+      sources=params + [intf_i+".sv" for intf_i in interfaces] + [pkg_file_name, design_file, dut_name.strip()+"_top.sv"]
+      file.write(render_template("filelist.f.tpl", sources=sources))
+    logging.info(f"Successfully Created -> {l_filelist_path}")
+    l_vlt_path =os.path.join(tb_path,f"{dut_name.strip()}.vlt")
+    with open(l_vlt_path,"w") as file:
+      file.write(render_template("hier.vlt.tpl", dut=dut_name.strip()))
+    logging.info(f"Successfully Created -> {l_vlt_path}")
+
+#End of create_pkg
+
 """
 Creates a SystemVerilog top level file based on all the created UVM components and design.
 
-This function creates a file which is used to connect all the components including DUT
+This function creates a file which is used to connect all the components including DUT.
+The UVM components are imported from the package created by create_pkg. With agent_list
+filled there is one interface instance per agent and the DUT ports are connected to the
+interface of their agent.
+With a parameter sweep the swept DUT parameters are set from their RTL2UVM_<parameter> macros.
 
 Args:
     port_list (list): List of port data objects
@@ -937,89 +1960,120 @@ Args:
 Returns:
     None
 """
+@timed_emitter
 def create_top(port_list,dut_name,tb_path, verilator_mode):
   top_file_name=f"{dut_name.strip()}_top.sv"
   global top_name
   top_name=f"{dut_name.strip()}_top"
   l_top_path =os.path.join(tb_path,top_file_name)
+  for l_ports in input_list:
+    replace_to_bit = str(l_ports).replace("input","bit")
+    if re.search(r".*.(pclk|clk|clock).*", replace_to_bit, re.IGNORECASE):
+      clk_rst_list.append(str(replace_to_bit)) #Containts clock and reset
+  for j in input_declarators:
+    if re.search(r".*.(reset|rst).*",str(j) , re.IGNORECASE):
+      only_rst.append(j)
+  connections = []
+  port_intf = {p: "intf_"+a["name"] for a in agent_list for p in a["ports"]}
+  for iter_i in all_declarators:
+    if agent_list:
+      #Clocks come from the top, the other ports from the interface of their agent
+      connections.append((iter_i.strip(), (port_intf[iter_i.strip()]+'.' if iter_i.strip() in port_intf else '')+iter_i.strip()))
+    else:
+      connections.append((iter_i.lstrip(), "intf."+iter_i.lstrip()))
   with open(l_top_path,"a+") as file:
-    file.write("import uvm_pkg:: *;\n")
-    file.write("`include \"uvm_macros.svh\"\n")
-
-    file.write("`include \""+seq_item_name+".sv\"\n")
-    file.write("`include \""+seqr_name+".sv\"\n")
-    file.write("`include \""+seq_name+".sv\"\n")
-    file.write("`include \""+driver_name+".sv\"\n")
-    file.write("`include \""+interface_name+".sv\"\n")
-    file.write("`include \""+monitor_name+".sv\"\n")
-    file.write("`include \""+agent_name+".sv\"\n")
-    file.write("`include \""+sb_name+".sv\"\n")
-    file.write("`include \""+cov_name+".sv\"\n")
-    file.write("`include \""+env_name+".sv\"\n")
-    file.write("`include \""+test_name+".sv\"\n")
-    file.write("\nmodule "+ top_name+";\n")
-    file.write("\n//--------------------------------------")
-    file.write("\n//signal declaration: clock and reset")
-    file.write("\n//--------------------------------------")
-    for l_ports in input_list:
-      replace_to_bit = str(l_ports).replace("input","bit")
-      if re.search(r".*.(pclk|clk|clock).*", replace_to_bit, re.IGNORECASE):
-        clk_rst_list.append(str(replace_to_bit)) #Containts clock and reset
-    for i in clk_rst_list:
-      file.write(i)
-    file.write("\n")
-    file.write("\ninitial begin\n")
-    for j in input_declarators:
-      #if re.search(r".*.(clk|reset|rst|clock).*",str(j) , re.IGNORECASE):
-      #  cr_list.append(j)
-      #if re.search(r".*.(clk|clock).*",str(j) , re.IGNORECASE):
-      #  only_clk.append(j)
-      if re.search(r".*.(reset|rst).*",str(j) , re.IGNORECASE):
-        only_rst.append(j)
-    clk_rst_initial = "=0;".join(only_clk)
-    clk_rst_initial += "=0;"
-    file.write(clk_rst_initial)
-    file.write("\nend")
-    file.write("\n//--------------------------------------")
-    file.write("\n//clock Generation")
-    file.write("\n//--------------------------------------")
-    file.write("\nalways begin\n")
-    for l in only_clk:
-      only_clk_i = l.strip()
-      file.write("\t#5 "+only_clk_i+" <= ~"+only_clk_i+";\n") #TODO Make the delay value as a parameter or configurable one
-    file.write("end\n")
-    file.write("\n//--------------------------------------")
-    file.write("\n//Interface Instance")
-    file.write("\n//--------------------------------------")
-    ports = ", ".join(cr_list)
-    file.write("\n"+interface_name+" intf("+only_clk_i+");\n")
-    file.write("\n//--------------------------------------")
-    file.write("\n//DUT Instance")
-    file.write("\n//--------------------------------------")
-    file.write("\n"+dut_name+" UUT(\n")
-    intf_ports = []
-    for iter_i in all_declarators:
-      intf_ports.append(f"\t.{iter_i.lstrip()}(intf.{iter_i.lstrip()})")
-    file.write(",\n".join(intf_ports))
-    file.write("\n);\n")
-    file.write("\ninitial begin\n")
-    file.write("\tuvm_config_db#(virtual "+interface_name+")::set(uvm_root::get(), \"*\", \"vif\", intf);\n")
-    file.write("\t//enable wave dump\n")
-    file.write("\t$dumpfile(\"dump.vcd\");\n")
-    file.write("\t$dumpvars;")
-    file.write("\nend\n")
-    file.write("\ninitial begin\n")
-    file.write("\trun_test(\""+test_name+"\");")
-    file.write("\nend\n")
-
-
-    file.write("\nendmodule //"+ top_name+"\n")
+    file.write(render_template("top.sv.tpl", top_name=top_name, pkg_name=pkg_name, test_name=test_name, dut=dut_name,
+                               verilator_mode=verilator_mode, agents=agent_list,
+                               interface_name="" if agent_list else interface_name,
+                               interfaces=[a["interface"] for a in agent_list] or [interface_name],
+                               clock_declarations=clk_rst_list, clock_inits=only_clk, clocks=[c.strip() for c in only_clk],
+                               dut_parameters="#("+", ".join(f".{p}(`RTL2UVM_{p})" for p in sweep_points[0])+") " if sweep_points else "",
+                               connections=connections, backdoor=create_reg_backdoor() if reg_list else ""))
 
   logging.info(f"Successfully Created -> {l_top_path}")
 
 
 # End of create_top
 
+"""
+Creates the C++ main loop used by the cycle driven (RTL2UVM_CYCLE_DRIVEN) Verilator build.
+
+The loop toggles the clock(s) of the top module every half period and only steps
+to an earlier time when the model has a pending delayed event (Eg: UVM timeouts),
+so the testbench itself runs without any delay control.
+
+Args:
+    dut_name (str): Name of the Design Under Test (DUT), used for the model class <dut_name>_tb
+    tb_path(str)  : path to the tb folder
+
+Returns:
+    None
+"""
+@timed_emitter
+def create_main_cpp(dut_name, tb_path):
+  model_name = f"{dut_name}_tb"
+  main_path = os.path.join(tb_path, f"{dut_name}_main.cpp")
+  clocks = [c.strip() for c in only_clk]
+  with open(main_path, "w") as file:
+    file.write(render_template("main.cpp.tpl", top_name=top_name, model_name=model_name, clocks=clocks))
+  logging.info(f"Successfully Created -> {main_path}")
+
+"""
+Creates the C++ DPI functions imported by the package in Verilator mode.
+
+rtl2uvm_wall_time gives the test and the golden model scoreboard a wall clock, which
+SystemVerilog has not, without starting a shell or sharing a file between the runs of
+a folder.
+
+Args:
+    dut_name (str): Name of the Design Under Test (DUT)
+    tb_path(str)  : path to the tb folder
+
+Returns:
+    None
+"""
+@timed_emitter
+def create_dpi_cpp(dut_name, tb_path):
+  dpi_path = os.path.join(tb_path, f"{dut_name}_dpi.cpp")
+  with open(dpi_path, "w") as file:
+    file.write(render_template("dpi.cpp.tpl", pkg_name=pkg_name))
+  logging.info(f"Successfully Created -> {dpi_path}")
+
+"""
+Finds the uvm_verilator library used by the generated Verilator builds.
+
+Args:
+    None
+
+Returns:
+    str: Real path of the uvm_verilator folder, None if not found
+"""
+def find_uvm_root():
+    search_dirs = [
+        os.getcwd(),
+        os.path.join(os.getcwd(), ".."),
+    ]
+
+    # Add all immediate subdirectories (one level below)
+    search_dirs.extend([
+        os.path.join(os.getcwd(), d)
+        for d in os.listdir(os.getcwd())
+        if os.path.isdir(os.path.join(os.getcwd(), d))
+    ])
+
+    for directory in search_dirs:
+        candidate = os.path.join(directory, "uvm_verilator")
+        if os.path.isdir(candidate):
+            return os.path.realpath(candidate)
+    return None
+
+#Verilator build profiles: (verilator arguments, OPT_FAST C++ flags)
+verilator_profiles = {
+  "debug"      : ("--assert --trace --trace-depth 2", "-O0 -g"),
+  "regression" : ("-O3 --assert", "-O2"),
+  "max-perf"   : ("-O3 --x-assign fast --x-initial fast --threads $(THREADS)", "-O3 -march=native"),
+}
+
 """
 Creates a Makefile for Verilator simulation.
 
@@ -1028,99 +2082,27 @@ Args:
     verilator_path (str): Path to the verilator folder where the makefile is created
     coverage_flag (bool): Enables coverage if set to true
     ex_cr (list) : list of all the input signals.
+    profile (str): Default build profile, one of verilator_profiles
+    cycle_driven (bool): Default to the cycle driven clocking (C++ main loop instead of --main)
+    golden (bool): Build the DPI bridge to the Python golden model
+    reg_test (str): Register benchmark test run by the reg_bench target (or None)
+    sweep (list): (point name, parameter values) per parameter sweep point (or None)
 
 Returns:
     None
 """
-def create_makefile(dut_name, verilator_path, coverage_flag, ex_cr):
+@timed_emitter
+def create_makefile(dut_name, verilator_path, coverage_flag, ex_cr, profile, cycle_driven, golden, reg_test=None, sweep=None):
     makefile_path = os.path.join(verilator_path, "Makefile")
+    uvm_root = find_uvm_root()
+    if not uvm_root:
+        raise FileNotFoundError("uvm_verilator directory not found in current, parent, or immediate subdirectories.")
     with open(makefile_path, "w") as file:
-        file.write("all: simulate\n\n")
-        file.write("NPROC = $$((`nproc`-1))\n\n")
-        file.write("# -------------------------------------\n")
-        file.write("# Testbench setup\n")
-        file.write("# -------------------------------------\n")
-        file.write("VERILATOR := verilator\n")
-        file.write("ifdef VERILATOR_ROOT\n")
-        file.write("VERILATOR := $(VERILATOR_ROOT)/bin/verilator\n")
-        file.write("endif\n\n")
-        search_dirs = [
-            os.getcwd(),
-            os.path.join(os.getcwd(), ".."),
-        ]
-        
-        # Add all immediate subdirectories (one level below)
-        search_dirs.extend([
-            os.path.join(os.getcwd(), d)
-            for d in os.listdir(os.getcwd())
-            if os.path.isdir(os.path.join(os.getcwd(), d))
-        ])
-        
-        uvm_root = None
-        for directory in search_dirs:
-            candidate = os.path.join(directory, "uvm_verilator")
-            if os.path.isdir(candidate):
-                uvm_root = os.path.realpath(candidate)
-                break
-        
-        if uvm_root:
-            file.write(f"UVM_ROOT ?= {uvm_root}\n")
-        else:
-            # Optional: fallback or raise an error
-            raise FileNotFoundError("uvm_verilator directory not found in current, parent, or immediate subdirectories.")
-        file.write(f"UVM_TEST ?= {test_name}\n\n")
-        file.write(f"VERILOG_DEFINE_FILES = ${{UVM_ROOT}}/src/uvm.sv ./tb/{top_name}.sv ./tb/{dut_name}.sv\n")
-        file.write("VERILOG_INCLUDE_DIRS = tb ${UVM_ROOT}/src\n\n")
-        file.write("# -------------------------------------\n")
-        file.write("# Compilation/simulation configuration\n")
-        file.write("# -------------------------------------\n")
-        file.write(f"SIM_NAME ?= {dut_name}_tb\n")
-        file.write("SIM_DIR := ../$(SIM_NAME)-sim\n")
-        file.write("COMPILE_ARGS += -fno-gate\n")
-        file.write("COMPILE_ARGS += -DUVM_NO_DPI\n")
-        file.write("COMPILE_ARGS += --prefix $(SIM_NAME) -o $(SIM_NAME)\n")
-        file.write("COMPILE_ARGS += $(addprefix +incdir+, $(VERILOG_INCLUDE_DIRS))\n")
-        file.write("EXTRA_ARGS += --timescale 1ns/1ps --error-limit 100\n")
-        file.write("WARNING_ARGS += -Wno-lint \\\n")
-        file.write("\t-Wno-style \\\n")
-        file.write("\t-Wno-SYMRSVDWORD \\\n")
-        file.write("\t-Wno-IGNOREDRETURN \\\n")
-        file.write("\t-Wno-CONSTRAINTIGN \\\n")
-        file.write("\t-Wno-ZERODLY\n\n")
-
-        file.write("# -------------------------------------\n")
-        file.write("# VCD Configuration\n")
-        file.write("# -------------------------------------\n")
-        file.write("VCD_VAR := +VCD_DUMP\n")
-        file.write("VCD_FILE := dump.vcd\n\n")
-        file.write("# -------------------------------------\n")
-        file.write("# Make UVM test with Verilator\n")
-        file.write("# -------------------------------------\n")
-        if coverage_flag:
-            file.write(f"$(SIM_DIR)/$(SIM_NAME).mk: $(wildcard tb/*.sv)\n")
-            file.write(f"\t$(VERILATOR) --cc --exe --main --timing --assert --trace-depth 2 -Mdir $(SIM_DIR) \\\n")
-            file.write(f"\t--coverage \\\n")  #Added coverage flag
-            file.write("\t${COMPILE_ARGS} ${EXTRA_ARGS} \\\n")
-            file.write("\t${VERILOG_DEFINE_FILES} \\\n")
-            file.write("\t${WARNING_ARGS}\n\n")
-        else:
-            file.write(f"$(SIM_DIR)/$(SIM_NAME).mk: $(wildcard tb/*.sv) \n")
-            file.write(f"\t$(VERILATOR) --cc --exe --main --timing --assert --trace-depth 2 -Mdir $(SIM_DIR) \\\n")
-            file.write("\t${COMPILE_ARGS} ${EXTRA_ARGS} \\\n")
-            file.write("\t${VERILOG_DEFINE_FILES} \\\n")
-            file.write("\t${WARNING_ARGS}\n\n")
-        file.write(f"$(SIM_DIR)/$(SIM_NAME): $(SIM_DIR)/$(SIM_NAME).mk\n")
-        file.write("\t$(MAKE) -j${NPROC} -C $(SIM_DIR) $(BUILD_ARGS) -f $(SIM_NAME).mk\n\n")
-        file.write("simulate: $(SIM_DIR)/$(SIM_NAME).mk $(SIM_DIR)/$(SIM_NAME)\n")
-        file.write(f"\t#$(SIM_DIR)/$(SIM_NAME) +UVM_TESTNAME=$(UVM_TEST) $(VCD_VAR) +VCD_FILE=$(VCD_FILE)\n")
-        file.write(f"\t$(SIM_DIR)/$(SIM_NAME) +UVM_TESTNAME=$(UVM_TEST)\n\n")
-        file.write("view_vcd:\n")
-        file.write("\tgtkwave $(VCD_FILE)\n\n")
-        file.write("clean:\n")
-        file.write("\trm -rf simv*.daidir csrc\n")
-        file.write("\trm -rf csrc* simv*\n")
-        file.write("\trm -rf $(SIM_DIR)\n\n")
-        file.write(".PHONY: simulate clean view_vcd\n")
+        file.write(render_template("Makefile.tpl", dut=dut_name, uvm_root=uvm_root, test_name=test_name,
+                                   profiles=verilator_profiles, profile=profile, cycle_driven=cycle_driven,
+                                   golden=golden, coverage=coverage_flag, reg_test=reg_test,
+                                   sweep=[(name_i, " ".join(shlex.quote(f"-DRTL2UVM_{p}={v}") for p, v in point.items()))
+                                          for name_i, point in sweep or list()]))
 
     logging.info(f"Successfully Created -> {makefile_path}")
 
@@ -1148,6 +2130,7 @@ def print_port_details(tree):
                 port_name = str(m_i.declarators)
                 port_data_type= str(m_i.header.dataType)
                 print(f"    Direction: {port_direction}    Name: {port_name}   DataType: {port_data_type}")
+@timed_emitter
 def create_tb_graph(dut_name, tb_path):
     """
     Generates a graph visualization for generated UVM testbench structure
@@ -1241,85 +2224,2320 @@ def create_tb_graph(dut_name, tb_path):
 
 
 
-args = eda_argparse()
-inp_test_name = args.test
-sim_mode = args.mode
-llm_enabled = args.llm
-coverage_flag = args.coverage
-
-print("Reading RTL: " +inp_test_name)
-logging.getLogger().setLevel(logging.INFO) #TODO: Make the verbose parameterized 
-start_time = time.time() 
-tree = pyslang.SyntaxTree.fromFile(inp_test_name)
-dut_design_file= tree.root.members[0] #stores full file
-param_flag = 0
-for scope_i in (tree.root.members):
-  if(scope_i.kind.name != "ClassDeclaration"):
-    dut_name=str(scope_i.header.name) #Used to embed with tb generated files
-    break #This is only to fetch the top name, so breaking here.
-# Sanitize the DUT name for folder creation
-sanitized_dut_name = sanitize_dut_name(dut_name)
-# Create a folder specific to verilator
-if sim_mode == 'verilator':
-  verilator_path = f"{sanitized_dut_name}_verilator"
-  if not os.path.exists(verilator_path):
-    os.makedirs(verilator_path)
-  #Create tb folder inside the verilator folder
-  tb_path = os.path.join(verilator_path,"tb")
-  if not os.path.exists(tb_path):
-    os.makedirs(tb_path)
-else:
-  tb_path = folder_name
-# Copy the design file to the tb folder
-try:
-  shutil.copy(inp_test_name, tb_path)
-  logging.info(f"Successfully copied the design file to -> {tb_path}")
-except Exception as e:
-  logging.error(f"Error copying the design file: {e}")
-
-
-for scope_i in (tree.root.members):
-  if(scope_i.kind.name != "ClassDeclaration"):
-    #dut_name=str(scope_i.header.name) #Used to embed with tb generated files
-    #print(scope_i.header.ports)
-    #for j_port in scope_i.header.ports:
-    #  print(j_port)
-    if (hasattr(scope_i, 'members')): #Check if the scope has the attribute called "members"
-      for m_i in (scope_i.members):
-        #This will print the internal name for each and every line in verilog code
-        logging.debug(m_i.kind.name)
-        #This will print the verilog line corresponds to kind.name
-        logging.debug(m_i)
-        if(m_i.kind.name== "PortDeclaration"):
-          collect_port_data()
-        if(m_i.kind.name== "ParameterDeclarationStatement"):
-          param_flag = 1
-          collect_param_data()
-
-print(f'Printing ALL port list: \n {tabulate(port_list)}')
-#print(f'Printing ALL port list: \n {tabulate(input_list)}')
-#print(f'Printing ALL port list: \n {tabulate(output_list)}')
-'''
-Calling a function to create interface
-'''
-create_interface(port_list,dut_name,tb_path, sim_mode == 'verilator')
-create_seqitem(port_list,dut_name,tb_path)
-create_sequence(dut_name,tb_path)
-create_seqr(dut_name,tb_path, sim_mode == 'verilator')
-create_driver(dut_name,tb_path,llm_enabled)
-create_monitor(dut_name,tb_path,llm_enabled)
-create_agent(dut_name,tb_path)
-create_sb(dut_name,tb_path,llm_enabled)
-create_coverage(dut_name,tb_path, sim_mode == 'verilator')
-create_env(dut_name,tb_path)
-create_test(dut_name,tb_path)
-create_top(port_list,dut_name,tb_path, sim_mode == 'verilator')
-if sim_mode == 'verilator':
-    create_makefile(sanitized_dut_name,verilator_path, coverage_flag, ex_cr)
-
-# Create the UVM TB graph
-create_tb_graph(dut_name, tb_path)
-
-end_time = time.time()
-total_time = end_time - start_time
-print(f'\n************ Successfully created the testbench for {dut_name} in {total_time:.2f} seconds ************')
+"""
+Reads the coverage points of a Verilator coverage.dat file.
+
+The file is streamed line by line, every "C '<point>' <count>" line yields the
+point key (fields separated by \\001 and \\002) and its hit count.
+
+Args:
+    dat_path (str): Path to the coverage.dat file
+
+Returns:
+    generator: (point key, count) tuples
+"""
+def read_coverage_points(dat_path):
+  with open(dat_path, "r", errors="replace") as file:
+    for line in file:
+      if not line.startswith("C '"):
+        continue
+      key, _, count = line.rstrip("\n").rpartition("' ")
+      yield key[3:], int(count)
+
+"""
+Writes merged coverage points in the Verilator coverage.dat format.
+
+Args:
+    counts (Counter): Point key -> hit count
+    dat_path (str): Path of the coverage.dat file to write
+
+Returns:
+    None
+"""
+def write_coverage_points(counts, dat_path):
+  with open(dat_path, "w") as file:
+    file.write("# SystemC::Coverage-3\n")
+    for key in sorted(counts):
+      file.write(f"C '{key}' {counts[key]}\n")
+
+"""
+Merges a chunk of coverage.dat files into a single file.
+
+This function runs inside a worker of the process pool, one chunk per worker.
+
+Args:
+    task (tuple): (list of coverage.dat paths, output path)
+
+Returns:
+    str: Output path of the merged chunk
+"""
+def merge_coverage_chunk(task):
+  dat_paths, out_path = task
+  counts = Counter()
+  for dat_path in dat_paths:
+    for key, count in read_coverage_points(dat_path):
+      counts[key] += count
+  write_coverage_points(counts, out_path)
+  return out_path
+
+"""
+Merges many coverage.dat files with a tree reduction across a process pool.
+
+The first round splits the inputs into one chunk per worker, the following rounds
+merge the partial results pairwise until a single database is left.
+
+Args:
+    dat_paths (list): coverage.dat files to merge
+    out_path (str): Path of the merged coverage.dat
+    jobs (int): Number of worker processes
+
+Returns:
+    None
+"""
+def tree_merge_coverage(dat_paths, out_path, jobs):
+  jobs = max(jobs, 1)
+  with tempfile.TemporaryDirectory(prefix="rtl2uvm_cov_") as work_dir, ProcessPoolExecutor(max_workers=jobs) as pool:
+    level = list(dat_paths)
+    round_i = 0
+    while len(level) > 1:
+      fanin = max(2, -(-len(level) // jobs))
+      tasks = [(level[i:i+fanin], os.path.join(work_dir, f"r{round_i}_{i}.dat")) for i in range(0, len(level), fanin)]
+      level = list(pool.map(merge_coverage_chunk, tasks))
+      logging.debug(f"Coverage merge round {round_i}: {len(tasks)} chunks")
+      round_i += 1
+    if level:
+      merge_coverage_chunk((level, out_path))
+
+"""
+Summarizes a merged coverage database per DUT module and per port.
+
+The module name and coverage type come from the "page" field (Eg: v_toggle/sample_dut),
+toggle points are further grouped per port using the signal name in the comment field.
+
+Args:
+    dat_path (str): Path to the merged coverage.dat
+
+Returns:
+    dict: Coverage summary
+"""
+def summarize_coverage(dat_path):
+  summary = {"points": 0, "covered": 0, "duts": dict()}
+  for key, count in read_coverage_points(dat_path):
+    fields = dict(f.split("\x02", 1) for f in key.split("\x01") if "\x02" in f)
+    cov_type, _, module = fields.get("page", "v_unknown/unknown").partition("/")
+    cov_type = cov_type.replace("v_", "", 1)
+    dut = summary["duts"].setdefault(module, {"types": dict(), "ports": dict()})
+    buckets = [summary, dut["types"].setdefault(cov_type, {"points": 0, "covered": 0})]
+    if cov_type == "toggle":
+      port = re.match(r"[^\[:]*", fields.get("o", "")).group(0)
+      buckets.append(dut["ports"].setdefault(port, {"points": 0, "covered": 0}))
+    for bucket in buckets:
+      bucket["points"] += 1
+      bucket["covered"] += (count > 0)
+  return summary
+
+"""
+Writes the coverage summary as an HTML report.
+
+Args:
+    summary (dict): Coverage summary from summarize_coverage
+    html_path (str): Path of the HTML report
+
+Returns:
+    None
+"""
+def write_coverage_html(summary, html_path):
+  def pct(bucket):
+    return 100.0 * bucket["covered"] / bucket["points"] if bucket["points"] else 0.0
+  with open(html_path, "w") as file:
+    file.write("<html><head><title>RTL2UVM Coverage</title></head><body>\n")
+    file.write(f"<h1>Coverage: {pct(summary):.2f}% ({summary['covered']}/{summary['points']})</h1>\n")
+    file.write(f"<p>Merged {summary.get('files_merged', 0)} coverage files</p>\n")
+    for module, dut in sorted(summary["duts"].items()):
+      file.write(f"<h2>{html.escape(module)}</h2>\n<table border=\"1\">\n<tr><th>Type</th><th>Covered</th><th>Points</th><th>%</th></tr>\n")
+      for cov_type, bucket in sorted(dut["types"].items()):
+        file.write(f"<tr><td>{html.escape(cov_type)}</td><td>{bucket['covered']}</td><td>{bucket['points']}</td><td>{pct(bucket):.2f}</td></tr>\n")
+      file.write("</table>\n")
+      if dut["ports"]:
+        file.write("<table border=\"1\">\n<tr><th>Port</th><th>Covered</th><th>Points</th><th>%</th></tr>\n")
+        for port, bucket in sorted(dut["ports"].items()):
+          file.write(f"<tr><td>{html.escape(port)}</td><td>{bucket['covered']}</td><td>{bucket['points']}</td><td>{pct(bucket):.2f}</td></tr>\n")
+        file.write("</table>\n")
+    file.write("</body></html>\n")
+
+"""
+Collects files with the given suffixes from the given files and directories.
+
+Args:
+    inputs (list): Files or folders searched recursively
+    suffixes (tuple): File name suffixes picked up from the folders Eg: (".dat",)
+
+Returns:
+    list: Sorted list of file paths
+"""
+def collect_files(inputs, suffixes):
+  file_paths = list()
+  for input_i in inputs:
+    if os.path.isdir(input_i):
+      for root, _, files in os.walk(input_i):
+        file_paths.extend(os.path.join(root, f) for f in files if f.endswith(suffixes))
+    elif os.path.isfile(input_i):
+      file_paths.append(input_i)
+    else:
+      logging.warning(f"Input not found: {input_i}")
+  return sorted(set(os.path.realpath(p) for p in file_paths))
+
+"""
+Collects coverage.dat files from the given files and directories.
+
+Args:
+    inputs (list): coverage.dat files or folders searched recursively for *.dat
+
+Returns:
+    list: Sorted list of coverage.dat paths
+"""
+def collect_coverage_files(inputs):
+  return collect_files(inputs, (".dat",))
+
+"""
+Merges coverage files incrementally into an existing merged database.
+
+The list of already merged files (with their size and modification time) is kept
+next to the merged database, only new seeds are folded into it. Counts can not be
+taken out of a merged database, so when a merged seed changed all the recorded and
+given seeds are merged again from scratch.
+
+Args:
+    dat_paths (list): coverage.dat files to merge
+    out_path (str): Path of the merged coverage.dat
+    jobs (int): Number of worker processes
+
+Returns:
+    int: Number of files folded into the merged database
+
+Raises:
+    FileExistsError: out_path exists but was not written by this merge
+"""
+def incremental_merge_coverage(dat_paths, out_path, jobs):
+  state_path = out_path + ".merged.json"
+  merged_state = dict()
+  if os.path.exists(out_path):
+    if not os.path.exists(state_path):
+      raise FileExistsError(f"{out_path} exists without {os.path.basename(state_path)}, not overwriting it")
+    with open(state_path) as file:
+      merged_state = json.load(file)
+  out_real = os.path.realpath(out_path)
+  new_paths = list()
+  changed = False
+  for dat_path in dat_paths:
+    if dat_path == out_real:
+      continue
+    stat = os.stat(dat_path)
+    if dat_path not in merged_state:
+      new_paths.append(dat_path)
+    elif merged_state[dat_path] != [stat.st_size, stat.st_mtime]:
+      changed = True
+  if changed:
+    #Recorded seeds outside of dat_paths stay in the merged database
+    new_paths = sorted(set(dat_paths) - {out_real} | {p for p in merged_state if os.path.exists(p)})
+    merged_state = dict()
+    tree_merge_coverage(new_paths, out_path + ".tmp", jobs)
+  elif not new_paths:
+    return 0
+  elif merged_state:
+    tree_merge_coverage([out_path] + new_paths, out_path + ".tmp", jobs)
+  else:
+    tree_merge_coverage(new_paths, out_path + ".tmp", jobs)
+  os.replace(out_path + ".tmp", out_path)
+  for dat_path in new_paths:
+    stat = os.stat(dat_path)
+    merged_state[dat_path] = [stat.st_size, stat.st_mtime]
+  with open(state_path, "w") as file:
+    json.dump(merged_state, file, indent=1)
+  return len(new_paths)
+
+"""
+Parses command-line arguments of the coverage subcommand.
+
+Args:
+    argv (list): Arguments following "coverage"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def coverage_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py coverage", description="Merge and report Verilator coverage.dat files")
+    parser.add_argument('inputs', nargs='+', help='coverage.dat files or folders containing them')
+    parser.add_argument('-o', '--output', type=str, default='merged_coverage.dat', help='Merged coverage database (default: merged_coverage.dat)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of merge processes (default: number of CPUs)')
+    parser.add_argument('--json', type=str, default=None, help='Write the coverage summary as JSON')
+    parser.add_argument('--html', type=str, default=None, help='Write the coverage summary as HTML')
+    parser.add_argument('--no-incremental', action='store_true', help='Merge from scratch instead of folding into the existing output')
+    return parser.parse_args(argv)
+
+"""
+Runs the coverage subcommand: merge coverage.dat files and report the summary.
+
+Args:
+    argv (list): Arguments following "coverage"
+
+Returns:
+    int: Exit status
+"""
+def coverage_main(argv):
+  logging.getLogger().setLevel(logging.INFO)
+  cov_args = coverage_argparse(argv)
+  start_time = time.time()
+  dat_paths = collect_coverage_files(cov_args.inputs)
+  if not dat_paths:
+    logging.error("No coverage.dat files found")
+    return 1
+  if cov_args.no_incremental and os.path.exists(cov_args.output):
+    os.remove(cov_args.output)
+    if os.path.exists(cov_args.output + ".merged.json"):
+      os.remove(cov_args.output + ".merged.json")
+  try:
+    merged_count = incremental_merge_coverage(dat_paths, cov_args.output, cov_args.jobs)
+  except FileExistsError as e:
+    logging.error(f"{e}, use --no-incremental to replace it")
+    return 1
+  logging.info(f"Merged {merged_count} new coverage files into -> {cov_args.output}")
+  summary = summarize_coverage(cov_args.output)
+  with open(cov_args.output + ".merged.json") as file:
+    summary["files_merged"] = len(json.load(file))
+  if cov_args.json:
+    with open(cov_args.json, "w") as file:
+      json.dump(summary, file, indent=2)
+    logging.info(f"Successfully Created -> {cov_args.json}")
+  if cov_args.html:
+    write_coverage_html(summary, cov_args.html)
+    logging.info(f"Successfully Created -> {cov_args.html}")
+  rows = [[module, cov_type, b["covered"], b["points"]] for module, dut in sorted(summary["duts"].items()) for cov_type, b in sorted(dut["types"].items())]
+  print(f'Coverage summary: \n {tabulate(rows, headers=["Module", "Type", "Covered", "Points"])}')
+  print(f'\n************ Merged {summary["files_merged"]} coverage files in {time.time() - start_time:.2f} seconds ************')
+  return 0
+
+"""
+Runs one seed of the generated Verilator testbench in its own folder.
+
+Each seed runs in seeds/<test>_<seed>/ so the coverage.dat written by the
+simulation does not collide with the other seeds running in parallel.
+
+Args:
+    task (tuple): (simulation binary, seeds folder, test name or None, seed)
+
+Returns:
+    tuple: (test name, seed, return code, seed folder, wall seconds)
+"""
+def run_seed(task):
+  sim_bin, seeds_dir, test, seed = task
+  seed_dir = os.path.join(seeds_dir, f"{test or 'default'}_{seed}")
+  os.makedirs(seed_dir, exist_ok=True)
+  cmd = [sim_bin, f"+verilator+seed+{seed}", "+verilator+rand+reset+2"]
+  if test:
+    cmd.append(f"+UVM_TESTNAME={test}")
+  start_time = time.time()
+  with open(os.path.join(seed_dir, "sim.log"), "w") as log_file:
+    ret = subprocess.call(cmd, cwd=seed_dir, stdout=log_file, stderr=subprocess.STDOUT)
+  return test, seed, ret, seed_dir, time.time() - start_time
+
+"""
+Returns the clock cycles simulated, as printed by the generated top (RTL2UVM_CYCLES).
+
+Args:
+    log_path (str): Simulation log
+
+Returns:
+    int: Clock cycles, 0 when the log does not report them
+"""
+def sim_log_cycles(log_path):
+  cycles = 0
+  if os.path.exists(log_path):
+    with open(log_path, errors="replace") as file:
+      for line in file:
+        if line.startswith("RTL2UVM_CYCLES "):
+          cycles = int(line.split()[1])
+  return cycles
+
+"""
+Builds a generated Verilator testbench with its Makefile and returns the simulation binary.
+
+When the binary was (re)built, the build time and the peak RSS of the build processes
+are appended to the performance database. With a jobserver the build takes its C++ jobs
+from the shared token pool (GNU make jobserver protocol) instead of its own -j.
+
+Args:
+    verilator_path (str): Generated <design_name>_verilator folder
+    perf_db (str): Performance database, empty to skip recording
+    jobserver (tuple): (read fd, write fd, tokens) of the token pipe, None for a standalone build
+    make_args (list): Extra make variables Eg: ["SWEEP=p1"]
+    dut (str): DUT name in the performance database (default: from the folder name)
+
+Returns:
+    str: Absolute path of the simulation binary
+"""
+def build_testbench(verilator_path, perf_db, jobserver=None, make_args=(), dut=None):
+  sim_bin = subprocess.check_output(["make", "-s", "-C", verilator_path, "sim_path", *make_args], text=True).strip()
+  built_before = os.stat(sim_bin).st_mtime if os.path.exists(sim_bin) else None
+  env, pass_fds = None, ()
+  if jobserver:
+    read_fd, write_fd, tokens = jobserver
+    env = dict(os.environ, MAKEFLAGS=f"-j{tokens} --jobserver-auth={read_fd},{write_fd}")
+    pass_fds = (read_fd, write_fd)
+  start_time = time.time()
+  process = subprocess.Popen(["make", "-s", "-C", verilator_path, "build", *make_args], env=env, pass_fds=pass_fds)
+  _, status, usage = os.wait4(process.pid, 0) #The rusage of make includes the compilers it waited for
+  process.returncode = os.waitstatus_to_exitcode(status)
+  if process.returncode:
+    raise subprocess.CalledProcessError(process.returncode, process.args)
+  if built_before is None or os.stat(sim_bin).st_mtime != built_before:
+    record_perf(perf_db, dut or os.path.basename(verilator_path).replace("_verilator", ""), "build",
+                {"build_s": time.time() - start_time, "peak_rss_mb": usage.ru_maxrss / 1024})
+  return sim_bin
+
+"""
+Reads the performance report the generated test writes in its run folder (sim_perf.json).
+
+Args:
+    run_dir (str): Folder the simulation ran in
+
+Returns:
+    dict: Wall and simulated time, cycles and transactions of the run, empty when not reported
+"""
+def read_sim_perf(run_dir):
+  try:
+    with open(os.path.join(run_dir, "sim_perf.json")) as file:
+      return json.load(file)
+  except (OSError, ValueError):
+    return dict()
+
+"""
+Appends the simulation speed of a set of seeds to the performance database.
+
+The transactions come from the sim_perf.json report of each seed, when the test wrote one.
+
+Args:
+    perf_db (str): Performance database, empty to skip recording
+    dut (str): DUT name
+    runs (list): (simulation log, wall seconds) per seed
+
+Returns:
+    None
+"""
+def record_sim_perf(perf_db, dut, runs):
+  if not runs:
+    return
+  cycles = sum(sim_log_cycles(log_path) for log_path, _ in runs)
+  seconds = sum(seconds for _, seconds in runs)
+  values = {"seeds": len(runs), "sim_s": seconds, "cycles": cycles, "cycles_per_s": cycles / seconds if seconds else 0.0}
+  reported = [(read_sim_perf(os.path.dirname(log_path)), seconds) for log_path, seconds in runs]
+  reported = [(report, seconds) for report, seconds in reported if report]
+  if reported:
+    transactions = sum(report.get("transactions_observed", 0) for report, _ in reported)
+    report_seconds = sum(seconds for _, seconds in reported)
+    values.update({"transactions": transactions, "transactions_per_s": transactions / report_seconds if report_seconds else 0.0})
+  record_perf(perf_db, dut, "simulate", values)
+
+"""
+Parses command-line arguments of the regress subcommand.
+
+Args:
+    argv (list): Arguments following "regress"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def regress_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py regress", description="Run seeds of a generated Verilator testbench until coverage plateaus")
+    parser.add_argument('verilator_path', help='Generated <design_name>_verilator folder (built with -c)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of seeds run in parallel (default: number of CPUs)')
+    parser.add_argument('-b', '--batch', type=int, default=None, help='Seeds per batch (default: jobs)')
+    parser.add_argument('--tests', type=str, default=None, help='Comma separated UVM tests to schedule (default: test of the Makefile)')
+    parser.add_argument('--max-seeds', type=int, default=1000, help='Upper bound on the number of seeds (default: 1000)')
+    parser.add_argument('--start-seed', type=int, default=1, help='First seed (default: 1)')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Minimum coverage gain in percent per batch (default: 0.1)')
+    parser.add_argument('--patience', type=int, default=2, help='Batches below the threshold before stopping (default: 2)')
+    parser.add_argument('--report', type=str, default='regress_report.json', help='Coverage vs CPU time report (default: regress_report.json)')
+    parser.add_argument('--perf-db', type=str, default=os.environ.get("RTL2UVM_PERF_DB", "rtl2uvm_perf.db"), help='SQLite database the build and simulation metrics are appended to, empty to disable')
+    return parser.parse_args(argv)
+
+"""
+Runs the regress subcommand: a coverage driven seed scheduler.
+
+The testbench is built once, then seeds are launched in batches on a local pool.
+After every batch the new coverage files are merged incrementally and every test is
+credited with the coverage points its seeds hit first. The next batch gives more seeds
+to the tests that found new points, and the run stops once the coverage gain per batch
+stays below the threshold.
+
+Args:
+    argv (list): Arguments following "regress"
+
+Returns:
+    int: Exit status, 1 if any seed failed
+"""
+def regress_main(argv):
+  logging.getLogger().setLevel(logging.INFO)
+  reg_args = regress_argparse(argv)
+  batch_size = reg_args.batch or reg_args.jobs
+  verilator_path = os.path.realpath(reg_args.verilator_path)
+  sim_bin = build_testbench(verilator_path, reg_args.perf_db)
+  seeds_dir = os.path.join(verilator_path, "seeds")
+  merged_path = os.path.join(verilator_path, "merged_coverage.dat")
+  tests = reg_args.tests.split(",") if reg_args.tests else [None]
+  credit = {test: 1.0 for test in tests} #New points found per test, used as scheduling weight
+  covered_keys = set()
+  next_seed = reg_args.start_seed
+  last_pct = 0.0
+  stalled = 0
+  failures = list()
+  history = list()
+  sim_runs = list()
+  start_time = time.time()
+  start_cpu = resource.getrusage(resource.RUSAGE_CHILDREN)
+  with ThreadPoolExecutor(max_workers=reg_args.jobs) as pool:
+    while next_seed - reg_args.start_seed < reg_args.max_seeds:
+      #Share the batch between tests proportionally to the points they found last
+      total_credit = sum(credit.values())
+      batch_seeds = min(batch_size, reg_args.max_seeds - (next_seed - reg_args.start_seed)) #The last batch stops at --max-seeds
+      tasks = list()
+      for test in sorted(tests, key=lambda t: -credit[t]):
+        share = max(1, round(batch_seeds * credit[test] / total_credit))
+        for _ in range(min(share, batch_seeds - len(tasks))):
+          tasks.append((sim_bin, seeds_dir, test, next_seed))
+          next_seed += 1
+      results = list(pool.map(run_seed, tasks))
+      credit = {test: 0.0 for test in tests}
+      for test, seed, ret, seed_dir, seconds in results:
+        sim_runs.append((os.path.join(seed_dir, "sim.log"), seconds))
+        if ret != 0:
+          failures.append({"test": test, "seed": seed, "return_code": ret})
+        for dat_path in collect_coverage_files([seed_dir]):
+          new_keys = {key for key, count in read_coverage_points(dat_path) if count > 0} - covered_keys
+          covered_keys |= new_keys
+          credit[test] += len(new_keys)
+      credit = {test: value + 0.1 for test, value in credit.items()} #Keep every test schedulable
+      try:
+        incremental_merge_coverage(collect_coverage_files([seeds_dir]), merged_path, reg_args.jobs)
+      except FileExistsError as e:
+        logging.error(f"{e}, move it away to run the regression")
+        return 1
+      summary = summarize_coverage(merged_path) if os.path.exists(merged_path) else {"points": 0, "covered": 0}
+      pct = 100.0 * summary["covered"] / summary["points"] if summary["points"] else 0.0
+      cpu = resource.getrusage(resource.RUSAGE_CHILDREN)
+      history.append({"batch": len(history), "seeds": next_seed - reg_args.start_seed, "coverage": pct,
+                      "cpu_seconds": (cpu.ru_utime - start_cpu.ru_utime) + (cpu.ru_stime - start_cpu.ru_stime),
+                      "wall_seconds": time.time() - start_time})
+      logging.info(f"Batch {len(history)-1}: {len(tasks)} seeds, coverage {pct:.2f}% (+{pct - last_pct:.2f}%)")
+      stalled = stalled + 1 if pct - last_pct < reg_args.threshold else 0
+      last_pct = pct
+      if stalled >= reg_args.patience:
+        logging.info(f"Coverage gain below {reg_args.threshold}% for {stalled} batches, stopping")
+        break
+  record_sim_perf(reg_args.perf_db, os.path.basename(verilator_path).replace("_verilator", ""), sim_runs)
+  with open(reg_args.report, "w") as file:
+    json.dump({"history": history, "failures": failures}, file, indent=2)
+  logging.info(f"Successfully Created -> {reg_args.report}")
+  rows = [[h["batch"], h["seeds"], round(h["coverage"], 2), round(h["cpu_seconds"], 1)] for h in history]
+  print(f'Coverage vs CPU time: \n {tabulate(rows, headers=["Batch", "Seeds", "Coverage %", "CPU s"])}')
+  if failures:
+    logging.error(f"{len(failures)} seeds failed, see {reg_args.report}")
+  return 1 if failures else 0
+
+"""
+Returns the memory available for new processes (MemAvailable of /proc/meminfo).
+
+Args:
+    None
+
+Returns:
+    float: Available memory in MB, None where /proc/meminfo is not readable
+"""
+def mem_available_mb():
+  try:
+    with open("/proc/meminfo") as file:
+      for line in file:
+        if line.startswith("MemAvailable:"):
+          return int(line.split()[1]) / 1024
+  except OSError:
+    pass
+  return None
+
+"""
+Reads the recorded builds of the given DUTs from the performance database.
+
+Args:
+    perf_db (str): Performance database, empty or missing for no history
+    duts (list): DUT names
+    window (int): Latest builds per DUT considered
+
+Returns:
+    dict: DUT -> {"build_s": median build time, "peak_rss_mb": largest peak RSS of a build process}
+"""
+def build_history(perf_db, duts, window=10):
+  series = dict()
+  if perf_db and os.path.exists(perf_db) and duts:
+    query = f"SELECT dut, metric, value FROM metrics WHERE stage = 'build' AND dut IN ({', '.join('?' * len(duts))}) ORDER BY time"
+    try:
+      with contextlib.closing(sqlite3.connect(perf_db)) as db:
+        for dut, metric, value in db.execute(query, duts):
+          series.setdefault(dut, dict()).setdefault(metric, list()).append(value)
+    except sqlite3.Error as e:
+      logging.warning(f"Could not read the build history from {perf_db}: {e}")
+  history = dict()
+  for dut, metrics in series.items():
+    times = sorted(metrics.get("build_s", [])[-window:])
+    history[dut] = {"build_s": times[len(times) // 2] if times else None,
+                    "peak_rss_mb": max(metrics.get("peak_rss_mb", [])[-window:], default=None)}
+  return history
+
+"""
+Builds a batch of generated testbenches sharing one jobserver.
+
+Every Makefile takes its jobs from a single GNU make jobserver pipe, so the batch never
+runs more jobs than the pool holds: the number of CPUs (or -j), lowered so that the jobs
+fit in the available memory at the recorded peak RSS of a build job. A build starts once
+it holds a token (its first job) and its make takes further tokens as they free up. The
+builds are started longest first by their median recorded build time, builds without
+history first of all, so a long build does not end up alone at the tail of the batch.
+
+Args:
+    builds (list): (verilator folder, DUT name in the performance database, make arguments) per build
+    jobs (int): Upper bound on concurrent jobs over all the builds
+    mem_per_job (float): Memory of one compile job in MB, None for the largest recorded build peak RSS (else 1024)
+    mem_reserve (float): Memory in MB left free for the rest of the machine
+    perf_db (str): Performance database with the build history, the builds are appended to it
+
+Returns:
+    tuple: (builds in start order, DUT -> (status, build seconds, simulation binary), build history, tokens)
+"""
+def build_batch(builds, jobs, mem_per_job, mem_reserve, perf_db):
+  history = build_history(perf_db, [dut for _, dut, _ in builds])
+  mem_per_job = mem_per_job or max((h["peak_rss_mb"] or 0 for h in history.values()), default=0) or 1024
+  available = mem_available_mb()
+  tokens = jobs
+  if available is not None:
+    tokens = min(tokens, int((available - mem_reserve) // mem_per_job))
+  tokens = max(tokens, 1)
+  logging.info(f"{tokens} jobs for {len(builds)} builds ({mem_per_job:.0f} MB per job, "
+               f"{'unknown' if available is None else f'{available:.0f} MB'} available)")
+  order = sorted(builds, key=lambda b: -(history.get(b[1], {}).get("build_s") or float("inf")))
+  read_fd, write_fd = os.pipe()
+  os.write(write_fd, b"+" * tokens)
+  results = dict()
+  def build(path, dut, make_args):
+    start_time = time.time()
+    try:
+      sim_bin = build_testbench(path, perf_db, (read_fd, write_fd, tokens), make_args, dut)
+      results[dut] = ("ok", time.time() - start_time, sim_bin)
+    except (subprocess.CalledProcessError, OSError) as e:
+      logging.error(f"Build of {dut} failed: {e}")
+      results[dut] = ("failed", time.time() - start_time, None)
+    finally:
+      os.write(write_fd, b"+") #The token the build was started with
+  with ThreadPoolExecutor(max_workers=len(order)) as pool:
+    for path, dut, make_args in order:
+      while True:
+        try:
+          os.read(read_fd, 1)
+          break
+        except BlockingIOError: #GNU make switches the shared pipe to non-blocking
+          select.select([read_fd], [], [])
+      pool.submit(build, path, dut, make_args)
+  os.close(read_fd)
+  os.close(write_fd)
+  return order, results, history, tokens
+
+"""
+Parses command-line arguments of the build subcommand.
+
+Args:
+    argv (list): Arguments following "build"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def build_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py build", description="Build many generated Verilator testbenches on a shared, memory-capped jobserver")
+    parser.add_argument('verilator_paths', nargs='+', help='Generated <design_name>_verilator folders')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Upper bound on concurrent jobs over all the builds (default: number of CPUs)')
+    parser.add_argument('--mem-per-job', type=float, default=None, help='Memory of one compile job in MB (default: largest recorded build peak RSS, else 1024)')
+    parser.add_argument('--mem-reserve', type=float, default=1024, help='Memory in MB left free for the rest of the machine (default: 1024)')
+    parser.add_argument('--perf-db', type=str, default=os.environ.get("RTL2UVM_PERF_DB", "rtl2uvm_perf.db"), help='SQLite database with the build history, the builds are appended to it, empty to disable')
+    return parser.parse_args(argv)
+
+"""
+Runs the build subcommand: builds a batch of generated testbenches sharing one jobserver (build_batch).
+
+Args:
+    argv (list): Arguments following "build"
+
+Returns:
+    int: Exit status, 1 if any build failed
+"""
+def build_main(argv):
+  logging.getLogger().setLevel(logging.INFO)
+  build_args = build_argparse(argv)
+  paths = [os.path.realpath(p) for p in build_args.verilator_paths]
+  builds = [(p, os.path.basename(p).replace("_verilator", ""), ()) for p in paths]
+  start_time = time.time()
+  order, results, history, tokens = build_batch(builds, build_args.jobs, build_args.mem_per_job, build_args.mem_reserve, build_args.perf_db)
+  rows = [[dut, history.get(dut, {}).get("build_s"), round(results[dut][1], 1), results[dut][0]] for _, dut, _ in order]
+  print(f'Builds (in start order): \n {tabulate(rows, headers=["DUT", "Expected s", "Build s", "Status"], floatfmt=".1f")}')
+  failed = [r for r in results.values() if r[0] != "ok"]
+  print(f'\n************ Built {len(paths) - len(failed)}/{len(paths)} testbenches in {time.time() - start_time:.2f} seconds with {tokens} jobs ************')
+  return 1 if failed else 0
+
+"""
+Parses command-line arguments of the sweep subcommand.
+
+Args:
+    argv (list): Arguments following "sweep"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def sweep_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py sweep", description="Build and run every parameter point of a testbench generated with --sweep")
+    parser.add_argument('verilator_path', help='Generated <design_name>_verilator folder (generated with --sweep)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Upper bound on concurrent build jobs and on concurrent simulations (default: number of CPUs)')
+    parser.add_argument('--mem-per-job', type=float, default=None, help='Memory of one compile job in MB (default: largest recorded build peak RSS, else 1024)')
+    parser.add_argument('--mem-reserve', type=float, default=1024, help='Memory in MB left free for the rest of the machine (default: 1024)')
+    parser.add_argument('--test', type=str, default=None, help='UVM test run at every point (default: test of the Makefile)')
+    parser.add_argument('--seed', type=int, default=1, help='Simulation seed of every point (default: 1)')
+    parser.add_argument('--report', type=str, default='sweep_report.json', help='Per point summary (default: sweep_report.json)')
+    parser.add_argument('--perf-db', type=str, default=os.environ.get("RTL2UVM_PERF_DB", "rtl2uvm_perf.db"), help='SQLite database the build and simulation metrics are appended to (as <dut>@<point>), empty to disable')
+    return parser.parse_args(argv)
+
+"""
+Runs the sweep subcommand: builds and simulates every parameter point of a testbench.
+
+The points come from the sweep.json written by the generator (--sweep). Each point is one
+build of the same Makefile (make build SWEEP=<point>, its own SIM_DIR), all of them on one
+shared jobserver (build_batch). The points that built then run concurrently, each in
+sweep/<point>/, and the results are summarized per parameter point.
+
+Args:
+    argv (list): Arguments following "sweep"
+
+Returns:
+    int: Exit status, 1 if any point failed to build or to pass
+"""
+def sweep_main(argv):
+  logging.getLogger().setLevel(logging.INFO)
+  sweep_args = sweep_argparse(argv)
+  verilator_path = os.path.realpath(sweep_args.verilator_path)
+  dut = os.path.basename(verilator_path).replace("_verilator", "")
+  try:
+    with open(os.path.join(verilator_path, "sweep.json")) as file:
+      points = json.load(file)["points"]
+  except (OSError, ValueError, KeyError) as e:
+    logging.error(f"No parameter sweep in {verilator_path}, generate it with --sweep: {e}")
+    return 1
+  if not points:
+    logging.error(f"No parameter sweep in {verilator_path}, generate it with --sweep")
+    return 1
+  start_time = time.time()
+  builds = [(verilator_path, f"{dut}@{p['name']}", [f"SWEEP={p['name']}"]) for p in points]
+  _, built, _, tokens = build_batch(builds, sweep_args.jobs, sweep_args.mem_per_job, sweep_args.mem_reserve, sweep_args.perf_db)
+  sweep_dir = os.path.join(verilator_path, "sweep")
+  ready = [p for p in points if built[f"{dut}@{p['name']}"][0] == "ok"]
+  tasks = [(built[f"{dut}@{p['name']}"][2], os.path.join(sweep_dir, p["name"]), sweep_args.test, sweep_args.seed) for p in ready]
+  runs = dict()
+  if tasks:
+    with ThreadPoolExecutor(max_workers=sweep_args.jobs) as pool:
+      runs = dict(zip([p["name"] for p in ready], pool.map(run_seed, tasks)))
+  summary = list()
+  for point in points:
+    status, build_s, _ = built[f"{dut}@{point['name']}"]
+    entry = {"point": point["name"], "params": point["params"], "build_s": build_s, "status": "build failed"}
+    if point["name"] in runs:
+      _, _, ret, run_dir, seconds = runs[point["name"]]
+      log_path = os.path.join(run_dir, "sim.log")
+      severity = analyze_uvm_log((log_path, 0))["severity"]
+      report = read_sim_perf(run_dir)
+      cycles = report.get("cycles", sim_log_cycles(log_path))
+      entry.update({"return_code": ret, "errors": severity["UVM_ERROR"] + severity["UVM_FATAL"], "sim_s": seconds,
+                    "cycles": cycles, "cycles_per_s": report.get("cycles_per_s", cycles / seconds if seconds else 0.0),
+                    "transactions": report.get("transactions_observed"), "transactions_per_s": report.get("transactions_per_s")})
+      entry["status"] = "pass" if ret == 0 and not entry["errors"] else "fail"
+      record_sim_perf(sweep_args.perf_db, f"{dut}@{point['name']}", [(log_path, seconds)])
+    summary.append(entry)
+  with open(sweep_args.report, "w") as file:
+    json.dump({"dut": dut, "points": summary}, file, indent=2)
+  logging.info(f"Successfully Created -> {sweep_args.report}")
+  names = list(points[0]["params"])
+  rows = [[e["point"]] + [e["params"].get(n) for n in names] + [e["build_s"], e.get("sim_s"), e.get("cycles"), e.get("cycles_per_s"),
+          e.get("transactions_per_s"), e.get("errors"), e["status"]] for e in summary]
+  print(f'Parameter sweep: \n {tabulate(rows, headers=["Point"] + names + ["Build s", "Sim s", "Cycles", "Cycles/s", "Txn/s", "Errors", "Status"], floatfmt=".1f")}')
+  failed = [e for e in summary if e["status"] != "pass"]
+  print(f'\n************ {len(points) - len(failed)}/{len(points)} parameter points passed in {time.time() - start_time:.2f} seconds with {tokens} build jobs ************')
+  return 1 if failed else 0
+
+"""
+Memory maps a binary transaction trace written by the generated monitor (+TRACE_BIN).
+
+The records are exposed as a NumPy structured array without reading the file, every
+field of the layout (and "time") is a column Eg: trace["din"]. Fields up to 64 bits are
+unsigned integers, wider fields are raw little endian bytes.
+
+Args:
+    trace_path (str): Path to the binary trace
+
+Returns:
+    numpy.memmap: Structured array with one record per published item
+"""
+def read_trace(trace_path):
+  import numpy as np
+  with open(trace_path, "rb") as file:
+    magic = file.readline()
+    if magic != b"RTL2UVM_TRACE\n":
+      raise ValueError(f"{trace_path} is not an RTL2UVM trace")
+    layout = json.loads(file.readline())
+    offset = file.tell()
+  dtype = [("time", "<u8")]
+  for field in layout["fields"]:
+    dtype.append((field["name"], {4: "<u4", 8: "<u8"}.get(field["bytes"], f"V{field['bytes']}")))
+  dtype = np.dtype(dtype)
+  records = (os.path.getsize(trace_path) - offset) // dtype.itemsize
+  if records == 0:
+    return np.zeros(0, dtype=dtype)
+  return np.memmap(trace_path, dtype=dtype, mode="r", offset=offset, shape=(records,))
+
+"""
+Parses command-line arguments of the trace subcommand.
+
+Args:
+    argv (list): Arguments following "trace"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def trace_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py trace", description="Inspect, filter and diff binary monitor traces")
+    parser.add_argument('trace', help='Binary trace written with +TRACE_BIN=<file>')
+    parser.add_argument('--where', type=str, default=None, help='NumPy expression over the columns, Eg: "(read == 1) & (din > 3)"')
+    parser.add_argument('--diff', type=str, default=None, help='Second trace to compare record by record (time excluded)')
+    parser.add_argument('--head', type=int, default=10, help='Number of records to print (default: 10)')
+    parser.add_argument('--chunk', type=int, default=1 << 20, help='Records processed per chunk (default: 1048576)')
+    return parser.parse_args(argv)
+
+"""
+Runs the trace subcommand: summary, filter and diff of binary monitor traces.
+
+The traces are memory mapped and processed in chunks, so multi-gigabyte traces
+are handled with bounded memory.
+
+Args:
+    argv (list): Arguments following "trace"
+
+Returns:
+    int: Exit status, 1 if the diff found mismatches
+"""
+def trace_main(argv):
+  trace_args = trace_argparse(argv)
+  trace = read_trace(trace_args.trace)
+  names = list(trace.dtype.names)
+  print(f"{trace_args.trace}: {len(trace)} records, fields: {', '.join(names)}")
+  if trace_args.diff:
+    other = read_trace(trace_args.diff)
+    fields = [n for n in names if n != "time" and n in (other.dtype.names or ())]
+    common = min(len(trace), len(other))
+    mismatches = 0
+    first = None
+    for start in range(0, common, trace_args.chunk):
+      stop = min(start + trace_args.chunk, common)
+      differ = trace[fields][start:stop] != other[fields][start:stop]
+      mismatches += int(differ.sum())
+      if first is None and differ.any():
+        first = start + int(differ.argmax())
+    print(f"Compared {common} records on {', '.join(fields)}: {mismatches} mismatches")
+    if len(trace) != len(other):
+      print(f"Record count differs: {len(trace)} vs {len(other)}")
+    if first is not None:
+      print(f"First mismatch at record {first}:")
+      print(f"  {trace_args.trace}: {trace[first]}")
+      print(f"  {trace_args.diff}: {other[first]}")
+    return 1 if mismatches or len(trace) != len(other) else 0
+  matched = 0
+  shown = list()
+  for start in range(0, len(trace), trace_args.chunk):
+    chunk = trace[start:start + trace_args.chunk]
+    if trace_args.where:
+      mask = eval(trace_args.where, {"__builtins__": {}}, {n: chunk[n] for n in names})
+      chunk = chunk[mask]
+    matched += len(chunk)
+    if len(shown) < trace_args.head:
+      shown.extend(chunk[:trace_args.head - len(shown)].tolist())
+  if trace_args.where:
+    print(f"{matched} records match {trace_args.where}")
+  print(tabulate(shown, headers=names))
+  return 0
+
+#UVM report line Eg: UVM_INFO(UVM_LOW) tb/x_driver.sv(12) @ 100: uvm_test_top.u_env [ID] message
+uvm_report_re = re.compile(r"^(UVM_INFO|UVM_WARNING|UVM_ERROR|UVM_FATAL)(?:\(\w+\))?\s+(?:\S+\(\d+\)\s+)?@\s*([^:]*):\s+(\S+)\s+\[([^\]]*)\]")
+
+"""
+Stream parses one UVM log file.
+
+The file is read line by line (gzip logs included) with a bounded window of previous
+lines kept as context for the first UVM_ERROR/UVM_FATAL. This function runs inside a
+worker of the process pool, one log per task.
+
+Args:
+    task (tuple): (log path, number of context lines)
+
+Returns:
+    dict: Severity counts, per component counts, first failure and simulated time span
+"""
+def analyze_uvm_log(task):
+  log_path, context_lines = task
+  summary = {"log": log_path, "severity": Counter(), "components": Counter(), "first_failure": None,
+             "last_time": 0.0, "completed": False}
+  before = deque(maxlen=context_lines)
+  after_left = 0
+  opener = gzip.open if log_path.endswith(".gz") else open
+  with opener(log_path, "rt", errors="replace") as file:
+    for line_no, line in enumerate(file, 1):
+      line = line.rstrip("\n")
+      if after_left:
+        summary["first_failure"]["context"].append(line)
+        after_left -= 1
+      if "UVM Report Summary" in line:
+        summary["completed"] = True
+      match = uvm_report_re.match(line)
+      if match:
+        severity, sim_time, component = match.group(1), match.group(2), match.group(3)
+        summary["severity"][severity] += 1
+        summary["components"][component] += 1
+        time_match = re.match(r"[\d.]+", sim_time.strip())
+        if time_match:
+          summary["last_time"] = max(summary["last_time"], float(time_match.group(0)))
+        if severity in ("UVM_ERROR", "UVM_FATAL") and summary["first_failure"] is None:
+          summary["first_failure"] = {"line": line_no, "message": line, "context": list(before) + [line]}
+          after_left = context_lines
+      before.append(line)
+  return summary
+
+"""
+Parses command-line arguments of the logs subcommand.
+
+Args:
+    argv (list): Arguments following "logs"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def logs_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py logs", description="Analyze UVM logs of regression runs")
+    parser.add_argument('inputs', nargs='+', help='Log files (*.log, *.log.gz) or folders containing them')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of parser processes (default: number of CPUs)')
+    parser.add_argument('--json', type=str, default=None, help='Write the summary as JSON')
+    parser.add_argument('--context', type=int, default=5, help='Lines of context around the first failure (default: 5)')
+    parser.add_argument('--max-warnings', type=int, default=-1, help='Fail when a log has more warnings (default: no limit)')
+    parser.add_argument('--allow-incomplete', action='store_true', help='Do not fail logs without the UVM report summary')
+    return parser.parse_args(argv)
+
+"""
+Runs the logs subcommand: aggregate UVM report lines across many logs.
+
+The logs are parsed in parallel, the summary gives the severity counts, the first
+failure with its context per log and the message count/rate per component. A log fails
+on UVM_ERROR/UVM_FATAL, on too many warnings or when the UVM report summary is missing.
+
+Args:
+    argv (list): Arguments following "logs"
+
+Returns:
+    int: Exit status for CI gating, 1 if any log failed
+"""
+def logs_main(argv):
+  log_args = logs_argparse(argv)
+  start_time = time.time()
+  log_paths = collect_files(log_args.inputs, (".log", ".log.gz"))
+  if not log_paths:
+    logging.error("No log files found")
+    return 1
+  with ProcessPoolExecutor(max_workers=max(log_args.jobs, 1)) as pool:
+    results = list(pool.map(analyze_uvm_log, [(p, log_args.context) for p in log_paths], chunksize=8))
+  severity = Counter()
+  components = Counter()
+  sim_time = 0.0
+  failing = list()
+  for result in results:
+    severity.update(result["severity"])
+    components.update(result["components"])
+    sim_time += result["last_time"]
+    reasons = list()
+    if result["severity"]["UVM_ERROR"] or result["severity"]["UVM_FATAL"]:
+      reasons.append("errors")
+    if log_args.max_warnings >= 0 and result["severity"]["UVM_WARNING"] > log_args.max_warnings:
+      reasons.append("warnings")
+    if not result["completed"] and not log_args.allow_incomplete:
+      reasons.append("incomplete")
+    result["failed"] = reasons
+    if reasons:
+      failing.append(result["log"])
+  summary = {"logs": len(results), "failing_logs": failing, "severity": dict(severity),
+             "components": {c: {"messages": n, "per_1k_time": 1000.0 * n / sim_time if sim_time else 0.0}
+                            for c, n in components.most_common()},
+             "per_log": [{**r, "severity": dict(r["severity"]), "components": dict(r["components"])} for r in results]}
+  if log_args.json:
+    with open(log_args.json, "w") as file:
+      json.dump(summary, file, indent=2)
+    logging.info(f"Successfully Created -> {log_args.json}")
+  print(f'Severity: \n {tabulate(sorted(severity.items()), headers=["Severity", "Count"])}')
+  print(f'Top components: \n {tabulate(components.most_common(10), headers=["Component", "Messages"])}')
+  for result in results:
+    if result["failed"] and result["first_failure"]:
+      print(f"\nFirst failure in {result['log']} (line {result['first_failure']['line']}):")
+      print("\n".join("  " + l for l in result["first_failure"]["context"]))
+  print(f'\n************ Analyzed {len(results)} logs in {time.time() - start_time:.2f} seconds, {len(failing)} failing ************')
+  return 1 if failing else 0
+
+"""
+Clears the port data collected by a previous parse of the design.
+
+Args:
+    None
+
+Returns:
+    None
+"""
+def reset_port_data():
+  for data in (port_list, input_list, input_declarators, output_list, output_declarators, all_declarators,
+               clk_rst_list, cr_list, only_clk, only_rst, ex_cr, param_list, cp_in_list, qualifier_list, cov_plan,
+               agent_list, llm_metrics, reg_list, sweep_points):
+    data.clear()
+  port_dtype_map.clear()
+  reg_bus.clear()
+  emitter_times.clear()
+  template_stats.clear()
+
+"""
+Parses the RTL and generates the complete testbench.
+
+Args:
+    args (argparse.Namespace): Parsed generator arguments
+    out_root (str): Folder the tb (or <design_name>_verilator) folder is created in, "" for the current folder
+    draw_graph (bool): Draw the testbench graph (skipped while watching, it dominates the latency)
+
+Returns:
+    str: The DUT name
+"""
+def generate_tb(args, out_root, draw_graph=True):
+  global m_i, dut_design_file, param_flag
+  inp_test_name = args.test
+  sim_mode = args.mode
+  llm_enabled = args.llm
+  coverage_flag = args.coverage
+  reset_port_data()
+  configure_templates(args.templates, args.template_cache)
+  llm_backend["record"] = args.llm_record
+  llm_backend["replay"] = load_llm_recording(args.llm_replay) if args.llm_replay else None
+  print("Reading RTL: " +inp_test_name)
+  start_time = time.time() 
+  #A fresh source manager per parse: the default one caches the file by path, so a watch or
+  #service rerun would parse the old text, and it would grow with every generation
+  source_manager = pyslang.SourceManager()
+  tree = pyslang.SyntaxTree.fromFile(inp_test_name, source_manager)
+  dut_design_file= tree.root.members[0] #stores full file
+  param_flag = 0
+  for scope_i in (tree.root.members):
+    if(scope_i.kind.name != "ClassDeclaration"):
+      dut_name=str(scope_i.header.name) #Used to embed with tb generated files
+      break #This is only to fetch the top name, so breaking here.
+  # Sanitize the DUT name for folder creation
+  sanitized_dut_name = sanitize_dut_name(dut_name)
+  # Create a folder specific to verilator
+  if sim_mode == 'verilator':
+    verilator_path = os.path.join(out_root, f"{sanitized_dut_name}_verilator")
+    if not os.path.exists(verilator_path):
+      os.makedirs(verilator_path)
+    else:
+      #Files linked from an output store are shared with other testbenches, the emitters must not write through them
+      for root, _, files in os.walk(verilator_path):
+        for f in files:
+          release_store_link(os.path.join(root, f))
+    #Create tb folder inside the verilator folder
+    tb_path = os.path.join(verilator_path,"tb")
+    if not os.path.exists(tb_path):
+      os.makedirs(tb_path)
+  else:
+    tb_path = os.path.join(out_root, folder_name)
+    if not os.path.exists(tb_path):
+      os.makedirs(tb_path)
+  # Copy the design file to the tb folder
+  try:
+    shutil.copy(inp_test_name, tb_path)
+    logging.info(f"Successfully copied the design file to -> {tb_path}")
+  except Exception as e:
+    logging.error(f"Error copying the design file: {e}")
+
+
+  for scope_i in (tree.root.members):
+    if(scope_i.kind.name != "ClassDeclaration"):
+      #dut_name=str(scope_i.header.name) #Used to embed with tb generated files
+      #print(scope_i.header.ports)
+      #for j_port in scope_i.header.ports:
+      #  print(j_port)
+      if (hasattr(scope_i, 'members')): #Check if the scope has the attribute called "members"
+        for m_i in (scope_i.members):
+          #This will print the internal name for each and every line in verilog code
+          logging.debug(m_i.kind.name)
+          #This will print the verilog line corresponds to kind.name
+          logging.debug(m_i)
+          if(m_i.kind.name== "PortDeclaration"):
+            collect_port_data()
+          if(m_i.kind.name== "ParameterDeclarationStatement"):
+            param_flag = 1
+            collect_param_data()
+  if args.sweep and sim_mode != 'verilator':
+    logging.warning("The parameter sweep needs verilator mode, skipping it")
+  elif args.sweep and load_sweep(args.sweep):
+    print(f'Parameter sweep: \n {tabulate([["p"+str(i)] + list(p.values()) for i, p in enumerate(sweep_points)], headers=["Point"] + list(sweep_points[0]))}')
+  parse_time = time.time() - start_time
+
+  print(f'Printing ALL port list: \n {tabulate(port_list)}')
+  #print(f'Printing ALL port list: \n {tabulate(input_list)}')
+  #print(f'Printing ALL port list: \n {tabulate(output_list)}')
+  '''
+  Calling a function to create interface
+  '''
+  agent_groups = group_ports(args.agents) if args.agents else list()
+  if len(agent_groups) > 1:
+    print(f'Agent groups: \n {tabulate([[g["name"], g["clock"], ", ".join(g["ports"])] for g in agent_groups], headers=["Agent", "Clock", "Ports"])}')
+    golden_batch = 0
+    if args.golden:
+      logging.warning("The golden model bridge supports a single agent, skipping it")
+    if args.regs:
+      logging.warning("The register model supports a single agent, skipping it")
+    create_agent_groups(agent_groups,dut_name,tb_path,llm_enabled, sim_mode == 'verilator',args)
+    create_virtual_sequence(dut_name,tb_path)
+  else:
+    if args.agents:
+      logging.info("All the ports fall in one agent group, generating a single agent")
+    create_interface(port_list,dut_name,tb_path, sim_mode == 'verilator')
+    create_seqitem(port_list,dut_name,tb_path)
+    create_sequence(dut_name,tb_path)
+    create_seqr(dut_name,tb_path, sim_mode == 'verilator')
+    if args.regs:
+      load_registers(args.regs, args.reg_bus)
+    create_driver(dut_name,tb_path,llm_enabled and not args.llm_batch,args.llm_budget,args.llm_retries)
+    detect_qualifiers(args.qualifiers)
+    print(f'Monitor sampling qualifiers: \n {tabulate(qualifier_list, headers=["Signal", "Active Low"])}')
+    create_monitor(dut_name,tb_path,llm_enabled and not args.llm_batch, sim_mode == 'verilator', prompt_budget=args.llm_budget, llm_retries=args.llm_retries)
+    create_agent(dut_name,tb_path)
+    golden_batch = args.golden_batch if args.golden and sim_mode == 'verilator' else 0
+    if args.golden and not golden_batch:
+      logging.warning("The golden model bridge needs verilator mode, skipping it")
+    create_sb(dut_name,tb_path,llm_enabled,golden_batch)
+    if golden_batch:
+      create_golden_model(dut_name,tb_path)
+    if reg_list:
+      create_reg_model(dut_name,tb_path)
+    if llm_enabled and args.llm_batch:
+      #The golden model scoreboard keeps its template
+      create_llm_components([(c, os.path.join(tb_path, c+".sv")) for c in [driver_name, monitor_name] + ([] if golden_batch or args.llm_batch_no_scoreboard else [sb_name])],
+                            args.llm_budget, args.llm_retries)
+    plan_coverage(args.cov_bins, args.cov_cross)
+    create_coverage(dut_name,tb_path, sim_mode == 'verilator')
+  create_env(dut_name,tb_path)
+  create_test(dut_name,tb_path, sim_mode == 'verilator')
+  create_pkg(dut_name,tb_path,os.path.basename(inp_test_name), sim_mode == 'verilator')
+  create_top(port_list,dut_name,tb_path, sim_mode == 'verilator')
+  if sim_mode == 'verilator':
+      create_main_cpp(sanitized_dut_name, tb_path)
+      create_dpi_cpp(sanitized_dut_name, tb_path)
+      sweep = create_sweep_params(dut_name, tb_path, verilator_path) if sweep_points else None
+      create_makefile(sanitized_dut_name,verilator_path, coverage_flag, ex_cr, args.profile, args.cycle_driven, golden_batch != 0,
+                      reg_test_name if reg_list else None, sweep)
+
+  if llm_metrics:
+    report_llm_metrics(tb_path)
+
+  # Create the UVM TB graph
+  if draw_graph:
+    create_tb_graph(dut_name, tb_path)
+
+  end_time = time.time()
+  total_time = end_time - start_time
+  perf = {"total_s": total_time, "parse_s": parse_time,
+          "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+  perf.update((name.replace("create_", "", 1) + "_s", seconds) for name, seconds in emitter_times.items())
+  perf.update(("templates_" + origin, count) for origin, count in template_stats.items())
+  if llm_metrics:
+    perf.update({"llm_requests": len(llm_metrics), "llm_latency_ms": sum(m.get("latency_ms", 0) for m in llm_metrics),
+                 "llm_prompt_tokens": sum(m.get("prompt_tokens", m["prompt_tokens_est"]) for m in llm_metrics),
+                 "llm_response_tokens": sum(m.get("response_tokens", 0) for m in llm_metrics)})
+  record_perf(args.perf_db, sanitized_dut_name, "generate", perf)
+  print(f'\n************ Successfully created the testbench for {dut_name} in {total_time:.2f} seconds ************')
+  return dut_name
+
+"""
+Yields every time the RTL file is saved.
+
+The folder of the file is watched with Linux inotify (through libc, so editors that save
+by renaming a temporary file are seen too); where inotify is not available the file is
+polled for a new modification time or size. Bursts of events from one save are merged.
+
+Args:
+    rtl_path (str): RTL file to watch
+    interval (float): Polling interval in seconds, also the debounce window for inotify
+
+Returns:
+    generator: Yields None after each change
+"""
+def rtl_changes(rtl_path, interval):
+  rtl_dir, rtl_file = os.path.split(os.path.abspath(rtl_path))
+  inotify_fd = -1
+  try:
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    inotify_fd = libc.inotify_init1(os.O_CLOEXEC)
+    #IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    if inotify_fd >= 0 and libc.inotify_add_watch(inotify_fd, rtl_dir.encode(), 0x2 | 0x8 | 0x80 | 0x100) < 0:
+      os.close(inotify_fd)
+      inotify_fd = -1
+  except (OSError, AttributeError):
+    inotify_fd = -1
+  if inotify_fd < 0:
+    logging.info(f"inotify is not available, polling {rtl_path} every {interval}s")
+    def signature():
+      try:
+        stat = os.stat(rtl_path)
+        return (stat.st_mtime_ns, stat.st_size)
+      except FileNotFoundError:
+        return None
+    last = signature()
+    while True:
+      time.sleep(interval)
+      current = signature()
+      if current != last and current is not None:
+        last = current
+        yield
+  while True:
+    changed = False
+    timeout = None
+    #Block for the first event, then drain the rest of the burst within the debounce window
+    while select.select([inotify_fd], [], [], timeout)[0]:
+      data = os.read(inotify_fd, 65536)
+      offset = 0
+      while offset < len(data):
+        _, _, _, name_len = struct.unpack_from("iIII", data, offset)
+        name = data[offset + 16:offset + 16 + name_len].rstrip(b"\0").decode(errors="replace")
+        changed |= name == rtl_file
+        offset += 16 + name_len
+      timeout = interval if changed else None
+    if changed and os.path.exists(rtl_path):
+      yield
+
+#Files written by the last generation into a generated folder (tb, <dut_name>_verilator)
+generated_manifest = ".rtl2uvm_manifest.json"
+
+"""
+Removes the output files an earlier generation wrote that the new generation does not write.
+
+Eg: the files of a renamed agent, of a dropped --regs or of a removed --sweep, which would
+otherwise still be compiled through $(wildcard tb/*.sv). The generated files are listed in a
+manifest in every generated top folder, so files added there by the user or the simulation
+are kept. Must run before the staged files are moved out of the stage.
+
+Args:
+    stage_root (str): Folder the testbench was generated in
+    out_root (str): Folder holding the testbench in use ("" for the current folder)
+
+Returns:
+    list: Paths of the removed files
+"""
+def prune_generated(stage_root, out_root):
+  removed = list()
+  for top in os.listdir(stage_root):
+    stage_top = os.path.join(stage_root, top)
+    if not os.path.isdir(stage_top):
+      continue
+    generated = sorted(os.path.relpath(os.path.join(root, f), stage_top) for root, _, files in os.walk(stage_top) for f in files)
+    manifest_path = os.path.join(out_root, top, generated_manifest)
+    try:
+      with open(manifest_path) as file:
+        previous = json.load(file)
+    except (OSError, ValueError):
+      previous = list()
+    for rel_path in sorted(set(previous) - set(generated)):
+      out_file = os.path.join(out_root, top, rel_path)
+      if os.path.lexists(out_file):
+        os.unlink(out_file)
+        removed.append(out_file)
+        logging.info(f"Successfully Removed -> {out_file}")
+    os.makedirs(os.path.join(out_root, top), exist_ok=True)
+    with open(manifest_path, "w") as file:
+      json.dump(generated, file, indent=1)
+  return removed
+
+"""
+Copies the files of a freshly generated tree over the output tree.
+
+Only files whose content differs are written, unchanged files keep their timestamps so
+make and Verilator do not rebuild them.
+Files no longer generated are removed (prune_generated).
+
+Args:
+    stage_root (str): Folder the testbench was generated in
+    out_root (str): Folder holding the testbench in use ("" for the current folder)
+
+Returns:
+    list: Paths of the rewritten files
+"""
+def sync_generated(stage_root, out_root):
+  prune_generated(stage_root, out_root)
+  rewritten = list()
+  for root, _, files in os.walk(stage_root):
+    for f in files:
+      stage_file = os.path.join(root, f)
+      out_file = os.path.join(out_root, os.path.relpath(stage_file, stage_root))
+      with open(stage_file, "rb") as file:
+        content = file.read()
+      try:
+        with open(out_file, "rb") as file:
+          if file.read() == content:
+            continue
+      except FileNotFoundError:
+        os.makedirs(os.path.dirname(out_file) or ".", exist_ok=True)
+      release_store_link(out_file)
+      with open(out_file, "wb") as file:
+        file.write(content)
+      rewritten.append(out_file)
+  return rewritten
+
+"""
+Removes a file of the output tree that is linked to an output store.
+
+A stored object is shared by every tree linking it, so the file is removed before it is
+written again instead of being written through.
+
+Args:
+    path (str): Output file
+
+Returns:
+    None
+"""
+def release_store_link(path):
+  if os.path.islink(path) or (os.path.isfile(path) and os.stat(path).st_nlink > 1):
+    os.unlink(path)
+
+"""
+Moves the files of a freshly generated tree into a content-addressed store and links them
+into the output tree.
+
+Every file is kept once, read-only, under the sha256 of its content
+(<store>/objects/ab/cdef...), so the identical files of other DUTs and earlier runs (agent,
+env and test skeletons, design copies of parameter variants) take no extra space and are
+not written again. The output tree gets a hard link to the object, or a symbolic link with
+--store-link symlink or when the store is on another filesystem. A file already linked to
+its object is left alone; a changed one is replaced atomically and a reused object is
+touched so make sees the change. Files no longer generated are removed (prune_generated).
+
+Args:
+    stage_root (str): Folder the testbench was generated in, inside the store
+    out_root (str): Folder holding the testbench in use ("" for the current folder)
+    store (str): Store folder
+    link (str): "hard" or "symlink"
+
+Returns:
+    list: Paths of the rewritten files
+"""
+def store_generated(stage_root, out_root, store, link):
+  prune_generated(stage_root, out_root)
+  stats = Counter()
+  rewritten = list()
+  for root, _, files in os.walk(stage_root):
+    for f in files:
+      stage_file = os.path.join(root, f)
+      out_file = os.path.join(out_root, os.path.relpath(stage_file, stage_root))
+      digest = file_sha256(stage_file)
+      object_path = os.path.join(store, "objects", digest[:2], digest[2:])
+      stats["files"] += 1
+      reused = os.path.exists(object_path)
+      if reused:
+        stats["reused"] += 1
+        stats["reused_bytes"] += os.path.getsize(object_path)
+      else:
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        os.chmod(stage_file, 0o444)
+        os.replace(stage_file, object_path)
+      try:
+        if os.path.samefile(out_file, object_path):
+          continue
+      except FileNotFoundError:
+        os.makedirs(os.path.dirname(out_file) or ".", exist_ok=True)
+      if reused:
+        try:
+          os.utime(object_path)
+        except OSError as e:
+          logging.warning(f"Could not touch {object_path}, make may not rebuild {out_file}: {e}")
+      temp_file = out_file + ".store"
+      if os.path.lexists(temp_file):
+        os.unlink(temp_file)
+      if link == "hard":
+        try:
+          os.link(object_path, temp_file)
+        except OSError as e:
+          logging.warning(f"Could not hard link from {store} ({e.strerror}), using symbolic links")
+          link = "symlink"
+      if link == "symlink":
+        os.symlink(os.path.abspath(object_path), temp_file)
+      os.replace(temp_file, out_file)
+      rewritten.append(out_file)
+  print(f"Output store {store}: {stats['files']} files, {stats['files'] - stats['reused']} stored, "
+        f"{stats['reused']} already stored ({stats['reused_bytes'] / 1024:.1f} KB not written)")
+  return rewritten
+
+"""
+Keeps the generator running and regenerates the testbench whenever the RTL is saved.
+
+Each change is generated into a scratch folder and synced, so only the files that
+changed are rewritten. Parse errors while the RTL is being edited are reported and the
+watch goes on.
+
+Args:
+    args (argparse.Namespace): Parsed generator arguments
+
+Returns:
+    None
+"""
+def watch_tb(args):
+  if args.llm:
+    logging.warning("Watching with -llm calls Gemini on every save")
+  print(f"Watching {args.test} for changes (Ctrl+C to stop)")
+  try:
+    for _ in rtl_changes(args.test, args.watch_interval):
+      start_time = time.time()
+      try:
+        with tempfile.TemporaryDirectory(dir=args.store, prefix=".stage-") as stage_root:
+          generate_tb(args, stage_root, draw_graph=False)
+          if args.store:
+            rewritten = store_generated(stage_root, "", args.store, args.store_link)
+          else:
+            rewritten = sync_generated(stage_root, "")
+      except Exception as e:
+        logging.error(f"Regeneration failed: {e}")
+        continue
+      for path in rewritten:
+        logging.info(f"Successfully Updated -> {path}")
+      print(f"************ Regenerated in {(time.time() - start_time) * 1000:.1f} ms, {len(rewritten)} file(s) rewritten ************")
+  except KeyboardInterrupt:
+    print("Stopped watching")
+
+"""
+Generates a testbench for one service request inside a worker process.
+
+The RTL text is written to a scratch folder, the generator arguments are parsed as on
+the command line and the generated files are returned instead of being left on disk.
+The worker process keeps pyslang and the Gemini responses warm between requests.
+
+Args:
+    task (tuple): (RTL file name, RTL text, generator arguments without -t)
+
+Returns:
+    dict: "files" relative path -> base64 content, "log" generator output, "error" if any
+"""
+def service_generate(task):
+  rtl_name, rtl_text, argv = task
+  log = io.StringIO()
+  with tempfile.TemporaryDirectory() as work_root:
+    rtl_path = os.path.join(work_root, os.path.basename(rtl_name))
+    with open(rtl_path, "w") as file:
+      file.write(rtl_text)
+    out_root = os.path.join(work_root, "out")
+    log_handler = logging.StreamHandler(log) #The logging lines of the CLI, not only its prints
+    log_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    logging.getLogger().addHandler(log_handler)
+    try:
+      with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        args = eda_argparse(argv + ["-t", rtl_path])
+        args.watch = False
+        generate_tb(args, out_root, draw_graph=False)
+    except (Exception, SystemExit) as e:
+      return {"files": {}, "log": log.getvalue(), "error": f"Generation failed: {e}"}
+    finally:
+      logging.getLogger().removeHandler(log_handler)
+    files = dict()
+    for root, _, names in os.walk(out_root):
+      for name in names:
+        path = os.path.join(root, name)
+        with open(path, "rb") as file:
+          files[os.path.relpath(path, out_root)] = base64.b64encode(file.read()).decode()
+  return {"files": files, "log": log.getvalue(), "error": None}
+
+"""
+Returns the latency percentiles of the served requests.
+
+Args:
+    latencies (iterable): Request latencies in milliseconds
+
+Returns:
+    dict: Request count and p50/p90/p99/max latency in milliseconds
+"""
+def latency_percentiles(latencies):
+  ordered = sorted(latencies)
+  if not ordered:
+    return {"requests": 0}
+  pick = lambda p: ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+  return {"requests": len(ordered), "p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99), "max_ms": ordered[-1]}
+
+"""
+Returns the state of the files a service request refers to by path.
+
+--regs, --templates, --sweep, --agents and --llm-replay are read from the folder of the
+service, not sent with the request, so their size and modification time go into the
+result cache key: a request made after one of them changed is generated again.
+
+Args:
+    argv (list): Generator arguments of the request (without -t)
+
+Returns:
+    list: (path, size, modification time in ns) per file, None for a missing file
+"""
+def service_inputs(argv):
+  try:
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+      args = eda_argparse(argv + ["-t", "-"])
+  except SystemExit:
+    return list() #Rejected by the generator as well, failed results are not cached
+  state = list()
+  for path in [p for p in (args.regs, args.templates, args.sweep, args.agents, args.llm_replay) if p]:
+    files = sorted(os.path.join(root, f) for root, _, names in os.walk(path) for f in names) if os.path.isdir(path) else [path]
+    for file_i in files:
+      try:
+        stat = os.stat(file_i)
+        state.append((file_i, stat.st_size, stat.st_mtime_ns))
+      except OSError:
+        state.append((file_i, None, None))
+  return state
+
+"""
+Builds the HTTP request handler of the generation service.
+
+POST /generate takes {"rtl_name", "rtl_text", "args"} and answers the generated file
+set, GET /stats answers the latency percentiles and cache counters. Results are cached
+by the hash of the request and of the files it refers to (LRU) and at most max_queue requests wait for a worker,
+further requests are answered 503 so the callers back off.
+
+Args:
+    pool (ProcessPoolExecutor): Generation workers
+    cache_size (int): Number of generated file sets kept
+    max_queue (int): Requests allowed in flight
+
+Returns:
+    class: BaseHTTPRequestHandler subclass
+"""
+def make_service_handler(pool, cache_size, max_queue):
+  cache = OrderedDict()
+  lock = threading.Lock()
+  slots = threading.BoundedSemaphore(max_queue)
+  latencies = deque(maxlen=100000)
+  counters = Counter()
+
+  class ServiceHandler(http.server.BaseHTTPRequestHandler):
+    def reply(self, status, payload):
+      body = json.dumps(payload).encode()
+      self.send_response(status)
+      self.send_header("Content-Type", "application/json")
+      self.send_header("Content-Length", str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+    def do_GET(self):
+      if self.path != "/stats":
+        return self.reply(404, {"error": "unknown path"})
+      with lock:
+        stats = {**latency_percentiles(latencies), **counters, "cached_results": len(cache)}
+      self.reply(200, stats)
+
+    def do_POST(self):
+      start_time = time.time()
+      if self.path != "/generate":
+        return self.reply(404, {"error": "unknown path"})
+      try:
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        task = (str(request["rtl_name"]), request["rtl_text"], list(request.get("args", [])))
+        if not isinstance(task[1], str) or not all(isinstance(arg, str) for arg in task[2]):
+          raise TypeError("rtl_text and args must be strings")
+      except (ValueError, KeyError, TypeError) as e:
+        return self.reply(400, {"error": f"Bad request: {e}"})
+      key = hashlib.sha256(json.dumps([task, service_inputs(task[2])]).encode()).hexdigest()
+      with lock:
+        result = cache.get(key)
+        if result is not None:
+          cache.move_to_end(key)
+          counters["cache_hits"] += 1
+      if result is None:
+        if not slots.acquire(blocking=False):
+          with lock:
+            counters["rejected"] += 1
+          return self.reply(503, {"error": "service busy"})
+        try:
+          result = pool.submit(service_generate, task).result()
+        finally:
+          slots.release()
+        with lock:
+          counters["generated"] += 1
+          if result["error"] is None:
+            cache[key] = result
+            while len(cache) > cache_size:
+              cache.popitem(last=False)
+      with lock:
+        latencies.append((time.time() - start_time) * 1000)
+      self.reply(200 if result["error"] is None else 400, result)
+
+    def log_message(self, format, *args):
+      logging.debug(format % args)
+
+  return ServiceHandler
+
+"""
+Threaded HTTP server listening on a Unix socket instead of a TCP port.
+"""
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  daemon_threads = True
+
+"""
+HTTP client connection over a Unix socket.
+"""
+class UnixHTTPConnection(http.client.HTTPConnection):
+  def __init__(self, socket_path, timeout):
+    super().__init__("localhost", timeout=timeout)
+    self.socket_path = socket_path
+
+  def connect(self):
+    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    self.sock.settimeout(self.timeout)
+    self.sock.connect(self.socket_path)
+
+"""
+Parses command-line arguments of the serve subcommand.
+
+Args:
+    argv (list): Arguments following "serve"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def serve_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py serve", description="Run the testbench generation service")
+    parser.add_argument('--host', type=str, default="127.0.0.1", help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port to listen on (default: 8765)')
+    parser.add_argument('--unix', type=str, default=None, help='Listen on this Unix socket instead of TCP')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Generation worker processes (default: number of CPUs)')
+    parser.add_argument('--max-queue', type=int, default=64, help='Requests in flight before answering busy (default: 64)')
+    parser.add_argument('--cache-size', type=int, default=256, help='Generated file sets kept in the cache (default: 256)')
+    return parser.parse_args(argv)
+
+"""
+Runs the serve subcommand: a long running generation service.
+
+Args:
+    argv (list): Arguments following "serve"
+
+Returns:
+    int: Exit status
+"""
+def serve_main(argv):
+  serve_args = serve_argparse(argv)
+  logging.getLogger().setLevel(logging.INFO)
+  with ProcessPoolExecutor(max_workers=max(serve_args.jobs, 1)) as pool:
+    handler = make_service_handler(pool, serve_args.cache_size, max(serve_args.max_queue, 1))
+    if serve_args.unix:
+      if os.path.exists(serve_args.unix):
+        os.remove(serve_args.unix)
+      server = UnixHTTPServer(serve_args.unix, handler)
+      address = serve_args.unix
+    else:
+      server = http.server.ThreadingHTTPServer((serve_args.host, serve_args.port), handler)
+      address = f"http://{serve_args.host}:{serve_args.port}"
+    logging.info(f"Generation service listening on {address} with {serve_args.jobs} workers")
+    try:
+      server.serve_forever()
+    except KeyboardInterrupt:
+      pass
+    finally:
+      server.server_close()
+      if serve_args.unix and os.path.exists(serve_args.unix):
+        os.remove(serve_args.unix)
+  return 0
+
+"""
+Runs the client subcommand: a drop-in for the generator command line using the service.
+
+The client options come first, everything else is passed to the generator as is.
+Like the command line, the tb folder is recreated and the generated files are written
+below the current folder.
+
+Args:
+    argv (list): Arguments following "client"
+
+Returns:
+    int: Exit status, 1 if the service reported an error
+"""
+def client_main(argv):
+  parser = argparse.ArgumentParser(prog="rtl2uvm.py client", description="Generate a testbench through the generation service", allow_abbrev=False)
+  parser.add_argument('--host', type=str, default="127.0.0.1", help='Service address (default: 127.0.0.1)')
+  parser.add_argument('--port', type=int, default=8765, help='Service TCP port (default: 8765)')
+  parser.add_argument('--unix', type=str, default=None, help='Service Unix socket')
+  parser.add_argument('--timeout', type=float, default=600, help='Request timeout in seconds (default: 600)')
+  parser.add_argument('--stats', action='store_true', help='Print the service latency percentiles and exit')
+  client_args, gen_argv = parser.parse_known_args(argv)
+  if client_args.unix:
+    connection = UnixHTTPConnection(client_args.unix, client_args.timeout)
+  else:
+    connection = http.client.HTTPConnection(client_args.host, client_args.port, timeout=client_args.timeout)
+  if client_args.stats:
+    connection.request("GET", "/stats")
+    print(json.dumps(json.loads(connection.getresponse().read()), indent=2))
+    return 0
+  args = eda_argparse(gen_argv)
+  if args.watch:
+    logging.error("--watch is not supported through the service")
+    return 1
+  #-t is sent as the RTL text, the remaining generator arguments are passed through
+  test_index = next(i for i, a in enumerate(gen_argv) if a in ("-t", "--test") or a.startswith(("-t=", "--test=")))
+  pass_argv = gen_argv[:test_index] + gen_argv[test_index + (1 if "=" in gen_argv[test_index] else 2):]
+  with open(args.test) as file:
+    request = {"rtl_name": os.path.basename(args.test), "rtl_text": file.read(), "args": pass_argv}
+  body = json.dumps(request)
+  connection.request("POST", "/generate", body=body, headers={"Content-Type": "application/json"})
+  response = connection.getresponse()
+  result = json.loads(response.read())
+  if response.status != 200:
+    print(result.get("log", ""), end="")
+    logging.error(result.get("error"))
+    return 1
+  if os.path.exists(folder_name):
+    shutil.rmtree(folder_name) #Remove if there is an existing folder/files
+  os.makedirs(folder_name)
+  print(result["log"], end="")
+  for path, content in result["files"].items():
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as file:
+      file.write(base64.b64decode(content))
+  return 0
+
+"""
+Runs the llm-bench subcommand: per-component against batched LLM generation.
+
+The testbench is generated twice in a scratch folder, once with one request per
+component and once with --llm-batch, both answered offline from a recording made with
+--llm-record (record both modes once). The per-component mode only asks for the driver
+and monitor, so the batch leaves the scoreboard out (--llm-batch-no-scoreboard) and both
+modes generate the same code. The recorded latency and token counts are summed per mode.
+
+Args:
+    argv (list): Arguments following "llm-bench", the unknown ones are passed to the generator
+
+Returns:
+    int: Exit status
+"""
+def llm_bench_main(argv):
+  parser = argparse.ArgumentParser(prog="rtl2uvm.py llm-bench", description="Benchmark per-component against batched LLM generation on a recorded backend", allow_abbrev=False)
+  parser.add_argument('--replay', type=str, required=True, help='Recording made with --llm-record in both modes')
+  parser.add_argument('--json', type=str, default=None, help='Write the comparison as JSON')
+  bench_args, gen_argv = parser.parse_known_args(argv)
+  results = dict()
+  for mode, extra in (("per-component", []), ("batch", ["--llm-batch", "--llm-batch-no-scoreboard"])):
+    args = eda_argparse(gen_argv + ["-llm", "--llm-replay", bench_args.replay] + extra)
+    args.watch = False
+    args.perf_db = "" #Replayed latencies are not run metrics
+    with tempfile.TemporaryDirectory() as out_root, contextlib.redirect_stdout(io.StringIO()):
+      generate_tb(args, out_root, draw_graph=False)
+    results[mode] = {"requests": len(llm_metrics),
+                     "prompt_tokens": sum(m.get("prompt_tokens", m["prompt_tokens_est"]) for m in llm_metrics),
+                     "response_tokens": sum(m.get("response_tokens", 0) for m in llm_metrics),
+                     "latency_ms": sum(m.get("latency_ms", 0) for m in llm_metrics),
+                     "failed_checks": sum(1 for m in llm_metrics if m.get("check") != "ok")}
+  rows = [[mode] + list(r.values()) for mode, r in results.items()]
+  print(f'LLM generation: \n {tabulate(rows, headers=["Mode", "Requests", "Prompt tokens", "Response tokens", "Latency ms", "Failed checks"], floatfmt=".0f")}')
+  if bench_args.json:
+    with open(bench_args.json, "w") as file:
+      json.dump(results, file, indent=2)
+    logging.info(f"Successfully Created -> {bench_args.json}")
+  return 0
+
+"""
+Writes one message of the regression protocol, a JSON object per line.
+
+Args:
+    stream (file): Buffered socket file
+    message (dict): Message to send
+
+Returns:
+    None
+"""
+def write_message(stream, message):
+  stream.write(json.dumps(message).encode() + b"\n")
+  stream.flush()
+
+"""
+Reads one message of the regression protocol.
+
+Args:
+    stream (file): Buffered socket file
+
+Returns:
+    dict: Received message, None when the peer closed the connection
+"""
+def read_message(stream):
+  line = stream.readline()
+  return json.loads(line) if line else None
+
+"""
+Reads a file as gzip compressed base64 text to embed it in a protocol message.
+
+Args:
+    path (str): File to pack
+
+Returns:
+    str: Packed file content
+"""
+def pack_file(path):
+  with open(path, "rb") as file:
+    return base64.b64encode(gzip.compress(file.read(), 6)).decode()
+
+"""
+Writes a file packed with pack_file.
+
+Args:
+    data (str): Packed file content
+    path (str): File to write, its folder is created
+
+Returns:
+    None
+"""
+def unpack_file(data, path):
+  os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+  with open(path, "wb") as file:
+    file.write(gzip.decompress(base64.b64decode(data)))
+
+"""
+Returns the sha256 of a file, read in blocks.
+
+Args:
+    path (str): File to hash
+
+Returns:
+    str: Hex digest
+"""
+def file_sha256(path):
+  digest = hashlib.sha256()
+  with open(path, "rb") as file:
+    for block in iter(lambda: file.read(1 << 20), b""):
+      digest.update(block)
+  return digest.hexdigest()
+
+"""
+Job state of the distributed regression, shared by the coordinator connections.
+
+The (DUT, test, seed) jobs start in a shared pool ordered by DUT. A worker takes a shard
+of consecutive jobs into its own queue, preferring a DUT it already ran so the simulation
+binary is fetched once per host. When the pool is empty an idle worker steals the back
+half of the longest queue of another worker. The jobs of a lost worker (closed connection
+or missed heartbeats) go back to the pool until they ran out of retries.
+"""
+class JobBoard:
+  def __init__(self, jobs, shard_size, retries):
+    self.pool = deque(jobs)
+    self.jobs = {job["id"]: job for job in jobs}
+    self.shard_size = max(shard_size, 1)
+    self.retries = retries
+    self.queues = dict()
+    self.running = dict()
+    self.duts = dict()
+    self.results = dict()
+    self.workers = dict()
+    self.total = len(jobs)
+    self.changed = threading.Condition()
+
+  def register(self, worker):
+    with self.changed:
+      self.queues.setdefault(worker, deque())
+      self.duts.setdefault(worker, set())
+      self.workers.setdefault(worker, Counter())
+
+  def take(self, worker):
+    with self.changed:
+      queue = self.queues[worker]
+      if not queue and self.pool:
+        preferred = [job for job in self.pool if job["dut"] in self.duts[worker]][:self.shard_size]
+        shard = preferred or [self.pool[i] for i in range(min(self.shard_size, len(self.pool)))]
+        for job in shard:
+          self.pool.remove(job)
+        queue.extend(shard)
+      if not queue:
+        victim = max(self.queues, key=lambda w: len(self.queues[w]))
+        stolen = len(self.queues[victim]) // 2 or len(self.queues[victim])
+        if stolen:
+          queue.extend(reversed([self.queues[victim].pop() for _ in range(stolen)]))
+          self.workers[worker]["stolen"] += stolen
+          logging.debug(f"{worker} stole {stolen} jobs from {victim}")
+      if not queue:
+        return "done" if self.finished() else None
+      job = queue.popleft()
+      self.running[job["id"]] = (worker, job)
+      self.duts[worker].add(job["dut"])
+      return job
+
+  def complete(self, worker, result):
+    with self.changed:
+      self.running.pop(result["id"], None)
+      if result["id"] not in self.results:
+        self.results[result["id"]] = result
+        self.workers[worker]["jobs"] += 1
+        self.workers[worker]["seconds"] += result["seconds"]
+      self.changed.notify_all()
+
+  def lost(self, worker):
+    with self.changed:
+      jobs = [job for w, job in self.running.values() if w == worker] + list(self.queues.pop(worker, ()))
+      for job in jobs:
+        self.running.pop(job["id"], None)
+        job["attempt"] += 1
+        if job["attempt"] > self.retries:
+          self.results[job["id"]] = {**job, "worker": worker, "return_code": None, "error": "worker lost", "seconds": 0.0}
+        else:
+          self.pool.appendleft(job)
+      if jobs:
+        logging.warning(f"Worker {worker} lost, {len(jobs)} jobs rescheduled")
+      self.changed.notify_all()
+
+  def finished(self):
+    return len(self.results) == self.total
+
+"""
+Builds the TCP request handler of the regression coordinator, one connection per worker slot.
+
+Messages: hello {"worker"} -> welcome, get -> job/wait/done, artifact {"dut"} -> packed
+simulation binary, heartbeat while a job runs and result {"id", "return_code", packed
+coverage and log}. A connection silent for longer than the timeout counts as lost. A result
+is stored under the DUT, test and seed the board holds for its job ID, and only files with
+a relative path inside the job folder are written.
+
+Args:
+    board (JobBoard): Shared job state
+    artifacts (dict): DUT -> {"sim_bin", "sha256"} of the binaries built once by the coordinator
+    results_dir (str): Folder receiving the coverage and logs of every job
+    timeout (float): Seconds without a message before a worker is considered lost
+
+Returns:
+    class: StreamRequestHandler subclass
+"""
+def make_coordinator_handler(board, artifacts, results_dir, timeout):
+  class CoordinatorHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+      self.connection.settimeout(timeout)
+      worker = None
+      try:
+        while True:
+          message = read_message(self.rfile)
+          if message is None:
+            break
+          if message["op"] == "hello":
+            worker = message["worker"]
+            board.register(worker)
+            write_message(self.wfile, {"op": "welcome"})
+          elif message["op"] == "get":
+            job = board.take(worker)
+            if job == "done":
+              write_message(self.wfile, {"op": "done"})
+              return
+            if job is None:
+              write_message(self.wfile, {"op": "wait"})
+            else:
+              write_message(self.wfile, {"op": "job", "job": job, **artifacts[job["dut"]]})
+          elif message["op"] == "artifact":
+            write_message(self.wfile, {"op": "artifact", "data": pack_file(artifacts[message["dut"]]["sim_bin"])})
+          elif message["op"] == "result":
+            #The job comes from the board, the worker only names it: its paths are not trusted
+            job = board.jobs.get(message.get("id"))
+            if job is None:
+              logging.warning(f"Ignoring the result of unknown job {message.get('id')!r} from {worker}")
+              continue
+            job_dir = os.path.join(results_dir, job["dut"], f"{job['test'] or 'default'}_{job['seed']}")
+            for name, data in message.pop("files").items():
+              path = os.path.realpath(os.path.join(job_dir, name))
+              if os.path.isabs(name) or os.path.commonpath([path, job_dir]) != job_dir or path == job_dir:
+                logging.warning(f"Ignoring the result file {name!r} from {worker}, not a relative path in the job folder")
+                continue
+              unpack_file(data, path)
+            board.complete(worker, {**message, "dut": job["dut"], "test": job["test"], "seed": job["seed"], "worker": worker, "dir": job_dir})
+      except (OSError, ValueError, KeyError) as e:
+        logging.debug(f"Connection of {worker} closed: {e}")
+      if worker is not None:
+        board.lost(worker)
+
+  return CoordinatorHandler
+
+"""
+Threaded TCP server of the regression coordinator.
+"""
+class CoordinatorServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+  daemon_threads = True
+  allow_reuse_address = True
+
+"""
+Parses command-line arguments of the coordinator subcommand.
+
+Args:
+    argv (list): Arguments following "coordinator"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def coordinator_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py coordinator", description="Shard regression seeds of generated Verilator testbenches across workers")
+    parser.add_argument('verilator_paths', nargs='+', help='Generated <design_name>_verilator folders (built with -c)')
+    parser.add_argument('--tests', type=str, default=None, help='Comma separated UVM tests to schedule (default: test of the Makefile)')
+    parser.add_argument('--seeds', type=int, default=100, help='Seeds per DUT and test (default: 100)')
+    parser.add_argument('--start-seed', type=int, default=1, help='First seed (default: 1)')
+    parser.add_argument('--host', type=str, default="127.0.0.1", help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8766, help='TCP port to listen on (default: 8766)')
+    parser.add_argument('--shard', type=int, default=4, help='Jobs handed to a worker at once (default: 4)')
+    parser.add_argument('--retries', type=int, default=2, help='Reschedules of a job after losing its worker (default: 2)')
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds without heartbeat before a worker is lost (default: 60)')
+    parser.add_argument('--local-workers', type=int, default=0, help='Worker processes started on this host (default: 0)')
+    parser.add_argument('--results', type=str, default='dist_results', help='Folder of the collected coverage and logs (default: dist_results)')
+    parser.add_argument('--report', type=str, default='dist_report.json', help='Regression report (default: dist_report.json)')
+    parser.add_argument('--perf-db', type=str, default=os.environ.get("RTL2UVM_PERF_DB", "rtl2uvm_perf.db"), help='SQLite database the build and simulation metrics are appended to, empty to disable')
+    return parser.parse_args(argv)
+
+"""
+Runs the coordinator subcommand: a distributed regression over plain TCP.
+
+Every DUT is built once with the generated Makefile, the binary is handed to the workers
+that do not see the same path. Jobs are sharded to the workers, the coverage files and
+logs of every job are collected below the results folder and merged per DUT.
+
+Args:
+    argv (list): Arguments following "coordinator"
+
+Returns:
+    int: Exit status, 1 if any job failed or was lost
+"""
+def coordinator_main(argv):
+  logging.getLogger().setLevel(logging.INFO)
+  dist_args = coordinator_argparse(argv)
+  start_time = time.time()
+  artifacts = dict()
+  for verilator_path in dist_args.verilator_paths:
+    verilator_path = os.path.realpath(verilator_path)
+    dut = os.path.basename(verilator_path).replace("_verilator", "")
+    sim_bin = build_testbench(verilator_path, dist_args.perf_db)
+    artifacts[dut] = {"sim_bin": sim_bin, "sha256": file_sha256(sim_bin)}
+  tests = dist_args.tests.split(",") if dist_args.tests else [None]
+  seeds = range(dist_args.start_seed, dist_args.start_seed + dist_args.seeds)
+  jobs = [{"dut": dut, "test": test, "seed": seed, "attempt": 0} for dut in artifacts for test in tests for seed in seeds]
+  for job_id, job in enumerate(jobs):
+    job["id"] = job_id
+  board = JobBoard(jobs, dist_args.shard, dist_args.retries)
+  results_dir = os.path.realpath(dist_args.results)
+  server = CoordinatorServer((dist_args.host, dist_args.port), make_coordinator_handler(board, artifacts, results_dir, dist_args.timeout))
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  address = f"{dist_args.host}:{server.server_address[1]}"
+  logging.info(f"Coordinator listening on {address} with {len(jobs)} jobs")
+  local_workers = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker", address])
+                   for _ in range(dist_args.local_workers)]
+  try:
+    with board.changed:
+      while not board.finished():
+        board.changed.wait()
+  finally:
+    for process in local_workers:
+      try:
+        process.wait(timeout=dist_args.timeout)
+      except subprocess.TimeoutExpired:
+        process.kill()
+    server.shutdown()
+    server.server_close()
+  results = [board.results[job["id"]] for job in jobs]
+  failures = [{k: r.get(k) for k in ("dut", "test", "seed", "worker", "return_code", "error")} for r in results if r["return_code"] != 0]
+  for dut in artifacts:
+    dut_dir = os.path.join(results_dir, dut)
+    if os.path.isdir(dut_dir):
+      try:
+        incremental_merge_coverage(collect_coverage_files([dut_dir]), os.path.join(dut_dir, "merged_coverage.dat"), os.cpu_count())
+      except FileExistsError as e:
+        logging.warning(f"Coverage of {dut} not merged: {e}")
+    record_sim_perf(dist_args.perf_db, dut, [(os.path.join(r["dir"], "sim.log"), r["sim_seconds"]) for r in results if r["dut"] == dut and "dir" in r])
+  with open(dist_args.report, "w") as file:
+    json.dump({"jobs": len(jobs), "wall_seconds": time.time() - start_time, "workers": board.workers,
+               "results": [{k: v for k, v in r.items() if k != "op"} for r in results], "failures": failures}, file, indent=2)
+  logging.info(f"Successfully Created -> {dist_args.report}")
+  rows = [[worker, c["jobs"], c["stolen"], round(c["seconds"], 1)] for worker, c in sorted(board.workers.items())]
+  print(f'Workers: \n {tabulate(rows, headers=["Worker", "Jobs", "Stolen", "Busy s"])}')
+  print(f'\n************ Ran {len(jobs)} jobs in {time.time() - start_time:.2f} seconds, {len(failures)} failing ************')
+  return 1 if failures else 0
+
+"""
+Returns the local path of a DUT simulation binary on this worker.
+
+The coordinator path is used as is when it holds the same binary (localhost or shared
+file system), otherwise the binary is fetched once and kept by hash in the work folder.
+
+Args:
+    message (dict): Job message with the coordinator "sim_bin" path and its "sha256"
+    fetch (function): Asks the coordinator for the packed binary of a DUT
+    work_dir (str): Worker folder
+    known (dict): Binary hash -> local path, shared by the slots of the worker
+    lock (threading.Lock): Guards known and the fetch
+
+Returns:
+    str: Path of the simulation binary
+"""
+def worker_binary(message, fetch, work_dir, known, lock):
+  with lock:
+    if message["sha256"] not in known:
+      sim_bin = message["sim_bin"]
+      if not (os.path.isfile(sim_bin) and file_sha256(sim_bin) == message["sha256"]):
+        sim_bin = os.path.join(work_dir, "bin", message["sha256"], os.path.basename(message["sim_bin"]))
+        if not os.path.isfile(sim_bin):
+          unpack_file(fetch(message["job"]["dut"]), sim_bin + ".tmp")
+          os.chmod(sim_bin + ".tmp", 0o755)
+          os.replace(sim_bin + ".tmp", sim_bin)
+      known[message["sha256"]] = sim_bin
+    return known[message["sha256"]]
+
+"""
+Runs one worker slot: ask for jobs, run them with run_seed and send back the results.
+
+Args:
+    address (tuple): Coordinator (host, port)
+    worker (str): Worker slot name
+    work_dir (str): Worker folder
+    known (dict): Binary hash -> local path, shared by the slots of the worker
+    lock (threading.Lock): Guards known
+    heartbeat (float): Seconds between heartbeats while a job runs
+    connect_timeout (float): Seconds to retry connecting to the coordinator
+
+Returns:
+    int: Number of jobs run
+"""
+def worker_slot(address, worker, work_dir, known, lock, heartbeat, connect_timeout):
+  deadline = time.time() + connect_timeout
+  while True:
+    try:
+      connection = socket.create_connection(address)
+      break
+    except OSError:
+      if time.time() > deadline:
+        raise
+      time.sleep(0.2)
+  ran = 0
+  with connection, connection.makefile("rwb") as stream, ThreadPoolExecutor(max_workers=1) as runner:
+    def fetch(dut):
+      write_message(stream, {"op": "artifact", "dut": dut})
+      return read_message(stream)["data"]
+    write_message(stream, {"op": "hello", "worker": worker})
+    read_message(stream)
+    while True:
+      write_message(stream, {"op": "get"})
+      message = read_message(stream)
+      if message is None or message["op"] == "done":
+        return ran
+      if message["op"] == "wait":
+        time.sleep(min(heartbeat, 0.5))
+        continue
+      job = message["job"]
+      start_time = time.time()
+      sim_bin = worker_binary(message, fetch, work_dir, known, lock)
+      seeds_dir = os.path.join(work_dir, "seeds", job["dut"])
+      future = runner.submit(run_seed, (sim_bin, seeds_dir, job["test"], job["seed"]))
+      while not wait([future], timeout=heartbeat).done:
+        write_message(stream, {"op": "heartbeat"})
+      _, _, ret, seed_dir, sim_seconds = future.result()
+      files = {os.path.relpath(p, seed_dir): pack_file(p) for p in collect_coverage_files([seed_dir])}
+      files["sim.log"] = pack_file(os.path.join(seed_dir, "sim.log"))
+      if os.path.exists(os.path.join(seed_dir, "sim_perf.json")):
+        files["sim_perf.json"] = pack_file(os.path.join(seed_dir, "sim_perf.json"))
+      write_message(stream, {"op": "result", **job, "return_code": ret, "seconds": time.time() - start_time,
+                             "sim_seconds": sim_seconds, "files": files})
+      shutil.rmtree(seed_dir, ignore_errors=True)
+      ran += 1
+
+"""
+Parses command-line arguments of the worker subcommand.
+
+Args:
+    argv (list): Arguments following "worker"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def worker_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py worker", description="Run regression jobs handed out by a coordinator")
+    parser.add_argument('coordinator', help='Coordinator address HOST:PORT')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Jobs run in parallel on this host (default: 1)')
+    parser.add_argument('--work-dir', type=str, default=None, help='Folder of the fetched binaries and running seeds (default: temporary)')
+    parser.add_argument('--heartbeat', type=float, default=5, help='Seconds between heartbeats while a job runs (default: 5)')
+    parser.add_argument('--connect-timeout', type=float, default=30, help='Seconds to retry connecting to the coordinator (default: 30)')
+    return parser.parse_args(argv)
+
+"""
+Runs the worker subcommand: one coordinator connection per job slot.
+
+Args:
+    argv (list): Arguments following "worker"
+
+Returns:
+    int: Exit status
+"""
+def worker_main(argv):
+  logging.getLogger().setLevel(logging.INFO)
+  work_args = worker_argparse(argv)
+  host, _, port = work_args.coordinator.rpartition(":")
+  known = dict()
+  lock = threading.Lock()
+  with contextlib.ExitStack() as stack:
+    work_dir = work_args.work_dir or stack.enter_context(tempfile.TemporaryDirectory(prefix="rtl2uvm_worker_"))
+    with ThreadPoolExecutor(max_workers=max(work_args.jobs, 1)) as pool:
+      slots = [pool.submit(worker_slot, (host, int(port)), f"{socket.gethostname()}:{os.getpid()}:{slot}", work_dir,
+                           known, lock, work_args.heartbeat, work_args.connect_timeout) for slot in range(max(work_args.jobs, 1))]
+      ran = sum(slot.result() for slot in slots)
+  logging.info(f"Worker ran {ran} jobs")
+  return 0
+
+"""
+Parses command-line arguments of the perf subcommand.
+
+Args:
+    argv (list): Arguments following "perf"
+
+Returns:
+    args (argparse.Namespace): Parsed command-line arguments
+"""
+def perf_argparse(argv):
+    parser = argparse.ArgumentParser(prog="rtl2uvm.py perf", description="Report the performance history and flag regressions")
+    parser.add_argument('--db', type=str, default=os.environ.get("RTL2UVM_PERF_DB", "rtl2uvm_perf.db"), help='Performance database (default: $RTL2UVM_PERF_DB or rtl2uvm_perf.db)')
+    parser.add_argument('--dut', type=str, default=None, help='Only this DUT')
+    parser.add_argument('--stage', type=str, choices=['generate', 'build', 'simulate'], default=None, help='Only this stage')
+    parser.add_argument('--metric', type=str, default=None, help='Only metrics matching this regular expression')
+    parser.add_argument('--window', type=int, default=10, help='Previous runs forming the rolling baseline (default: 10)')
+    parser.add_argument('--min-runs', type=int, default=3, help='Previous runs needed before flagging (default: 3)')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Change against the baseline in percent flagged as a regression (default: 10)')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='Time changes (*_s metrics) below this many seconds are noise (default: 0.05)')
+    parser.add_argument('--trend', type=int, default=20, help='Runs shown in the trend column (default: 20)')
+    parser.add_argument('--all', action='store_true', help='Show every metric, not only the flagged ones')
+    parser.add_argument('--json', type=str, default=None, help='Write the report as JSON')
+    return parser.parse_args(argv)
+
+"""
+Draws the values of a metric as a one line sparkline.
+
+Args:
+    values (list): Values in time order
+
+Returns:
+    str: Sparkline
+"""
+def sparkline(values):
+  low, high = min(values), max(values)
+  ticks = "▁▂▃▄▅▆▇█"
+  return "".join(ticks[int((v - low) / (high - low) * (len(ticks) - 1)) if high > low else 0] for v in values)
+
+"""
+Runs the perf subcommand: metric trends per DUT and regressions against a rolling baseline.
+
+The latest value of every (DUT, stage, metric) series is compared with the median of the
+previous runs in the window. Throughput metrics (*_per_s) regress when they drop, all the
+others (times, memory, tokens) when they grow by more than the threshold. Time metrics
+also need to change by --min-seconds so millisecond jitter is not flagged.
+
+Args:
+    argv (list): Arguments following "perf"
+
+Returns:
+    int: Exit status for CI gating, 1 if any metric regressed
+"""
+def perf_main(argv):
+  perf_args = perf_argparse(argv)
+  if not os.path.exists(perf_args.db):
+    logging.error(f"No performance database at {perf_args.db}")
+    return 1
+  query = "SELECT dut, stage, metric, value FROM metrics WHERE 1"
+  params = list()
+  for column, value in (("dut", perf_args.dut), ("stage", perf_args.stage)):
+    if value:
+      query += f" AND {column} = ?"
+      params.append(value)
+  series = dict()
+  with contextlib.closing(sqlite3.connect(perf_args.db)) as db:
+    for dut, stage, metric, value in db.execute(query + " ORDER BY time", params):
+      if perf_args.metric and not re.search(perf_args.metric, metric):
+        continue
+      series.setdefault((dut, stage, metric), list()).append(value)
+  report = list()
+  for (dut, stage, metric), values in sorted(series.items()):
+    latest, history = values[-1], values[:-1][-perf_args.window:]
+    entry = {"dut": dut, "stage": stage, "metric": metric, "runs": len(values), "latest": latest,
+             "baseline": None, "change_pct": None, "regressed": False}
+    if len(history) >= perf_args.min_runs:
+      baseline = sorted(history)[len(history) // 2]
+      entry["baseline"] = baseline
+      if baseline:
+        change = 100.0 * (latest - baseline) / abs(baseline)
+        entry["change_pct"] = change
+        entry["regressed"] = (-change if metric.endswith("_per_s") else change) > perf_args.threshold
+        if metric.endswith("_s") and not metric.endswith("_per_s"):
+          entry["regressed"] &= latest - baseline > perf_args.min_seconds
+    entry["trend"] = sparkline(values[-perf_args.trend:])
+    report.append(entry)
+  if perf_args.json:
+    with open(perf_args.json, "w") as file:
+      json.dump(report, file, indent=2)
+    logging.info(f"Successfully Created -> {perf_args.json}")
+  regressed = [e for e in report if e["regressed"]]
+  rows = [[e["dut"], e["stage"], e["metric"], e["runs"], e["latest"], e["baseline"],
+           "" if e["change_pct"] is None else f"{e['change_pct']:+.1f}%", e["trend"], "REGRESSED" if e["regressed"] else ""]
+          for e in report if perf_args.all or e["regressed"]]
+  print(f'Performance history: \n {tabulate(rows, headers=["DUT", "Stage", "Metric", "Runs", "Latest", "Baseline", "Change", "Trend", ""], floatfmt=".3g")}')
+  print(f'\n************ {len(report)} metrics, {len(regressed)} regressed beyond {perf_args.threshold}% ************')
+  return 1 if regressed else 0
+
+#Subcommands dispatched before the generator arguments are parsed
+subcommands = {
+  "coverage": coverage_main,
+  "regress": regress_main,
+  "build": build_main,
+  "sweep": sweep_main,
+  "trace": trace_main,
+  "logs": logs_main,
+  "serve": serve_main,
+  "client": client_main,
+  "llm-bench": llm_bench_main,
+  "coordinator": coordinator_main,
+  "worker": worker_main,
+  "perf": perf_main,
+}
+
+
+if __name__ == "__main__":
+  if len(sys.argv) > 1 and sys.argv[1] in subcommands:
+    sys.exit(subcommands[sys.argv[1]](sys.argv[2:]))
+  args = eda_argparse()
+
+  '''
+  Creating a "tb" folder to save the generated UVM testbench
+  '''
+  if not os.path.exists(folder_name):
+    os.makedirs(folder_name)
+  elif os.path.exists(folder_name):
+    shutil.rmtree(folder_name) #Remove if there is an existing folder/files
+    os.makedirs(folder_name)
+  logging.getLogger().setLevel(logging.INFO) #TODO: Make the verbose parameterized 
+  if args.store:
+    #Generated next to the store, so new files are moved in without copying
+    os.makedirs(args.store, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=args.store, prefix=".stage-") as stage_root:
+      generate_tb(args, stage_root)
+      store_generated(stage_root, "", args.store, args.store_link)
+  else:
+    generate_tb(args, "")
+  if args.watch:
+    watch_tb(args)
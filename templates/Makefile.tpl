@@ -0,0 +1,167 @@
+all: simulate
+
+# C++ jobs of a plain "make", a parent make -jN or "rtl2uvm.py build" share their jobserver instead
+NPROC = $$(( `nproc` > 1 ? `nproc` - 1 : 1 ))
+
+# -------------------------------------
+# Testbench setup
+# -------------------------------------
+VERILATOR := verilator
+ifdef VERILATOR_ROOT
+VERILATOR := $(VERILATOR_ROOT)/bin/verilator
+endif
+
+UVM_ROOT ?= {{ uvm_root }}
+UVM_TEST ?= {{ test_name }}
+
+VERILOG_DEFINE_FILES = ${UVM_ROOT}/src/uvm.sv -f tb/{{ dut }}.f
+VERILOG_INCLUDE_DIRS = tb ${UVM_ROOT}/src
+
+# -------------------------------------
+# Compilation/simulation configuration
+# -------------------------------------
+SIM_NAME ?= {{ dut }}_tb
+SIM_DIR = ../$(SIM_NAME)-$(PROFILE)-$(CLOCKING)-sim
+COMPILE_ARGS += -fno-gate
+COMPILE_ARGS += -DUVM_NO_DPI
+COMPILE_ARGS += --prefix $(SIM_NAME) -o $(SIM_NAME)
+COMPILE_ARGS += $(addprefix +incdir+, $(VERILOG_INCLUDE_DIRS))
+# Smaller C++ files so an edited component only recompiles the files it touches
+COMPILE_ARGS += --output-split 20000 --output-split-cfuncs 2000
+# HIER=1 verilates the design as a separate hierarchical block (tb/{{ dut }}.vlt)
+HIER ?= 0
+ifeq ($(HIER),1)
+COMPILE_ARGS += --hierarchical tb/{{ dut }}.vlt
+endif
+# Reuse unchanged object files across rebuilds when ccache is available
+OBJCACHE ?= $(shell command -v ccache)
+BUILD_ARGS += OBJCACHE=$(OBJCACHE)
+EXTRA_ARGS += --timescale 1ns/1ps --error-limit 100
+WARNING_ARGS += -Wno-lint \
+	-Wno-style \
+	-Wno-SYMRSVDWORD \
+	-Wno-IGNOREDRETURN \
+	-Wno-CONSTRAINTIGN \
+	-Wno-ZERODLY
+
+# -------------------------------------
+# Build profiles: {{ " / ".join(profiles) }}
+# Eg: make PROFILE=max-perf THREADS=4
+# -------------------------------------
+PROFILE ?= {{ profile }}
+THREADS ?= 4
+{% for index, (profile_i, (verilator_args, opt_fast)) in enumerate(profiles.items()) %}
+{{ "ifeq" if index == 0 else "else ifeq" }} ($(PROFILE),{{ profile_i }})
+PROFILE_ARGS := {{ verilator_args }}
+BUILD_ARGS += OPT_FAST="{{ opt_fast }}"
+{% endfor %}
+else
+$(error Unknown PROFILE $(PROFILE), expected one of: {{ " ".join(profiles) }})
+endif
+
+# -------------------------------------
+# Clocking: delay (#5 clock in the top, --main) or
+# cycle (clock toggled by tb/{{ dut }}_main.cpp, no delay controls in the testbench)
+# -------------------------------------
+CLOCKING ?= {{ "cycle" if cycle_driven else "delay" }}
+ifeq ($(CLOCKING),cycle)
+CLOCKING_ARGS := -DRTL2UVM_CYCLE_DRIVEN $(abspath tb/{{ dut }}_main.cpp)
+else
+CLOCKING_ARGS := --main
+endif
+
+{% if sweep %}
+# -------------------------------------
+# Parameter sweep: SWEEP=<point> builds the point in its own SIM_DIR with its
+# parameter overrides (defaults in tb/{{ dut }}_params.sv)
+# Eg: make simulate SWEEP=p1, "rtl2uvm.py sweep ." builds and runs every point
+# -------------------------------------
+SWEEP_POINTS := {{ " ".join(name_i for name_i, _ in sweep) }}
+{% for name_i, defines in sweep %}
+SWEEP_{{ name_i }} := {{ defines }}
+{% endfor %}
+ifneq ($(SWEEP),)
+ifeq ($(filter $(SWEEP),$(SWEEP_POINTS)),)
+$(error Unknown SWEEP $(SWEEP), expected one of: $(SWEEP_POINTS))
+endif
+SIM_DIR = ../$(SIM_NAME)-$(PROFILE)-$(CLOCKING)-$(SWEEP)-sim
+COMPILE_ARGS += $(SWEEP_$(SWEEP))
+endif
+
+{% endif %}
+{% if golden %}
+# -------------------------------------
+# Python golden model bridge (tb/*_golden_dpi.cpp embeds python3)
+# -------------------------------------
+GOLDEN_ARGS := $(abspath $(wildcard tb/*_golden_dpi.cpp)) \
+	-CFLAGS "$(shell python3-config --includes)" \
+	-CFLAGS -DRTL2UVM_GOLDEN_DIR=$(abspath tb) \
+	-LDFLAGS "$(shell python3-config --embed --ldflags)"
+
+{% endif %}
+# -------------------------------------
+# VCD Configuration
+# -------------------------------------
+VCD_VAR := +VCD_DUMP
+VCD_FILE := dump.vcd
+
+# -------------------------------------
+# Make UVM test with Verilator
+# -------------------------------------
+$(SIM_DIR)/$(SIM_NAME).mk: $(wildcard tb/*.sv) $(wildcard tb/*.cpp)
+	$(VERILATOR) --cc --exe --timing $(CLOCKING_ARGS) $(PROFILE_ARGS) -Mdir $(SIM_DIR) \
+	$(abspath tb/{{ dut }}_dpi.cpp) \
+{% if golden %}
+	$(GOLDEN_ARGS) \
+{% endif %}
+{% if coverage %}
+	--coverage \
+{% endif %}
+	${COMPILE_ARGS} ${EXTRA_ARGS} \
+	${VERILOG_DEFINE_FILES} \
+	${WARNING_ARGS}
+
+$(SIM_DIR)/$(SIM_NAME): $(SIM_DIR)/$(SIM_NAME).mk
+	$(MAKE) $(if $(findstring jobserver,$(MAKEFLAGS)),,-j$(NPROC)) -C $(SIM_DIR) $(BUILD_ARGS) -f $(SIM_NAME).mk
+
+simulate: $(SIM_DIR)/$(SIM_NAME).mk $(SIM_DIR)/$(SIM_NAME)
+	#$(SIM_DIR)/$(SIM_NAME) +UVM_TESTNAME=$(UVM_TEST) $(VCD_VAR) +VCD_FILE=$(VCD_FILE)
+	$(SIM_DIR)/$(SIM_NAME) +UVM_TESTNAME=$(UVM_TEST)
+
+build: $(SIM_DIR)/$(SIM_NAME).mk $(SIM_DIR)/$(SIM_NAME)
+
+# Used by the seed runner (rtl2uvm.py regress) to find the simulation binary
+sim_path:
+	@echo $(abspath $(SIM_DIR)/$(SIM_NAME))
+
+# Builds and runs every profile/clocking, the top prints the clock cycles simulated
+BENCH_PROFILES ?= {{ " ".join(profiles) }}
+BENCH_CLOCKING ?= delay cycle
+benchmark:
+	@for p in $(BENCH_PROFILES); do for c in $(BENCH_CLOCKING); do \
+		$(MAKE) -s --no-print-directory build PROFILE=$$p CLOCKING=$$c > /dev/null || exit 1; \
+		start=$$(date +%s.%N); \
+		cycles=$$(../$(SIM_NAME)-$$p-$$c-sim/$(SIM_NAME) +UVM_TESTNAME=$(UVM_TEST) | sed -n 's/.*RTL2UVM_CYCLES \([0-9]*\).*/\1/p'); \
+		end=$$(date +%s.%N); \
+		echo "$$p $$c $${cycles:-0} $$start $$end" | awk '{ printf "%-12s %-6s %12d cycles %10.3f s %14.1f cycles/s\n", $$1, $$2, $$3, $$5-$$4, $$3/($$5-$$4) }'; \
+	done; done
+
+{% if reg_test %}
+# Frontdoor against backdoor register programming, REG_BENCH_ITERS writes of every register
+REG_BENCH_ITERS ?= 10
+reg_bench: build
+	@start=$$(date +%s.%N); \
+	$(SIM_DIR)/$(SIM_NAME) +UVM_TESTNAME={{ reg_test }} +REG_BENCH_ITERS=$(REG_BENCH_ITERS) | grep RTL2UVM_REG_BENCH; \
+	end=$$(date +%s.%N); \
+	echo "$$start $$end" | awk '{ printf "wall time %.3f s\n", $$2-$$1 }'
+
+{% endif %}
+view_vcd:
+	gtkwave $(VCD_FILE)
+
+clean:
+	rm -rf simv*.daidir csrc
+	rm -rf csrc* simv*
+	rm -rf ../$(SIM_NAME)-*-sim
+
+.PHONY: simulate build sim_path benchmark clean view_vcd{{ " reg_bench" if reg_test else "" }}
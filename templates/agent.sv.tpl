@@ -0,0 +1,35 @@
+class {{ agent_name }} extends uvm_agent;
+
+`uvm_component_utils({{ agent_name }})
+{{ seqr_name }} u_sqr;
+{{ driver_name }} u_driver;
+{{ monitor_name }} u_monitor;
+
+virtual {{ interface_name }} vif;
+
+extern function new( string name = "{{ agent_name }}",uvm_component parent);
+extern function void build_phase(uvm_phase phase);
+extern function void connect_phase(uvm_phase phase);
+
+endclass //{{ agent_name }}
+
+function {{ agent_name }}::new(string name,uvm_component parent);
+	super.new(name,parent);
+endfunction : new
+
+function void {{ agent_name }}::build_phase(uvm_phase phase);
+ super.build_phase(phase);
+
+ `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)
+	u_sqr     ={{ seqr_name }}   ::type_id::create("u_sqr",this);
+	u_driver  ={{ driver_name }} ::type_id::create("u_driver",this);
+	u_monitor ={{ monitor_name }}::type_id::create("u_monitor",this);
+endfunction : build_phase
+
+function void {{ agent_name }}::connect_phase(uvm_phase phase);
+ super.connect_phase(phase);
+ `uvm_info(get_type_name(),"In Connect Phase ...",UVM_NONE)
+
+ u_driver.seq_item_port.connect(u_sqr.seq_item_export);
+ `uvm_info(get_type_name(),"CONNECT_PHASE:Connected Driver and Sequencer",UVM_NONE)
+endfunction : connect_phase
@@ -0,0 +1,23 @@
+class {{ seq_name }} extends uvm_sequence#({{ seq_item_name }});
+
+`uvm_object_utils({{ seq_name }})
+{{ seq_item_name }} req;
+
+extern function new( string name = "{{ seq_name }}");
+extern task body();
+
+endclass //{{ seq_name }}
+
+function {{ seq_name }}::new(string name = "{{ seq_name }}");
+ super.new( name );
+endfunction : new
+
+task {{ seq_name }}::body();
+`uvm_info(get_type_name(), $sformatf("Start of {{ seq_name }} Sequence"), UVM_LOW)
+req = {{ seq_item_name }}:: type_id :: create("req");
+repeat(5) begin //{
+	`uvm_do(req)
+end //}
+`uvm_info(get_type_name(), $sformatf("End of {{ seq_name }} Sequence"), UVM_LOW)
+
+endtask //{{ seq_name }}
\ No newline at end of file
@@ -0,0 +1,137 @@
+class {{ cov_name }} extends uvm_subscriber#({{ seq_item_name }});
+
+`uvm_component_utils({{ cov_name }})
+{{ seq_item_name }} item;
+uvm_analysis_imp#({{ seq_item_name }},{{ cov_name }}) cov_export;
+int unsigned n_observed; //Items published by the monitor, read by the performance report of the test
+{% if not verilator_mode %}
+covergroup cg_{{ cov_name }};
+
+	option.per_instance = 1;
+	option.name="Coverage for {{ dut }}";
+	option.comment="Add your comment";
+	option.goal=100;
+
+{% for cp in [c for c in plan if c["kind"] != "cross"] %}
+	cp_{{ cp["signal"] }}: coverpoint (item.{{ cp["signal"] }})
+	{
+{% if cp["kind"] == "auto" %}
+		option.auto_bin_max = {{ cp["bins"] }};
+{% elif cp["kind"] == "value" and cp["width"] == 1 %}
+		bins low  = {0};
+		bins high = {1};
+{% elif cp["kind"] == "value" %}
+		bins vals[] = {[0:{{ (1 << cp["width"]) - 1 }}]};
+{% else %}
+		bins zero = {0};
+		bins max  = { {{- (1 << cp["width"]) - 1 -}} };
+{% for range_i, (low, high) in enumerate(cp["ranges"]) %}
+		bins range_{{ range_i }} = {[{{ low }}:{{ high }}]};
+{% endfor %}
+{% endif %}
+	}
+{% endfor %}
+{% for cp in [c for c in plan if c["kind"] == "cross"] %}
+
+	cx_{{ cp["signal"] }}: cross cp_{{ cp["pair"][0] }}, cp_{{ cp["pair"][1] }};
+{% endfor %}
+
+endgroup: cg_{{ cov_name }}
+{% else %}
+
+//Sampled counter coverage, one counter per bin
+{% for cp in plan %}
+{% if cp["kind"] == "cross" %}
+int unsigned cx_{{ cp["signal"] }}_hits[{{ bins[cp["pair"][0]] }}][{{ bins[cp["pair"][1]] }}];
+{% else %}
+int unsigned cp_{{ cp["signal"] }}_hits[{{ bins[cp["signal"]] }}];
+{% endif %}
+{% endfor %}
+
+{% endif %}
+extern function new( string name = "{{ cov_name }}",uvm_component parent);
+extern function void build_phase(uvm_phase phase);
+extern function void connect_phase(uvm_phase phase);
+extern virtual task run_phase(uvm_phase phase);
+extern virtual function void write({{ seq_item_name }} t);
+extern function void report_phase(uvm_phase phase);
+{% if verilator_mode %}
+extern function void sample_counters({{ seq_item_name }} t);
+extern function real get_counter_coverage();
+{% endif %}
+
+endclass //{{ cov_name }}
+
+function {{ cov_name }}::new(string name,uvm_component parent);
+	super.new(name,parent);
+{% if not verilator_mode %}
+	cg_{{ cov_name }}=new();
+{% endif %}
+endfunction : new
+
+function void {{ cov_name }}::build_phase(uvm_phase phase);
+ super.build_phase(phase);
+	cov_export=new("cov_export", this);
+
+ `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)
+
+endfunction : build_phase
+
+function void {{ cov_name }}::connect_phase(uvm_phase phase);
+	super.connect_phase(phase);
+
+ `uvm_info(get_type_name(),"In Connect Phase ...",UVM_NONE)
+
+endfunction: connect_phase
+
+task {{ cov_name }}::run_phase(uvm_phase phase);
+	super.run_phase(phase);
+
+ `uvm_info(get_type_name(),"In Run Phase ...",UVM_NONE)
+
+endtask: run_phase
+
+function void {{ cov_name }}::write({{ seq_item_name }} t);
+	item=t;
+	n_observed++;
+{% if not verilator_mode %}
+	cg_{{ cov_name }}.sample();
+{% else %}
+	sample_counters(t);
+{% endif %}
+endfunction : write
+
+function void {{ cov_name }}:: report_phase(uvm_phase phase);
+	super.report_phase(phase);
+{% if not verilator_mode %}
+	`uvm_info(get_full_name(),$sformatf("Coverage is %f",cg_{{ cov_name }}.get_coverage()),UVM_LOW);
+{% else %}
+	`uvm_info(get_full_name(),$sformatf("Coverage is %f",get_counter_coverage()),UVM_LOW);
+{% endif %}
+endfunction: report_phase
+{%- if verilator_mode %}
+
+
+function void {{ cov_name }}::sample_counters({{ seq_item_name }} t);
+{% for cp in plan %}
+{% if cp["kind"] == "cross" %}
+	cx_{{ cp["signal"] }}_hits[{{ bin_index[cp["pair"][0]] }}][{{ bin_index[cp["pair"][1]] }}]++;
+{% else %}
+	cp_{{ cp["signal"] }}_hits[{{ bin_index[cp["signal"]] }}]++;
+{% endif %}
+{% endfor %}
+endfunction : sample_counters
+
+function real {{ cov_name }}::get_counter_coverage();
+	int unsigned covered;
+	int unsigned total;
+{% for cp in plan %}
+{% if cp["kind"] == "cross" %}
+	foreach(cx_{{ cp["signal"] }}_hits[i,j]) begin total++; if(cx_{{ cp["signal"] }}_hits[i][j] != 0) covered++; end
+{% else %}
+	foreach(cp_{{ cp["signal"] }}_hits[i]) begin total++; if(cp_{{ cp["signal"] }}_hits[i] != 0) covered++; end
+{% endif %}
+{% endfor %}
+	return (total == 0) ? 0.0 : 100.0*covered/total;
+endfunction : get_counter_coverage
+{% endif %}
\ No newline at end of file
@@ -0,0 +1,9 @@
+// DPI functions imported by {{ pkg_name }}, generated by RTL2UVM
+#include <ctime>
+
+// Monotonic wall clock in seconds, for the performance reports of the test and the golden model scoreboard
+extern "C" double rtl2uvm_wall_time() {
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return now.tv_sec + now.tv_nsec * 1e-9;
+}
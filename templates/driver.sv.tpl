@@ -0,0 +1,61 @@
+
+class {{ driver_name }} extends uvm_driver#({{ seq_item_name }});
+
+`uvm_component_utils({{ driver_name }})
+
+virtual {{ interface_name }} vif;
+
+extern function new( string name = "{{ driver_name }}",uvm_component parent);
+extern function void build_phase(uvm_phase phase);
+extern virtual task run_phase(uvm_phase phase);
+
+endclass //{{ driver_name }}
+
+function {{ driver_name }}::new(string name,uvm_component parent);
+ super.new(name,parent);
+endfunction : new
+
+function void {{ driver_name }}::build_phase(uvm_phase phase);
+ super.build_phase(phase);
+
+ `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)
+	if(!uvm_config_db#(virtual {{ interface_name }})::get(this, "", "vif", vif))
+		begin
+		`uvm_fatal("NO_VIF",{"virtual interface must be set for: ",get_full_name(),".vif"});
+		end
+endfunction : build_phase
+
+task {{ driver_name }}::run_phase(uvm_phase phase);
+	super.run_phase(phase);
+
+ `uvm_info(get_type_name(),"In Run Phase ...",UVM_NONE)
+{% for reset, active_low in resets %}
+	vif.{{ reset }} <= {{ int(not active_low) }};
+	repeat(2) @(posedge vif.{{ clock }});
+	vif.{{ reset }} <= {{ int(active_low) }};
+{% endfor %}
+	forever begin //{
+		{{ seq_item_name }} tr;
+		seq_item_port.get_next_item(tr);
+		uvm_report_info(get_type_name(), $sformatf("Got Input Transaction %s",tr.input2string()));
+{% if reg_bus %}
+		@(vif.driver_cb);
+{% for port in bus_inputs %}
+		vif.driver_cb.{{ port }} <= tr.{{ port }};
+{% endfor %}
+		@(vif.driver_cb);
+{% for port in bus_strobes %}
+		vif.driver_cb.{{ port }} <= 0;
+{% endfor %}
+{% if reg_bus["read_latency"] %}
+		if(!tr.{{ reg_bus["write"] }}) repeat({{ reg_bus["read_latency"] }}) @(vif.driver_cb);
+{% endif %}
+		tr.{{ reg_bus["rdata"] }} = vif.driver_cb.{{ reg_bus["rdata"] }};
+{% else %}
+		// Add your driver logic here using the transaction variable tr.
+{% endif %}
+		uvm_report_info(get_type_name(), $sformatf("Got Response %s",tr.output2string()));
+		seq_item_port.item_done(tr);
+	end //}
+
+endtask: run_phase
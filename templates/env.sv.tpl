@@ -0,0 +1,84 @@
+class {{ env_name }} extends uvm_env;
+
+`uvm_component_utils({{ env_name }})
+{% if agents %}
+{% for a in agents %}
+{{ a["agent"] }} u_{{ a["name"] }}_agent;
+{{ a["sb"] }} u_{{ a["name"] }}_sb;
+{{ a["cov"] }} u_{{ a["name"] }}_cov;
+{% endfor %}
+{% else %}
+{{ classes["agent"] }} u_agent;
+{{ classes["sb"] }} u_sb;
+{{ classes["cov"] }} u_cov;
+{% endif %}
+{% if regs %}
+{{ regs["block"] }} u_regs;
+{{ regs["adapter"] }} u_reg_adapter;
+{{ regs["predictor"] }} u_reg_predictor;
+{% endif %}
+
+extern function new( string name = "{{ env_name }}",uvm_component parent);
+extern function void build_phase(uvm_phase phase);
+extern function void connect_phase(uvm_phase phase);
+
+endclass //{{ env_name }}
+
+function {{ env_name }}::new(string name,uvm_component parent);
+	super.new(name,parent);
+endfunction : new
+
+function void {{ env_name }}::build_phase(uvm_phase phase);
+ super.build_phase(phase);
+
+ `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)
+{% if agents %}
+{% for a in agents %}
+{% for member in ("agent", "sb", "cov") %}
+	u_{{ a["name"] }}_{{ member }}={{ a[member] }}::type_id::create("u_{{ a["name"] }}_{{ member }}",this);
+{% endfor %}
+{% endfor %}
+{% else %}
+	u_agent={{ classes["agent"] }}::type_id::create("u_agent",this);
+	u_sb={{ classes["sb"] }}::type_id::create("u_sb",this);
+	u_cov={{ classes["cov"] }}::type_id::create("u_cov",this);
+{% endif %}
+{% if regs %}
+	u_regs={{ regs["block"] }}::type_id::create("u_regs");
+	u_regs.build();
+	u_regs.lock_model();
+	u_reg_adapter={{ regs["adapter"] }}::type_id::create("u_reg_adapter");
+	u_reg_predictor={{ regs["predictor"] }}::type_id::create("u_reg_predictor",this);
+	//Backdoor of the top unless the simulator provides the uvm_hdl DPI for the HDL paths
+	if(!$test$plusargs("RTL2UVM_HDL_BACKDOOR")) begin
+		uvm_reg_backdoor backdoor;
+		if(!uvm_config_db#(uvm_reg_backdoor)::get(this, "", "reg_backdoor", backdoor))
+			`uvm_fatal("NO_REG_BACKDOOR",{"register backdoor must be set for: ",get_full_name(),".reg_backdoor"});
+		u_regs.set_backdoor(backdoor);
+	end
+{% endif %}
+
+endfunction : build_phase
+
+function void {{ env_name }}::connect_phase(uvm_phase phase);
+ super.connect_phase(phase);
+ `uvm_info(get_type_name(),"Connecting monitor and Scoreboard",UVM_NONE)
+{% if agents %}
+{% for a in agents %}
+	u_{{ a["name"] }}_agent.u_monitor.mon_aport.connect(u_{{ a["name"] }}_sb.sb_export);
+	u_{{ a["name"] }}_agent.u_monitor.mon_aport.connect(u_{{ a["name"] }}_cov.cov_export);
+{% endfor %}
+{% else %}
+	u_agent.u_monitor.mon_aport.connect(u_sb.sb_export);	u_agent.u_monitor.mon_aport.connect(u_cov.cov_export);
+{%- endif %}
+{% if regs %}
+
+	//Register accesses go through the agent, the model is updated from the monitor
+	u_regs.default_map.set_sequencer(u_agent.u_sqr, u_reg_adapter);
+	u_regs.default_map.set_auto_predict(0);
+	u_reg_predictor.map=u_regs.default_map;
+	u_reg_predictor.adapter=u_reg_adapter;
+	u_agent.u_monitor.mon_aport.connect(u_reg_predictor.bus_in);
+{%- endif %}
+
+endfunction : connect_phase
@@ -0,0 +1,3 @@
+{% for source in sources %}
+tb/{{ source }}
+{% endfor %}
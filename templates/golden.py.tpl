@@ -0,0 +1,107 @@
+"""
+Golden model for {{ dut }}, generated by RTL2UVM.
+
+The scoreboard hands the observed items over in batches, one row per item and one
+uint64 column per field. Fill in predict() with a vectorized reference model.
+
+Run "python3 {{ module_name }}.py --bench" to compare batched against per item checking.
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+INPUTS  = {{ repr([f[0] for f in inputs]) }}
+OUTPUTS = {{ repr([f[0] for f in outputs]) }}
+WIDTHS  = {{ repr(dict((f[0], f[1]) for f in fields)) }}
+MASKS   = {name: np.uint64((1 << width) - 1) for name, width in WIDTHS.items()}
+#Batches checked concurrently before submit() blocks the simulation
+MAX_INFLIGHT = int(os.environ.get("RTL2UVM_GOLDEN_INFLIGHT", "4"))
+
+
+def predict(inputs):
+    """
+    Reference model of {{ dut }}.
+
+    Args:
+        inputs (dict): Input name -> np.ndarray (uint64) of the batch
+
+    Returns:
+        dict: Output name -> expected np.ndarray, or None to skip checking
+    """
+    return None
+
+
+def check_batch(batch, offset):
+    """Returns (mismatches, index of the first mismatching item or None) for one batch."""
+    expected = predict({name: batch[:, i] for i, name in enumerate(INPUTS)})
+    if expected is None:
+        return 0, None
+    mismatch = np.zeros(len(batch), dtype=bool)
+    for j, name in enumerate(OUTPUTS):
+        mismatch |= (np.asarray(expected[name], dtype=np.uint64) & MASKS[name]) != batch[:, len(INPUTS) + j]
+    index = np.flatnonzero(mismatch)
+    return len(index), (offset + int(index[0]) if len(index) else None)
+
+
+_pool = ThreadPoolExecutor(max_workers=1) #One worker keeps the batches in order
+_pending = deque()
+_checked = 0
+_mismatches = 0
+_first_mismatch = None
+
+
+def _collect(block):
+    global _mismatches, _first_mismatch
+    while _pending and (block or _pending[0].done()):
+        count, first = _pending.popleft().result()
+        _mismatches += count
+        if _first_mismatch is None and first is not None:
+            _first_mismatch = first
+
+
+def submit(data):
+    """Queues a packed batch (bytes) for checking, returns the mismatches found so far."""
+    global _checked
+    batch = np.frombuffer(data, dtype=np.uint64).reshape(-1, len(INPUTS) + len(OUTPUTS))
+    _pending.append(_pool.submit(check_batch, batch, _checked))
+    _checked += len(batch)
+    while len(_pending) > MAX_INFLIGHT:
+        _pending[0].result() #Backpressure, wait for the oldest batch
+        _collect(False)
+    _collect(False)
+    return _mismatches
+
+
+def finish():
+    """Waits for all the batches, returns the total number of mismatches."""
+    _collect(True)
+    if _first_mismatch is not None:
+        print(f"{{ module_name }}: {_mismatches} mismatches, first at item {_first_mismatch}")
+    return _mismatches
+
+
+def _bench(items, batch_size):
+    rng = np.random.default_rng(1)
+    rows = np.stack([rng.integers(0, int(MASKS[name]), size=items, dtype=np.uint64, endpoint=True)
+                     for name in INPUTS + OUTPUTS], axis=1) if INPUTS + OUTPUTS else np.zeros((items, 0), dtype=np.uint64)
+    for label, size in (("per item", 1), (f"batches of {batch_size}", batch_size)):
+        start = time.perf_counter()
+        for offset in range(0, items, size):
+            submit(rows[offset:offset + size].tobytes())
+        finish()
+        elapsed = time.perf_counter() - start
+        print(f"{label:>20}: {items / elapsed:14.1f} checks/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Golden model of {{ dut }}")
+    parser.add_argument("--bench", action="store_true", help="Compare batched against per item checking")
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=1024)
+    bench_args = parser.parse_args()
+    if bench_args.bench:
+        _bench(bench_args.items, bench_args.batch)
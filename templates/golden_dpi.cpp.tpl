@@ -0,0 +1,52 @@
+// DPI bridge between {{ sb_name }} and {{ module_name }}.py, generated by RTL2UVM
+#include <Python.h>
+#include <cstdio>
+#include <cstdlib>
+
+static const int golden_fields = {{ len(fields) }};
+// Folder of {{ module_name }}.py set by the Makefile, RTL2UVM_GOLDEN_PATH overrides it
+#define GOLDEN_STR_(x) #x
+#define GOLDEN_STR(x) GOLDEN_STR_(x)
+#ifdef RTL2UVM_GOLDEN_DIR
+static const char* golden_path = GOLDEN_STR(RTL2UVM_GOLDEN_DIR);
+#else
+static const char* golden_path = "tb";
+#endif
+static PyObject* golden_module = nullptr;
+
+static void golden_init() {
+    if (golden_module) return;
+    Py_Initialize();
+    const char* path = getenv("RTL2UVM_GOLDEN_PATH");
+    PyList_Insert(PySys_GetObject("path"), 0, PyUnicode_FromString(path ? path : golden_path));
+    golden_module = PyImport_ImportModule("{{ module_name }}");
+    if (!golden_module) { PyErr_Print(); exit(1); }
+    PyEval_SaveThread(); // Let the checker thread run while the simulation continues
+}
+
+// Calls {{ module_name }}.<method>(arg) and returns its integer result
+static int golden_call(const char* method, const long long* buffer, int count) {
+    golden_init();
+    PyGILState_STATE state = PyGILState_Ensure();
+    PyObject* ret;
+    if (buffer) {
+        PyObject* data = PyBytes_FromStringAndSize((const char*)buffer, (Py_ssize_t)count * golden_fields * sizeof(long long));
+        ret = PyObject_CallMethod(golden_module, method, "(O)", data);
+        Py_DECREF(data);
+    } else {
+        ret = PyObject_CallMethod(golden_module, method, nullptr);
+    }
+    if (!ret) { PyErr_Print(); exit(1); }
+    int value = (int)PyLong_AsLong(ret);
+    Py_DECREF(ret);
+    PyGILState_Release(state);
+    return value;
+}
+
+extern "C" int rtl2uvm_golden_submit(int count, const long long* buffer) {
+    return golden_call("submit", buffer, count);
+}
+
+extern "C" int rtl2uvm_golden_finish() {
+    return golden_call("finish", nullptr, 0);
+}
@@ -0,0 +1,3 @@
+`verilator_config
+//Compile the design as a separate hierarchical block (make HIER=1)
+hier_block -module "{{ dut }}"
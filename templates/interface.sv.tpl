@@ -0,0 +1,53 @@
+
+interface {{ interface_name }} (input logic {{ ports }});
+{{ "".join(declarations) }}
+//--------------------------------------
+//Driver Clocking Block
+//--------------------------------------
+{% for clock in clocks %}
+clocking driver_cb @(posedge {{ clock }});
+{% endfor %}
+{% if verilator_mode %}
+`ifndef RTL2UVM_CYCLE_DRIVEN //No skew delays when the clock is driven from C++
+{% endif %}
+	default input #1 output #1;
+{% if verilator_mode %}
+`endif
+{% endif %}
+{% for port in driver_outputs %}
+	output {{ port }};
+{% endfor %}
+{% for port in driver_inputs %}
+	input {{ port }};
+{% endfor %}
+
+endclocking //driver_cb
+//--------------------------------------
+//Monitor Clocking Block
+//--------------------------------------
+clocking monitor_cb @(posedge {{ clocks[-1] }});
+{% if verilator_mode %}
+`ifndef RTL2UVM_CYCLE_DRIVEN
+{% endif %}
+default input #1 output #1;
+{% if verilator_mode %}
+`endif
+{% endif %}
+{% for port in monitor_inputs %}
+	input {{ port }};
+{% endfor %}
+
+endclocking //monitor_cb
+{% if not verilator_mode %}
+//--------------------------------------
+//Driver Modport
+//--------------------------------------
+modport DRIVER  (clocking driver_cb,input {{ ports }});
+
+//--------------------------------------
+//Monitor Modport
+//--------------------------------------
+modport MONITOR (clocking monitor_cb,input {{ ports }});
+
+{% endif %}
+endinterface //{{ interface_name }}
\ No newline at end of file
@@ -0,0 +1,34 @@
+// Cycle driven main loop generated by RTL2UVM, see RTL2UVM_CYCLE_DRIVEN in {{ top_name }}.sv
+#include <memory>
+#include "verilated.h"
+#include "{{ model_name }}.h"
+
+// Half clock period in time precision units (5ns at --timescale 1ns/1ps)
+static const uint64_t half_period = 5000;
+
+int main(int argc, char** argv) {
+    const std::unique_ptr<VerilatedContext> contextp{new VerilatedContext};
+    contextp->commandArgs(argc, argv);
+    const std::unique_ptr<{{ model_name }}> top{new {{ model_name }}{contextp.get(), "TOP"}};
+    uint64_t next_edge = half_period;
+{% for clk_i in clocks %}
+    top->{{ clk_i }} = 0;
+{% endfor %}
+    while (!contextp->gotFinish()) {
+        top->eval();
+        uint64_t next_time = next_edge;
+        if (top->eventsPending() && top->nextTimeSlot() < next_time) next_time = top->nextTimeSlot();
+        contextp->time(next_time);
+        if (next_time == next_edge) {
+{% for clk_i in clocks %}
+            top->{{ clk_i }} = !top->{{ clk_i }};
+{% endfor %}
+            next_edge += half_period;
+        }
+    }
+    top->final();
+#if VM_COVERAGE
+    contextp->coveragep()->write();
+#endif
+    return 0;
+}
@@ -0,0 +1,105 @@
+{% if verilator_mode %}
+`define MON_VIF vif.monitor_cb
+{% else %}
+`define MON_VIF vif.MONITOR.monitor_cb
+{% endif %}
+class {{ monitor_name }} extends uvm_monitor;
+
+uvm_analysis_port#({{ seq_item_name }}) mon_aport;
+{{ seq_item_name }} rx;
+{{ seq_item_name }} last_rx;
+
+//Sampling statistics reported in report_phase
+longint unsigned sampled_cycles;
+longint unsigned published_items;
+//+MON_SAMPLE_ALL publishes every cycle (no qualification)
+bit sample_all;
+
+//+TRACE_BIN=<file> records every published item in a binary trace (rtl2uvm.py trace)
+int trace_fd;
+
+`uvm_component_utils({{ monitor_name }})
+
+virtual {{ interface_name }} vif;
+
+extern function new( string name = "{{ monitor_name }}",uvm_component parent);
+extern function void build_phase(uvm_phase phase);
+extern virtual task run_phase(uvm_phase phase);
+extern function bit is_qualified({{ seq_item_name }} item);
+extern function bit has_changed({{ seq_item_name }} item);
+extern function void report_phase(uvm_phase phase);
+
+endclass //{{ monitor_name }}
+
+function {{ monitor_name }}::new(string name,uvm_component parent);
+	super.new(name,parent);
+	mon_aport=new("mon_aport", this);
+endfunction : new
+
+function void {{ monitor_name }}::build_phase(uvm_phase phase);
+ string trace_file;
+ super.build_phase(phase);
+
+ `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)	if(!uvm_config_db#(virtual {{ interface_name }})::get(this, "", "vif", vif))
+		begin
+		`uvm_fatal("NO_MON_VIF",{"virtual interface must be set for: ",get_full_name(),".vif"});
+		end
+	sample_all = $test$plusargs("MON_SAMPLE_ALL");
+	if($value$plusargs("TRACE_BIN=%s", trace_file)) begin
+{% if trace_suffix %}
+		trace_fd = $fopen({trace_file, "{{ trace_suffix }}"}, "wb");
+{% else %}
+		trace_fd = $fopen(trace_file, "wb");
+{% endif %}
+		$fwrite(trace_fd, "RTL2UVM_TRACE\n%s\n", "{{ trace_header }}");
+	end
+endfunction : build_phase
+
+task {{ monitor_name }}::run_phase(uvm_phase phase);
+	super.run_phase(phase);
+
+ `uvm_info(get_type_name(),"In Run Phase ...",UVM_NONE)
+
+	rx={{ seq_item_name }}::type_id::create("rx",this);
+	forever begin //{
+		@(`MON_VIF);
+		sampled_cycles++;
+{% for sig in signals %}
+		rx.{{ sig }} = `MON_VIF.{{ sig }};
+{% endfor %}
+		//Publish only on qualified cycles or when the sampled values change
+		if(sample_all || is_qualified(rx) || has_changed(rx)) begin
+			uvm_report_info(get_type_name(), $sformatf("Printing Transaction %s",rx.convert2string()), UVM_HIGH);
+			mon_aport.write(rx);
+			published_items++;
+			if(trace_fd) $fwrite(trace_fd, "{{ "%u" * (len(trace_fields) + 1) }}", 64'($time){% for field in trace_fields %}, {{ field["bytes"] * 8 }}'(rx.{{ field["name"] }}){% endfor %});
+			last_rx = rx;
+			rx={{ seq_item_name }}::type_id::create("rx",this);
+		end
+	end //}
+
+endtask: run_phase
+
+function bit {{ monitor_name }}::is_qualified({{ seq_item_name }} item);
+{% if qualifiers %}
+	return ({{ " || ".join(("!item." if active_low else "item.") + q for q, active_low in qualifiers) }});
+{% else %}
+	return 0; //No qualifier detected, sampling on value change only
+{% endif %}
+endfunction : is_qualified
+
+function bit {{ monitor_name }}::has_changed({{ seq_item_name }} item);
+	if(last_rx == null) return 1;
+{% if signals %}
+	return ({{ " || ".join("item." + sig + " != last_rx." + sig for sig in signals) }});
+{% else %}
+	return 0;
+{% endif %}
+endfunction : has_changed
+
+function void {{ monitor_name }}::report_phase(uvm_phase phase);
+	super.report_phase(phase);
+	`uvm_info(get_type_name(),$sformatf("Analysis traffic: %0d items published over %0d sampled cycles (%0.1f%% reduction)",
+		published_items, sampled_cycles, (sampled_cycles == 0) ? 0.0 : 100.0*(sampled_cycles-published_items)/sampled_cycles),UVM_LOW)
+	if(trace_fd) $fclose(trace_fd);
+endfunction : report_phase
@@ -0,0 +1,6 @@
+//Parameter sweep defaults, a sweep point overrides them (make SWEEP=<point> adds -DRTL2UVM_<parameter>=<value>)
+{% for name_i, value in defaults.items() %}
+`ifndef RTL2UVM_{{ name_i }}
+`define RTL2UVM_{{ name_i }} {{ value }}
+`endif
+{% endfor %}
@@ -0,0 +1,15 @@
+package {{ pkg_name }};
+
+import uvm_pkg:: *;
+`include "uvm_macros.svh"
+
+longint unsigned sim_cycles; //Clock cycles simulated, counted by the top
+{% if verilator_mode %}
+import "DPI-C" function real rtl2uvm_wall_time(); //Monotonic wall clock in seconds (tb/{{ dpi_file }})
+{% endif %}
+
+{% for class_i in classes %}
+`include "{{ class_i }}.sv"
+{% endfor %}
+
+endpackage //{{ pkg_name }}
@@ -0,0 +1,33 @@
+
+//--------------------------------------
+//Register backdoor: peek/poke the DUT registers
+//--------------------------------------
+{% for r in regs %}
+logic [{{ r["width"] - 1 }}:0] {{ r["name"] }}_poke;
+{% endfor %}
+class {{ reg_backdoor_name }} extends uvm_reg_backdoor;
+	function new(string name = "{{ reg_backdoor_name }}");
+		super.new(name);
+	endfunction : new
+	virtual task write(uvm_reg_item rw);
+		do_pre_write(rw);
+		rw.status = UVM_IS_OK;
+		case(rw.element.get_name())
+{% for r in regs %}
+			"{{ r["name"] }}": begin {{ r["name"] }}_poke = rw.value[0]; force UUT.{{ r["hdl_path"] }} = {{ r["name"] }}_poke; release UUT.{{ r["hdl_path"] }}; end
+{% endfor %}
+			default: rw.status = UVM_NOT_OK;
+		endcase
+		do_post_write(rw);
+	endtask : write
+	virtual function void read_func(uvm_reg_item rw);
+		rw.status = UVM_IS_OK;
+		case(rw.element.get_name())
+{% for r in regs %}
+			"{{ r["name"] }}": rw.value[0] = UUT.{{ r["hdl_path"] }};
+{% endfor %}
+			default: rw.status = UVM_NOT_OK;
+		endcase
+	endfunction : read_func
+endclass //{{ reg_backdoor_name }}
+{{ reg_backdoor_name }} reg_backdoor;
@@ -0,0 +1,118 @@
+{% for reg in regs %}
+{% set reg_class = dut + "_" + reg["name"] + "_reg" %}
+class {{ reg_class }} extends uvm_reg;
+
+`uvm_object_utils({{ reg_class }})
+{% for field in reg["fields"] %}
+{{ "" if field["access"] == "RO" else "rand " }}uvm_reg_field {{ field["name"] }};
+{% endfor %}
+
+extern function new( string name = "{{ reg_class }}");
+extern virtual function void build();
+
+endclass //{{ reg_class }}
+
+function {{ reg_class }}::new(string name = "{{ reg_class }}");
+ super.new(name, {{ reg["width"] }}, UVM_NO_COVERAGE);
+endfunction : new
+
+function void {{ reg_class }}::build();
+{% for field in reg["fields"] %}
+{# Status (RO) bits are volatile, they are updated by the design #}
+{% set volatile = int(field["access"] == "RO") %}
+	{{ field["name"] }} = uvm_reg_field::type_id::create("{{ field["name"] }}");
+	{{ field["name"] }}.configure(this, {{ field["width"] }}, {{ field["lsb"] }}, "{{ field["access"] }}", {{ volatile }}, 'h{{ format(field["reset"], "x") }}, 1, {{ 1 - volatile }}, 0);
+{% endfor %}
+endfunction : build
+
+{% endfor %}
+class {{ reg_block_name }} extends uvm_reg_block;
+
+`uvm_object_utils({{ reg_block_name }})
+{% for reg in regs %}
+rand {{ dut }}_{{ reg["name"] }}_reg {{ reg["name"] }};
+{% endfor %}
+
+extern function new( string name = "{{ reg_block_name }}");
+extern virtual function void build();
+
+endclass //{{ reg_block_name }}
+
+function {{ reg_block_name }}::new(string name = "{{ reg_block_name }}");
+ super.new(name, UVM_NO_COVERAGE);
+endfunction : new
+
+function void {{ reg_block_name }}::build();
+	default_map = create_map("default_map", 0, {{ n_bytes }}, UVM_LITTLE_ENDIAN, 0);
+	add_hdl_path("{{ dut }}_top.UUT");
+{% for reg in regs %}
+	{{ reg["name"] }} = {{ dut }}_{{ reg["name"] }}_reg::type_id::create("{{ reg["name"] }}");
+	{{ reg["name"] }}.configure(this, null, "");
+	{{ reg["name"] }}.build();
+{% if reg["hdl_path"] %}
+	{{ reg["name"] }}.add_hdl_path_slice("{{ reg["hdl_path"] }}", 0, {{ reg["width"] }});
+{% endif %}
+	default_map.add_reg({{ reg["name"] }}, 'h{{ format(reg["offset"], "x") }}, "{{ reg["access"] }}");
+{% endfor %}
+endfunction : build
+
+//Converts register operations to sequence items of the {{ bus["addr"] }}/{{ bus["wdata"] }}/{{ bus["rdata"] }} bus and back
+class {{ reg_adapter_name }} extends uvm_reg_adapter;
+
+`uvm_object_utils({{ reg_adapter_name }})
+
+extern function new( string name = "{{ reg_adapter_name }}");
+extern virtual function uvm_sequence_item reg2bus(const ref uvm_reg_bus_op rw);
+extern virtual function void bus2reg(uvm_sequence_item bus_item, ref uvm_reg_bus_op rw);
+
+endclass //{{ reg_adapter_name }}
+
+function {{ reg_adapter_name }}::new(string name = "{{ reg_adapter_name }}");
+ super.new(name);
+endfunction : new
+
+function uvm_sequence_item {{ reg_adapter_name }}::reg2bus(const ref uvm_reg_bus_op rw);
+	{{ seq_item_name }} item = {{ seq_item_name }}::type_id::create("item");
+	item.{{ bus["addr"] }} = rw.addr;
+	item.{{ bus["wdata"] }} = rw.data;
+	item.{{ bus["write"] }} = (rw.kind == UVM_WRITE);
+{% if bus.get("read") %}
+	item.{{ bus["read"] }} = (rw.kind == UVM_READ);
+{% endif %}
+	return item;
+endfunction : reg2bus
+
+function void {{ reg_adapter_name }}::bus2reg(uvm_sequence_item bus_item, ref uvm_reg_bus_op rw);
+	{{ seq_item_name }} item;
+	if(!$cast(item, bus_item)) begin
+		`uvm_fatal("NOT_BUS_ITEM", "bus2reg: the item is not a {{ seq_item_name }}")
+		return;
+	end
+	rw.kind = item.{{ bus["write"] }} ? UVM_WRITE : UVM_READ;
+	rw.addr = item.{{ bus["addr"] }};
+	rw.data = item.{{ bus["write"] }} ? item.{{ bus["wdata"] }} : item.{{ bus["rdata"] }};
+	rw.status = UVM_IS_OK;
+endfunction : bus2reg
+
+//Updates the register model from the bus traffic seen by the monitor
+class {{ reg_predictor_name }} extends uvm_reg_predictor#({{ seq_item_name }});
+
+`uvm_component_utils({{ reg_predictor_name }})
+
+extern function new( string name = "{{ reg_predictor_name }}",uvm_component parent);
+extern virtual function void write({{ seq_item_name }} tr);
+
+endclass //{{ reg_predictor_name }}
+
+function {{ reg_predictor_name }}::new(string name,uvm_component parent);
+ super.new(name,parent);
+endfunction : new
+
+function void {{ reg_predictor_name }}::write({{ seq_item_name }} tr);
+{% if bus.get("read") and bus["read_latency"] == 0 %}
+	if(tr.{{ bus["write"] }} || tr.{{ bus["read"] }}) super.write(tr);
+{% else %}
+	//The read data comes {{ bus["read_latency"] }} cycle(s) after the sampled request, only writes are predicted
+	if(tr.{{ bus["write"] }}) super.write(tr);
+{% endif %}
+endfunction : write
@@ -0,0 +1,57 @@
+
+class {{ reg_test_name }} extends uvm_test;
+
+{{ env_name }} u_env;
+
+`uvm_component_utils({{ reg_test_name }})
+
+extern function new( string name = "{{ reg_test_name }}",uvm_component parent);
+extern function void build_phase(uvm_phase phase);
+extern virtual task run_phase(uvm_phase phase);
+extern task program_registers(uvm_reg regs[$], uvm_door_e path, int iterations, output int writes, output time elapsed);
+
+endclass //{{ reg_test_name }}
+
+function {{ reg_test_name }}::new(string name,uvm_component parent);
+ super.new(name,parent);
+endfunction : new
+
+function void {{ reg_test_name }}::build_phase(uvm_phase phase);
+ super.build_phase(phase);
+	u_env={{ env_name }}::type_id::create("u_env",this);
+endfunction : build_phase
+
+task {{ reg_test_name }}::program_registers(uvm_reg regs[$], uvm_door_e path, int iterations, output int writes, output time elapsed);
+	uvm_status_e status;
+	time start=$time;
+	writes=0;
+	repeat(iterations) begin
+		foreach(regs[i]) begin
+			if(regs[i].get_rights() == "RO") continue;
+			regs[i].write(status, $urandom, path);
+			if(status != UVM_IS_OK) `uvm_error("REG_BENCH", $sformatf("%s write of %s failed", path.name(), regs[i].get_name()))
+			writes++;
+		end
+	end
+	elapsed=$time-start;
+endtask : program_registers
+
+task {{ reg_test_name }}::run_phase(uvm_phase phase);
+	uvm_status_e status;
+	uvm_reg_data_t value;
+	uvm_reg regs[$];
+	int iterations, front_writes, back_writes;
+	time front_time, back_time;
+	super.run_phase(phase);
+	phase.raise_objection( this, "Starting register benchmark");
+	if(!$value$plusargs("REG_BENCH_ITERS=%d", iterations)) iterations=10;
+	u_env.u_regs.get_registers(regs);
+	regs[0].read(status, value, UVM_FRONTDOOR); //Out of reset before timing
+	program_registers(regs, UVM_FRONTDOOR, iterations, front_writes, front_time);
+	program_registers(regs, UVM_BACKDOOR, iterations, back_writes, back_time);
+	//The backdoor values must be visible on the bus
+	u_env.u_regs.mirror(status, UVM_CHECK, UVM_FRONTDOOR);
+	`uvm_info(get_type_name(), $sformatf("Frontdoor: %0d writes in %0t, backdoor: %0d writes in %0t", front_writes, front_time, back_writes, back_time), UVM_LOW)
+	$display("RTL2UVM_REG_BENCH frontdoor_writes=%0d frontdoor_time=%0t backdoor_writes=%0d backdoor_time=%0t", front_writes, front_time, back_writes, back_time);
+	phase.drop_objection( this, "Dropping phase objection");
+endtask: run_phase
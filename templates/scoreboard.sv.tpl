@@ -0,0 +1,95 @@
+{% if golden_batch %}
+//Batched DPI bridge to the Python golden model ({{ golden_module }}.py)
+import "DPI-C" function int rtl2uvm_golden_submit(input int count, input longint buffer[{{ golden_batch * len(fields) }}]);
+import "DPI-C" function int rtl2uvm_golden_finish();
+
+{% endif %}
+class {{ sb_name }} extends uvm_scoreboard;
+
+virtual {{ interface_name }} vif;
+uvm_analysis_imp#({{ seq_item_name }},{{ sb_name }}) sb_export;
+{% if golden_batch %}
+
+//Items are packed one 64 bit slot per field: {{ ", ".join(f[0] for f in fields) }}
+localparam int GOLDEN_BATCH  = {{ golden_batch }};
+localparam int GOLDEN_FIELDS = {{ len(fields) }};
+longint golden_buf[GOLDEN_BATCH*GOLDEN_FIELDS];
+int golden_count;
+int golden_mismatches;
+longint unsigned golden_checks;
+real golden_time;
+//+GOLDEN_PER_ITEM hands every item to the golden model on its own (benchmark)
+bit golden_per_item;
+{% endif %}
+
+`uvm_component_utils({{ sb_name }})
+
+extern function new( string name = "{{ sb_name }}",uvm_component parent);
+extern function void build_phase(uvm_phase phase);
+extern virtual task run_phase(uvm_phase phase);
+extern virtual function void write({{ seq_item_name }} pkt);
+{% if golden_batch %}
+extern function void golden_flush();
+extern function void report_phase(uvm_phase phase);
+{% endif %}
+endclass //{{ sb_name }}
+
+function {{ sb_name }}::new(string name,uvm_component parent);
+	super.new(name,parent);
+	sb_export=new("sb_export", this);
+endfunction : new
+
+function void {{ sb_name }}::build_phase(uvm_phase phase);
+ super.build_phase(phase);
+
+ `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)
+{% if golden_batch %}
+	golden_per_item = $test$plusargs("GOLDEN_PER_ITEM");
+{% endif %}
+
+endfunction : build_phase
+
+task {{ sb_name }}::run_phase(uvm_phase phase);
+	super.run_phase(phase);
+
+ `uvm_info(get_type_name(),"In Run Phase ...",UVM_NONE)
+
+endtask: run_phase
+
+function void {{ sb_name }}::write({{ seq_item_name }} pkt);
+{% if golden_batch %}
+{% for index, field in enumerate(fields) %}
+	golden_buf[golden_count*GOLDEN_FIELDS+{{ index }}] = longint'(pkt.{{ field[0] }});
+{% endfor %}
+	golden_count++;
+	if(golden_per_item || golden_count == GOLDEN_BATCH) golden_flush();
+{% else %}
+	pkt.print();
+{% endif %}
+endfunction : write
+{% if golden_batch %}
+
+function void {{ sb_name }}::golden_flush();
+	real start_time;
+	if(golden_count == 0) return;
+	start_time = rtl2uvm_wall_time();
+	//Blocks while the golden model has too many batches in flight (backpressure)
+	golden_mismatches = rtl2uvm_golden_submit(golden_count, golden_buf);
+	golden_time += rtl2uvm_wall_time() - start_time;
+	golden_checks += golden_count;
+	golden_count = 0;
+endfunction : golden_flush
+
+function void {{ sb_name }}::report_phase(uvm_phase phase);
+	real start_time;
+	super.report_phase(phase);
+	golden_flush();
+	start_time = rtl2uvm_wall_time();
+	golden_mismatches = rtl2uvm_golden_finish();
+	golden_time += rtl2uvm_wall_time() - start_time;
+	`uvm_info(get_type_name(),$sformatf("Golden model: %0d checks in %0.3f s (%0.1f checks/s, %s)",
+		golden_checks, golden_time, (golden_time > 0) ? golden_checks/golden_time : 0.0, golden_per_item ? "per item" : $sformatf("batches of %0d", GOLDEN_BATCH)),UVM_LOW)
+	if(golden_mismatches != 0)
+		`uvm_error(get_type_name(),$sformatf("Golden model reported %0d mismatches", golden_mismatches))
+endfunction : report_phase
+{% endif %}
@@ -0,0 +1,35 @@
+//(0) Create a class extending from uvm_sequence_item
+//(1) Register class with Factory
+//(2) Declare transaction varaiable
+//(3) Construct the created class with new()
+//(4) Add constraints [if any]
+class {{ seq_item_name }} extends uvm_sequence_item;
+
+`uvm_object_utils({{ seq_item_name }})
+{{ "".join(declarations) }}
+
+extern function new( string name = "{{ seq_item_name }}");
+//extern constraint WRITE_YOUR_OWN_CONSTRAINT;
+extern function string input2string();
+extern function string output2string();
+extern function string convert2string();
+
+endclass //{{ seq_item_name }}
+
+function {{ seq_item_name }}::new( string name = "{{ seq_item_name }}");
+ super.new( name );
+endfunction : new
+
+//constraint {{ seq_item_name }}::WRITE_YOUR_OWN_CONSTRAINT{ a!= b; };
+
+function string {{ seq_item_name }}::input2string();
+ return $sformatf("{{ "=%0h,".join(inputs) }}=%0h",{{ ",".join(inputs) }});
+endfunction : input2string
+
+function string {{ seq_item_name }}::output2string();
+ return $sformatf("{{ "=%0h,".join(outputs) }}=%0h",{{ ",".join(outputs) }});
+endfunction : output2string
+
+function string {{ seq_item_name }}::convert2string();
+ return ({input2string(), " ", output2string()});
+endfunction : convert2string
\ No newline at end of file
@@ -0,0 +1,28 @@
+{% if verilator_mode %}
+class {{ seqr_name }} extends uvm_sequencer#({{ seq_item_name }},{{ seq_item_name }});
+{% else %}
+class {{ seqr_name }} extends uvm_sequencer#({{ seq_item_name }});
+{% endif %}
+
+`uvm_component_utils({{ seqr_name }})
+int unsigned n_driven; //Items completed by the driver, read by the performance report of the test
+
+extern function new( string name = "{{ seqr_name }}",uvm_component parent=null);
+extern function void build_phase(uvm_phase phase);
+extern virtual function void item_done({{ seq_item_name }} item = null);
+
+endclass //{{ seqr_name }}
+
+function {{ seqr_name }}::new(string name,uvm_component parent);
+ super.new(name,parent);
+endfunction : new
+
+function void {{ seqr_name }}::build_phase(uvm_phase phase);
+ super.build_phase(phase);
+ `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)
+endfunction : build_phase
+
+function void {{ seqr_name }}::item_done({{ seq_item_name }} item = null);
+	n_driven++;
+	super.item_done(item);
+endfunction : item_done
@@ -0,0 +1,104 @@
+class {{ test_name }} extends uvm_test;
+
+{% if not agents %}
+virtual {{ interface_name }} vif;
+{% endif %}
+{{ env_name }} u_env;
+		{{ seq_name }} u_seq;
+real wall_start;
+
+`uvm_component_utils({{ test_name }})
+
+extern function new( string name = "{{ test_name }}",uvm_component parent);
+extern function void build_phase(uvm_phase phase);
+extern virtual task run_phase(uvm_phase phase);
+extern function void start_of_simulation_phase(uvm_phase phase);
+extern function void report_phase(uvm_phase phase);
+extern function real wall_clock();
+
+endclass //{{ test_name }}
+
+function {{ test_name }}::new(string name,uvm_component parent);
+ super.new(name,parent);
+endfunction : new
+
+function void {{ test_name }}::build_phase(uvm_phase phase);
+ super.build_phase(phase);
+
+ `uvm_info(get_type_name(),"In Build Phase ...",UVM_NONE)
+	u_env={{ env_name }}::type_id::create("u_env",this);
+endfunction : build_phase
+
+task {{ test_name }}::run_phase(uvm_phase phase);
+	super.run_phase(phase);
+
+		`uvm_info(get_type_name(),"In Run Phase ...",UVM_NONE)
+		u_seq={{ seq_name }}::type_id::create("u_seq",this);
+{% for a in agents %}
+		u_seq.{{ a["name"] }}_sqr = u_env.u_{{ a["name"] }}_agent.u_sqr;
+{% endfor %}
+		phase.raise_objection( this, "Starting phase objection");
+
+		`uvm_info(get_type_name(), $sformatf("Starting Sequence"), UVM_LOW)
+{% if agents %}
+		u_seq.start(null);
+{% else %}
+		u_seq.start(u_env.u_agent.u_sqr);
+{% endif %}
+
+		phase.drop_objection( this, "Dropping phase objection");
+endtask: run_phase
+
+function void {{ test_name }}::start_of_simulation_phase(uvm_phase phase);
+	super.start_of_simulation_phase(phase);
+	wall_start = wall_clock();
+endfunction : start_of_simulation_phase
+
+//Wall clock in seconds, SystemVerilog has no wall clock of its own
+function real {{ test_name }}::wall_clock();
+{% if verilator_mode %}
+	return rtl2uvm_wall_time();
+{% else %}
+	int fd;
+	real seconds = 0;
+	void'($system("date +%s.%N > .rtl2uvm_wall_clock"));
+	fd = $fopen(".rtl2uvm_wall_clock", "r");
+	if(fd != 0) begin
+		void'($fscanf(fd, "%f", seconds));
+		$fclose(fd);
+	end
+	return seconds;
+{% endif %}
+endfunction : wall_clock
+
+//Simulation speed: printed as SIM_PERF and written to sim_perf.json in the run folder
+function void {{ test_name }}::report_phase(uvm_phase phase);
+	real wall_s, sim_ns, cycles_per_s, transactions_per_s;
+	longint unsigned driven = 0, observed = 0;
+	int fd;
+	super.report_phase(phase);
+	wall_s = wall_clock() - wall_start;
+{% if not verilator_mode %}
+	void'($system("rm -f .rtl2uvm_wall_clock"));
+{% endif %}
+	sim_ns = $realtime / 1ns;
+{% if agents %}
+{% for a in agents %}
+	driven += u_env.u_{{ a["name"] }}_agent.u_sqr.n_driven;
+	observed += u_env.u_{{ a["name"] }}_cov.n_observed;
+{% endfor %}
+{% else %}
+	driven = u_env.u_agent.u_sqr.n_driven;
+	observed = u_env.u_cov.n_observed;
+{% endif %}
+	cycles_per_s = wall_s > 0 ? sim_cycles / wall_s : 0;
+	transactions_per_s = wall_s > 0 ? observed / wall_s : 0;
+	`uvm_info("SIM_PERF", $sformatf("%0.3f s wall, %0.1f ns simulated, %0d cycles (%0.1f cycles/s), %0d items driven, %0d observed (%0.1f transactions/s)",
+	          wall_s, sim_ns, sim_cycles, cycles_per_s, driven, observed, transactions_per_s), UVM_LOW)
+	fd = $fopen("sim_perf.json", "w");
+	if(fd != 0) begin
+		$fdisplay(fd, "{\"test\": \"%s\", \"wall_s\": %0.6f, \"sim_time_ns\": %0.3f, \"cycles\": %0d, \"transactions_driven\": %0d, \"transactions_observed\": %0d, \"cycles_per_s\": %0.3f, \"transactions_per_s\": %0.3f}",
+		          get_type_name(), wall_s, sim_ns, sim_cycles, driven, observed, cycles_per_s, transactions_per_s);
+		$fclose(fd);
+	end
+endfunction : report_phase
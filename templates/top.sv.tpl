@@ -0,0 +1,99 @@
+import uvm_pkg:: *;
+`include "uvm_macros.svh"
+{% if not verilator_mode %}
+{# Single file flow, verilator compiles the interface and package from the filelist #}
+{% for intf_i in interfaces %}
+`include "{{ intf_i }}.sv"
+{% endfor %}
+`include "{{ pkg_name }}.sv"
+{% endif %}
+import {{ pkg_name }}::*;
+{% if verilator_mode %}
+{# Cycle driven variant: the clock is a top level port toggled by the generated C++ main #}
+
+`ifdef RTL2UVM_CYCLE_DRIVEN
+module {{ top_name }}({{ ", ".join(clocks) }});
+`else
+module {{ top_name }};
+`endif
+{% else %}
+
+module {{ top_name }};
+{% endif %}
+
+//--------------------------------------
+//signal declaration: clock and reset
+//--------------------------------------
+{%- if verilator_mode %}
+
+`ifdef RTL2UVM_CYCLE_DRIVEN
+{%- for d in clock_declarations %}{{ d.replace("bit","input bit",1) }}{% endfor %}
+
+`else
+{%- endif %}
+{% for d in clock_declarations %}{{ d }}{% endfor %}
+
+
+initial begin
+{{ "=0;".join(clock_inits) }}=0;
+end
+//--------------------------------------
+//clock Generation
+//--------------------------------------
+always begin
+{% for clk_i in clocks %}
+{# TODO Make the delay value as a parameter or configurable one #}
+	#5 {{ clk_i }} <= ~{{ clk_i }};
+{% endfor %}
+end
+{% if verilator_mode %}
+`endif //RTL2UVM_CYCLE_DRIVEN
+{% endif %}
+
+//--------------------------------------
+//Cycle counter, used by the benchmark
+//--------------------------------------
+always @(posedge {{ clocks[-1] }}) {{ pkg_name }}::sim_cycles++;
+final $display("RTL2UVM_CYCLES %0d", {{ pkg_name }}::sim_cycles);
+
+//--------------------------------------
+//Interface Instance
+//--------------------------------------
+{% if agents %}
+{# One interface per agent, clocked by the clock of its group #}
+{% for a in agents %}
+{{ a["interface"] }} intf_{{ a["name"] }}({{ a["clock"] }});
+{% endfor %}
+{% else %}
+{{ interface_name }} intf({{ clocks[-1] }});
+{% endif %}
+
+//--------------------------------------
+//DUT Instance
+//--------------------------------------
+{{ dut }} {{ dut_parameters }}UUT(
+{{ ",\n".join("\t."+port+"("+signal+")" for port, signal in connections) }}
+);
+{{ backdoor }}
+initial begin
+{% if agents %}
+{% for a in agents %}
+	uvm_config_db#(virtual {{ a["interface"] }})::set(uvm_root::get(), "*.u_{{ a["name"] }}_agent.*", "vif", intf_{{ a["name"] }});
+{% endfor %}
+{% else %}
+	uvm_config_db#(virtual {{ interface_name }})::set(uvm_root::get(), "*", "vif", intf);
+{% endif %}
+{% if backdoor %}
+	reg_backdoor = new();
+	uvm_config_db#(uvm_reg_backdoor)::set(uvm_root::get(), "*", "reg_backdoor", reg_backdoor);
+{% endif %}
+	//enable wave dump
+	$dumpfile("dump.vcd");
+	$dumpvars;
+end
+
+initial begin
+	run_test("{{ test_name }}");
+end
+
+endmodule //{{ top_name }}
@@ -0,0 +1,35 @@
+class {{ vseq_name }} extends uvm_sequence;
+
+`uvm_object_utils({{ vseq_name }})
+
+//Agent sequencers, set by the test
+{% for a in agents %}
+{{ a["sequencer"] }} {{ a["name"] }}_sqr;
+{% endfor %}
+
+extern function new( string name = "{{ vseq_name }}");
+extern task body();
+
+endclass //{{ vseq_name }}
+
+function {{ vseq_name }}::new(string name = "{{ vseq_name }}");
+ super.new( name );
+endfunction : new
+
+task {{ vseq_name }}::body();
+{% for a in agents %}
+{{ a["sequence"] }} {{ a["name"] }}_seq;
+{% endfor %}
+`uvm_info(get_type_name(), $sformatf("Start of {{ vseq_name }} Sequence"), UVM_LOW)
+{% for a in agents %}
+{{ a["name"] }}_seq = {{ a["sequence"] }}::type_id::create("{{ a["name"] }}_seq");
+{% endfor %}
+//All the agents are driven concurrently
+fork
+{% for a in agents %}
+	{{ a["name"] }}_seq.start({{ a["name"] }}_sqr, this);
+{% endfor %}
+join
+`uvm_info(get_type_name(), $sformatf("End of {{ vseq_name }} Sequence"), UVM_LOW)
+
+endtask //{{ vseq_name }}
\ No newline at end of file